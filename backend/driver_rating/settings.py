@@ -1,6 +1,7 @@
 from pathlib import Path
 import os
 import dj_database_url
+from corsheaders.defaults import default_headers
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -75,6 +76,80 @@ DATABASES = {
     )
 }
 
+# Per-process memory cache by default; point REDIS_URL at a shared Redis so
+# every gunicorn worker sees the same cached survey schemas and invalidations.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Seconds a compiled public survey schema stays cached. Signals invalidate it
+# on change; the timeout bounds staleness in workers that don't share a cache.
+SURVEY_SCHEMA_CACHE_TIMEOUT = int(os.environ.get("SURVEY_SCHEMA_CACHE_TIMEOUT", "300"))
+
+# max-age for public GET responses that carry ETag/Last-Modified (survey
+# JSON, driver list). 0 lets browsers and CDNs store them but revalidate
+# every time, which costs a 304 when nothing changed.
+PUBLIC_HTTP_MAX_AGE = int(os.environ.get("PUBLIC_HTTP_MAX_AGE", "0"))
+
+# Maximum number of ranked matches returned by the public driver search.
+DRIVER_SEARCH_LIMIT = int(os.environ.get("DRIVER_SEARCH_LIMIT", "20"))
+
+# Seconds a worker keeps its in-memory driver roster before reloading it,
+# in case a Driver change happened in a worker that doesn't share the cache.
+DRIVER_ROSTER_MAX_AGE = int(os.environ.get("DRIVER_ROSTER_MAX_AGE", "60"))
+
+# Seconds a worker keeps a driver leaderboard snapshot, and how many
+# ratings' worth of the window's mean rating each driver's average is
+# smoothed towards (GET /api/admin/drivers/leaderboard/).
+LEADERBOARD_MAX_AGE = int(os.environ.get("LEADERBOARD_MAX_AGE", "60"))
+LEADERBOARD_PRIOR_WEIGHT = int(os.environ.get("LEADERBOARD_PRIOR_WEIGHT", "10"))
+
+# "sync" writes each submission inside the request. "queue" validates it,
+# appends it to a local SQLite journal and answers 202 with a receipt; the
+# journal is then written to the database in batches. The journal is a file
+# in the container, so with SUBMISSION_FLUSH_MODE "thread" each web worker
+# drains it from a background thread; "worker" leaves it to
+# `manage.py flush_submissions --loop` running in the same container.
+SUBMISSION_INGEST_MODE = os.environ.get("SUBMISSION_INGEST_MODE", "sync")
+SUBMISSION_QUEUE_PATH = os.environ.get("SUBMISSION_QUEUE_PATH", str(BASE_DIR / "submission_queue.sqlite3"))
+SUBMISSION_FLUSH_MODE = os.environ.get("SUBMISSION_FLUSH_MODE", "thread")
+
+# Largest list accepted by POST /api/responses/batch/.
+SUBMISSION_BATCH_LIMIT = int(os.environ.get("SUBMISSION_BATCH_LIMIT", "200"))
+
+# Bulk response deletes (POST /api/admin/responses/delete/) run as jobs.
+# "worker" leaves them to `manage.py run_deletion_jobs --loop` (the deletion
+# worker in render.yaml and the Dockerfile), which also resumes jobs
+# interrupted by a restart. "thread" starts each job in a background thread
+# of the web process; only for setups without that worker.
+RESPONSE_DELETION_MODE = os.environ.get("RESPONSE_DELETION_MODE", "worker")
+
+# CSV and Parquet exports stream row by row (Parquet one row group at a
+# time). XLSX files are zips assembled in a temporary file before the
+# first byte is sent, so surveys with more responses than this must be
+# exported as CSV/Parquet or with `manage.py export_survey`.
+EXPORT_XLSX_MAX_RESPONSES = int(os.environ.get("EXPORT_XLSX_MAX_RESPONSES", "50000"))
+
+# Seconds a POST /api/responses/ outcome is replayed for retries that carry
+# the same Idempotency-Key.
+IDEMPOTENCY_KEY_TTL = int(os.environ.get("IDEMPOTENCY_KEY_TTL", "86400"))
+
+# Serve survey detail, driver search and submission from async views. Only
+# enable together with an ASGI server, e.g.
+#   gunicorn driver_rating.asgi:application -k uvicorn_worker.UvicornWorker
+# under WSGI each request would spin up its own event loop.
+ASYNC_PUBLIC_API = os.environ.get("ASYNC_PUBLIC_API", "False").lower() in ("1", "true", "yes", "on")
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -100,6 +175,18 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
+    # orjson-backed JSON with the stdlib output format; see surveys/renderers.py.
+    "DEFAULT_RENDERER_CLASSES": [
+        "surveys.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "surveys.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    # Opt-in keyset pagination: active when the client sends ?cursor= or ?page_size=.
+    "DEFAULT_PAGINATION_CLASS": "surveys.pagination.KeysetPagination",
 }
 
 CORS_ALLOWED_ORIGINS = _env_list(
@@ -114,6 +201,8 @@ CORS_ALLOWED_ORIGINS = _env_list(
 )
 
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
+CORS_EXPOSE_HEADERS = ["Idempotent-Replayed", "Location"]
 
 # For this project we allow all origins to simplify admin/frontend integration
 CORS_ALLOW_ALL_ORIGINS = True
@@ -1,5 +1,6 @@
 import json
 
+from django import forms
 from django.contrib import admin
 from django.conf import settings
 from django.contrib.auth import get_user_model
@@ -7,6 +8,8 @@ from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
 from django.http import HttpResponse, HttpResponseRedirect
 
 from .models import Answer, AnswerChoice, Choice, Driver, Question, Response, Survey
+from .search import canonical_phone, canonical_plate
+from .signals import rebuild_stats_on_commit
 
 
 class ChoiceInline(admin.TabularInline):
@@ -165,8 +168,18 @@ class QuestionAdmin(admin.ModelAdmin):
         return super().formfield_for_choice_field(db_field, request, **kwargs)
 
 
+class DriverAdminForm(forms.ModelForm):
+    # Canonical values before the unique check, as Driver.save() stores them.
+    def clean_phone_number(self):
+        return canonical_phone(self.cleaned_data.get("phone_number"))
+
+    def clean_car_number(self):
+        return canonical_plate(self.cleaned_data.get("car_number"))
+
+
 @admin.register(Driver)
 class DriverAdmin(admin.ModelAdmin):
+    form = DriverAdminForm
     list_display = ("last_name", "name", "phone_number", "car_number", "is_active")
     search_fields = ("last_name", "name", "phone_number", "car_number")
     change_list_template = "admin/surveys/driver/change_list.html"
@@ -187,12 +200,42 @@ class DriverAdmin(admin.ModelAdmin):
         return super().render_change_form(request, context, add, change, form_url, obj)
 
 
+class StatsRebuildMixin:
+    # Admin edits and deletes skip record_submissions, so the rollups of the
+    # surveys involved are rebuilt once the change commits.
+    survey_path = "survey_id"
+
+    def _survey_ids(self, queryset):
+        return set(queryset.values_list(self.survey_path, flat=True))
+
+    def save_model(self, request, obj, form, change):
+        survey_ids = self._survey_ids(self.model.objects.filter(pk=obj.pk)) if change else set()
+        super().save_model(request, obj, form, change)
+        rebuild_stats_on_commit(survey_ids | self._survey_ids(self.model.objects.filter(pk=obj.pk)))
+
+    def delete_model(self, request, obj):
+        survey_ids = self._survey_ids(self.model.objects.filter(pk=obj.pk))
+        super().delete_model(request, obj)
+        rebuild_stats_on_commit(survey_ids)
+
+    def delete_queryset(self, request, queryset):
+        survey_ids = self._survey_ids(queryset)
+        super().delete_queryset(request, queryset)
+        rebuild_stats_on_commit(survey_ids)
+
+
 @admin.register(Response)
-class ResponseAdmin(admin.ModelAdmin):
+class ResponseAdmin(StatsRebuildMixin, admin.ModelAdmin):
     list_display = ("survey", "driver", "ip_address", "submitted_at")
     list_filter = ("survey", "submitted_at")
     search_fields = ("driver__name", "driver__last_name", "driver__car_number", "ip_address")
 
 
-admin.site.register(Answer)
-admin.site.register(AnswerChoice)
+@admin.register(Answer)
+class AnswerAdmin(StatsRebuildMixin, admin.ModelAdmin):
+    survey_path = "response__survey_id"
+
+
+@admin.register(AnswerChoice)
+class AnswerChoiceAdmin(StatsRebuildMixin, admin.ModelAdmin):
+    survey_path = "answer__response__survey_id"
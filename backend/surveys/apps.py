@@ -18,6 +18,9 @@ class SurveysConfig(AppConfig):
         - DJANGO_SUPERUSER_PASSWORD
         - DJANGO_SUPERUSER_EMAIL
         """
+        # Register cache invalidation receivers.
+        from . import signals  # noqa: F401
+
         from django.contrib.auth import get_user_model
 
         username = os.environ.get("DJANGO_SUPERUSER_USERNAME")
@@ -0,0 +1,139 @@
+import json
+from io import BytesIO
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.exceptions import ParseError, ValidationError
+
+from . import idempotency
+from .conditional import conditional
+from .cache import aget_survey_schema
+from .ingest import STATUS_PENDING, get_journal, queue_enabled
+from .models import Driver
+from .readers import DRIVER_READER
+from .renderers import ORJSONParser, ORJSONRenderer
+from .search import search_drivers
+from .serializers import ResponseCreateSerializer
+from .views import (
+    ActiveDriverListView,
+    ResponseCreateView,
+    _driver_list_validators,
+    _survey_validators,
+)
+
+# Public survey flow for ASGI deployments (ASYNC_PUBLIC_API). Cache reads,
+# lookups and searches stay on the event loop; only the submission write,
+# which needs a transaction, runs in the sync thread. Responses match the
+# DRF views they replace; requests those views handle specially (projection,
+# pagination, non-JSON bodies) are handed to them.
+
+
+def _json(data, status=200):
+    return HttpResponse(ORJSONRenderer().render(data), status=status, content_type="application/json")
+
+
+def _delegate(view, request, **kwargs):
+    response = view(request, **kwargs)
+    response.render()
+    return response
+
+
+@require_GET
+@conditional(_survey_validators, public=True)
+async def survey_detail_view(request, slug):
+    body = await aget_survey_schema(slug)
+    if body is None:
+        return _json({"detail": "Not found."}, status=404)
+    return HttpResponse(body, content_type="application/json")
+
+
+@require_GET
+@conditional(_driver_list_validators, public=True)
+async def driver_list_view(request):
+    params = request.GET
+    if {"fields", "cursor", "page_size"} & set(params):
+        return await sync_to_async(_delegate)(ActiveDriverListView.as_view(), request)
+
+    queryset = Driver.objects.filter(is_active=True).order_by("name", "last_name", "id")
+    search = params.get("search")
+    if search:
+        limit = getattr(settings, "DRIVER_SEARCH_LIMIT", 20)
+        # Building the query may probe for the SQLite search index once.
+        queryset = await sync_to_async(search_drivers)(queryset, search, limit)
+    rows = [row async for row in DRIVER_READER.values(queryset)]
+    return _json(DRIVER_READER.to_data(rows))
+
+
+def _write(serializer):
+    return serializer.save().id
+
+
+def _replayed(stored):
+    code, data, location = stored
+    response = _json(data, status=code)
+    response[idempotency.REPLAYED_HEADER] = "true"
+    if location:
+        response["Location"] = location
+    return response
+
+
+@csrf_exempt
+@require_POST
+async def response_create_view(request):
+    if request.content_type != "application/json":
+        return await sync_to_async(_delegate)(ResponseCreateView.as_view(), request)
+
+    try:
+        key = idempotency.request_key(request)
+        if key is not None:
+            digest = idempotency.fingerprint(request.body)
+            stored = await idempotency.aclaim(key, digest)
+            if stored is not None:
+                return _replayed(stored)
+    except idempotency.IdempotencyConflict as exc:
+        return _json({"detail": exc.message}, status=exc.status)
+
+    try:
+        response = await _create(request)
+    except BaseException:
+        if key is not None:
+            await idempotency.arelease(key)
+        raise
+    if key is None:
+        return response
+    if response.status_code >= 400:
+        await idempotency.arelease(key)
+    else:
+        await idempotency.acomplete(
+            key, digest, response.status_code, json.loads(response.content), response.get("Location")
+        )
+    return response
+
+
+async def _create(request):
+    try:
+        data = ORJSONParser().parse(BytesIO(request.body))
+    except ParseError as exc:
+        return _json({"detail": exc.detail}, status=400)
+
+    serializer = ResponseCreateSerializer(data=data, context={"request": request})
+    if not await serializer.ais_valid():
+        return _json(serializer.errors, status=400)
+
+    if queue_enabled():
+        receipt = await sync_to_async(get_journal().enqueue)(
+            {**serializer.validated_data, "ip_address": request.META.get("REMOTE_ADDR")}
+        )
+        response = _json({"receipt": receipt, "status": STATUS_PENDING}, status=202)
+        response["Location"] = reverse("submission-receipt", args=[receipt])
+        return response
+
+    try:
+        response_id = await sync_to_async(_write)(serializer)
+    except ValidationError as exc:
+        return _json(exc.detail, status=400)
+    return _json({"id": response_id}, status=201)
@@ -0,0 +1,77 @@
+from django.db import transaction
+
+from .cache import invalidate_survey_schema
+from .models import Choice, Question, Survey
+
+
+def _with_ids(objects, queryset):
+    # For backends that can't return ids from a bulk INSERT. `queryset` holds
+    # exactly the new rows, which get increasing ids in insertion order.
+    if objects and objects[0].pk is None:
+        for obj, pk in zip(objects, queryset.order_by("id").values_list("id", flat=True)):
+            obj.pk = pk
+    return objects
+
+
+def build_surveys(surveys):
+    """Create surveys with their questions and choices; `surveys` is a list of (survey fields, questions) pairs."""
+    with transaction.atomic():
+        created = [Survey(**fields) for fields, _ in surveys]
+        Survey.objects.bulk_create_with_slugs(created)
+        _with_ids(created, Survey.objects.filter(slug__in=[survey.slug for survey in created]))
+
+        pairs = [(survey, question) for survey, (_, questions) in zip(created, surveys) for question in questions]
+        questions = Question.objects.bulk_create(
+            [
+                Question(
+                    survey=survey,
+                    text=question["text"],
+                    question_type=question["question_type"],
+                    is_required=question["is_required"],
+                    order=question["order"],
+                )
+                for survey, question in pairs
+            ]
+        )
+        _with_ids(questions, Question.objects.filter(survey__in=created))
+        Choice.objects.bulk_create(
+            [
+                Choice(question=question, text=choice["text"], order=choice["order"])
+                for question, (_, data) in zip(questions, pairs)
+                for choice in data.get("choices") or ()
+            ]
+        )
+    # Bulk inserts send no signals; drop anything cached for the new surveys.
+    invalidate_survey_schema(
+        *[survey.slug for survey in created], survey_ids=[survey.id for survey in created]
+    )
+    return created
+
+
+def build_survey(questions=(), **survey_fields):
+    return build_surveys([(survey_fields, questions)])[0]
+
+
+def survey_blueprint(survey_id):
+    """Questions and choices of a survey in `build_surveys` format."""
+    questions = {
+        row["id"]: {**row, "choices": []}
+        for row in Question.objects.filter(survey_id=survey_id)
+        .order_by("order", "id")
+        .values("id", "text", "question_type", "is_required", "order")
+    }
+    for choice in (
+        Choice.objects.filter(question__survey_id=survey_id)
+        .order_by("order", "id")
+        .values("question_id", "text", "order")
+    ):
+        questions[choice.pop("question_id")]["choices"].append(choice)
+    for question in questions.values():
+        del question["id"]
+    return list(questions.values())
+
+
+def clone_survey(survey, **overrides):
+    fields = {"title": survey.title, "description": survey.description, "is_active": False}
+    fields.update(overrides)
+    return build_survey(survey_blueprint(survey.id), **fields)
@@ -0,0 +1,81 @@
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .models import Survey
+from .readers import public_survey_data
+from .renderers import ORJSONRenderer
+from .structure import STRUCTURE_KEY, cache_timeout
+
+SCHEMA_VERSION_KEY = "survey-schema:{slug}"
+SCHEMA_BODY_KEY = "survey-schema:{slug}:{version}"
+ACTIVE_LIST_KEY = "survey-schema:active"
+
+
+def _active_surveys():
+    return Survey.objects.filter(is_active=True)
+
+
+def get_survey_schema(slug):
+    """Rendered public JSON of an active survey, or None."""
+    version = cache.get(SCHEMA_VERSION_KEY.format(slug=slug))
+    if version is not None:
+        body = cache.get(SCHEMA_BODY_KEY.format(slug=slug, version=version))
+        if body is not None:
+            return body
+
+    surveys = public_survey_data(_active_surveys().filter(slug=slug), extra=("updated_at",))
+    if not surveys:
+        return None
+
+    survey = surveys[0]
+    version = survey.pop("updated_at").isoformat()
+    body = ORJSONRenderer().render(survey)
+    cache.set_many(
+        {
+            SCHEMA_BODY_KEY.format(slug=slug, version=version): body,
+            SCHEMA_VERSION_KEY.format(slug=slug): version,
+        },
+        cache_timeout(),
+    )
+    return body
+
+
+async def aget_survey_schema(slug):
+    version = await cache.aget(SCHEMA_VERSION_KEY.format(slug=slug))
+    if version is not None:
+        body = await cache.aget(SCHEMA_BODY_KEY.format(slug=slug, version=version))
+        if body is not None:
+            return body
+    # Rendering runs three queries; it happens once per schema version.
+    return await sync_to_async(get_survey_schema)(slug)
+
+
+def survey_schema_version(slug):
+    """`updated_at` of the active survey behind `slug`, or None."""
+    version = cache.get(SCHEMA_VERSION_KEY.format(slug=slug))
+    if version is not None:
+        return datetime.fromisoformat(version)
+    return Survey.objects.filter(slug=slug, is_active=True).values_list("updated_at", flat=True).first()
+
+
+def active_surveys_version():
+    totals = Survey.objects.filter(is_active=True).aggregate(count=Count("id"), updated_at=Max("updated_at"))
+    return totals["count"], totals["updated_at"]
+
+
+def get_active_surveys_schema():
+    body = cache.get(ACTIVE_LIST_KEY)
+    if body is None:
+        body = ORJSONRenderer().render(public_survey_data(_active_surveys()))
+        cache.set(ACTIVE_LIST_KEY, body, cache_timeout())
+    return body
+
+
+def invalidate_survey_schema(*slugs, survey_ids=()):
+    keys = [SCHEMA_VERSION_KEY.format(slug=slug) for slug in slugs if slug]
+    keys.extend(STRUCTURE_KEY.format(survey_id=survey_id) for survey_id in survey_ids)
+    keys.append(ACTIVE_LIST_KEY)
+    cache.delete_many(keys)
@@ -0,0 +1,64 @@
+from datetime import timezone as dt_timezone
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def _evaluate(etag, last_modified):
+    if etag is not None:
+        etag = quote_etag(str(etag))
+    if last_modified is not None:
+        if timezone.is_naive(last_modified):
+            last_modified = timezone.make_aware(last_modified, dt_timezone.utc)
+        last_modified = int(last_modified.timestamp())
+    return etag, last_modified
+
+
+def _finish(response, etag, last_modified, public):
+    if response.status_code not in (200, 304):
+        return response
+    if etag is not None:
+        response.headers.setdefault("ETag", etag)
+    if last_modified is not None and not response.has_header("Last-Modified"):
+        response.headers["Last-Modified"] = http_date(last_modified)
+    if public:
+        patch_cache_control(response, public=True, max_age=getattr(settings, "PUBLIC_HTTP_MAX_AGE", 0))
+    else:
+        # Authenticated data: browsers may keep it but must revalidate.
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional(validators, public=False):
+    """Like django's `condition`, but `validators` returns (etag, last_modified) in one call and async views work."""
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+
+            async def wrapper(request, *args, **kwargs):
+                if request.method not in ("GET", "HEAD"):
+                    return await view(request, *args, **kwargs)
+                etag, last_modified = _evaluate(*await sync_to_async(validators)(request, *args, **kwargs))
+                response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _finish(response, etag, last_modified, public)
+
+        else:
+
+            def wrapper(request, *args, **kwargs):
+                if request.method not in ("GET", "HEAD"):
+                    return view(request, *args, **kwargs)
+                etag, last_modified = _evaluate(*validators(request, *args, **kwargs))
+                response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                if response is None:
+                    response = view(request, *args, **kwargs)
+                return _finish(response, etag, last_modified, public)
+
+        return wraps(view)(wrapper)
+
+    return decorator
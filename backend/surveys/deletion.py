@@ -0,0 +1,150 @@
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .leaderboard import invalidate_leaderboards
+from .models import Answer, AnswerChoice, Response, ResponseDeletionJob
+from .stats import rebuild_survey_stats
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+# A running job whose heartbeat is older than this was interrupted (worker
+# restart, crashed thread) and may be claimed again.
+STALE_AFTER = 300
+
+
+def _responses(survey_id=None, driver_id=None):
+    queryset = Response.objects.order_by()
+    if survey_id:
+        queryset = queryset.filter(survey_id=survey_id)
+    if driver_id:
+        queryset = queryset.filter(driver_id=driver_id)
+    return queryset
+
+
+def deletion_plan(survey_id=None, driver_id=None):
+    return _responses(survey_id, driver_id).aggregate(
+        response_count=Count("id", distinct=True),
+        answer_count=Count("answers", distinct=True),
+        answer_choice_count=Count("answers__answer_choices"),
+        max_response_id=Max("id"),
+    )
+
+
+def create_deletion_job(survey_id=None, driver_id=None, requested_by=None):
+    """Returns None when no responses match."""
+    plan = deletion_plan(survey_id, driver_id)
+    if not plan["response_count"]:
+        return None
+    if survey_id:
+        survey_ids = [int(survey_id)]
+    else:
+        survey_ids = list(
+            _responses(survey_id, driver_id).values_list("survey_id", flat=True).distinct()
+        )
+    return ResponseDeletionJob.objects.create(
+        survey_id=survey_id or None,
+        driver_id=driver_id or None,
+        max_response_id=plan["max_response_id"],
+        survey_ids=survey_ids,
+        total_responses=plan["response_count"],
+        requested_by=requested_by,
+    )
+
+
+def start_deletion_job(job):
+    if getattr(settings, "RESPONSE_DELETION_MODE", "worker") != "thread":
+        return
+
+    def run():
+        try:
+            run_deletion_job(job.pk)
+        finally:
+            connection.close()
+
+    transaction.on_commit(lambda: threading.Thread(target=run, daemon=True).start())
+
+
+def _claimable(now, include_failed):
+    claimable = Q(status=ResponseDeletionJob.STATUS_PENDING) | Q(
+        status=ResponseDeletionJob.STATUS_RUNNING, updated_at__lt=now - timedelta(seconds=STALE_AFTER)
+    )
+    if include_failed:
+        claimable |= Q(status=ResponseDeletionJob.STATUS_FAILED)
+    return claimable
+
+
+def claim_deletion_job(job_id, include_failed=False):
+    """False when someone else has the job."""
+    now = timezone.now()
+    claimed = (
+        ResponseDeletionJob.objects.filter(_claimable(now, include_failed), pk=job_id)
+        .update(status=ResponseDeletionJob.STATUS_RUNNING, error="", updated_at=now)
+    )
+    return claimed == 1
+
+
+def _delete_batch(job, batch_size):
+    with transaction.atomic():
+        ids = list(
+            _responses(job.survey_id, job.driver_id)
+            .filter(id__gt=job.last_response_id, id__lte=job.max_response_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return False
+        # Set-based DELETEs, children first. Django's collector would load
+        # every cascaded row into memory; nothing listens to these deletes
+        # and the rollups are rebuilt when the job finishes.
+        choices = AnswerChoice.objects.filter(answer__response_id__in=ids)
+        answers = Answer.objects.filter(response_id__in=ids)
+        responses = Response.objects.filter(id__in=ids)
+        job.deleted_answer_choices += choices._raw_delete(choices.db)
+        job.deleted_answers += answers._raw_delete(answers.db)
+        job.deleted_responses += responses._raw_delete(responses.db)
+        job.last_response_id = ids[-1]
+        job.save(
+            update_fields=[
+                "deleted_answer_choices",
+                "deleted_answers",
+                "deleted_responses",
+                "last_response_id",
+                "updated_at",
+            ]
+        )
+    return True
+
+
+def run_deletion_job(job_id, batch_size=BATCH_SIZE, include_failed=False):
+    """Returns the job, or None when it couldn't be claimed."""
+    if not claim_deletion_job(job_id, include_failed=include_failed):
+        return None
+    job = ResponseDeletionJob.objects.get(pk=job_id)
+    try:
+        while _delete_batch(job, batch_size):
+            pass
+        rebuild_survey_stats(job.survey_ids)
+        invalidate_leaderboards()
+    except Exception as exc:
+        logger.exception("Response deletion job %s failed", job.pk)
+        job.status = ResponseDeletionJob.STATUS_FAILED
+        job.error = str(exc)
+        job.save(update_fields=["status", "error", "updated_at"])
+        return job
+    job.status = ResponseDeletionJob.STATUS_DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "finished_at", "updated_at"])
+    return job
+
+
+def pending_deletion_jobs(include_failed=False):
+    jobs = ResponseDeletionJob.objects.filter(_claimable(timezone.now(), include_failed))
+    return list(jobs.order_by("id").values_list("id", flat=True))
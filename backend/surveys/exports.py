@@ -0,0 +1,216 @@
+import csv
+import tempfile
+from itertools import groupby
+from operator import itemgetter
+
+from django.utils import timezone
+
+from .models import Answer, AnswerChoice, Question, Response
+
+CHUNK_SIZE = 2000
+PARQUET_ROW_GROUP_SIZE = 10000
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+}
+FIXED_COLUMNS = ["response_id", "submitted_at", "driver_id", "driver", "car_number", "ip_address"]
+
+# Spreadsheet apps evaluate cells starting with these as formulas.
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class ExportDependencyError(Exception):
+    pass
+
+
+def export_questions(survey_id):
+    return list(
+        Question.objects.filter(survey_id=survey_id).order_by("order", "id").values_list("id", "text")
+    )
+
+
+def export_header(questions):
+    return FIXED_COLUMNS + [text for _, text in questions]
+
+
+def _grouped(rows):
+    # rows are sorted by response id; yield (response_id, [rows...]) lazily.
+    return groupby(rows, key=itemgetter(0))
+
+
+def iter_export_rows(survey_id, questions, chunk_size=CHUNK_SIZE):
+    """One list per response: the fixed columns, then one cell per question."""
+    column_index = {question_id: idx for idx, (question_id, _) in enumerate(questions)}
+
+    responses = (
+        Response.objects.filter(survey_id=survey_id)
+        .order_by("id")
+        .values_list(
+            "id",
+            "submitted_at",
+            "driver_id",
+            "driver__last_name",
+            "driver__name",
+            "driver__car_number",
+            "ip_address",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    answers = _grouped(
+        Answer.objects.filter(response__survey_id=survey_id)
+        .order_by("response_id", "id")
+        .values_list("response_id", "question_id", "rating_value", "text_value")
+        .iterator(chunk_size=chunk_size)
+    )
+    choices = _grouped(
+        AnswerChoice.objects.filter(answer__response__survey_id=survey_id)
+        .order_by("answer__response_id", "choice__order", "choice_id")
+        .values_list("answer__response_id", "answer__question_id", "choice__text")
+        .iterator(chunk_size=chunk_size)
+    )
+    next_answers = next(answers, None)
+    next_choices = next(choices, None)
+
+    for response_id, submitted_at, driver_id, last_name, name, car_number, ip_address in responses:
+        cells = [[] for _ in questions]
+
+        while next_answers is not None and next_answers[0] < response_id:
+            next_answers = next(answers, None)
+        if next_answers is not None and next_answers[0] == response_id:
+            for _, question_id, rating_value, text_value in next_answers[1]:
+                idx = column_index.get(question_id)
+                if idx is None:
+                    continue
+                if rating_value is not None:
+                    cells[idx].append(str(rating_value))
+                elif text_value:
+                    cells[idx].append(text_value)
+            next_answers = next(answers, None)
+
+        while next_choices is not None and next_choices[0] < response_id:
+            next_choices = next(choices, None)
+        if next_choices is not None and next_choices[0] == response_id:
+            for _, question_id, choice_text in next_choices[1]:
+                idx = column_index.get(question_id)
+                if idx is not None:
+                    cells[idx].append(choice_text)
+            next_choices = next(choices, None)
+
+        yield [
+            response_id,
+            timezone.localtime(submitted_at).isoformat(),
+            driver_id,
+            f"{last_name} {name}".strip() if last_name else name,
+            car_number or "",
+            ip_address or "",
+        ] + [", ".join(values) for values in cells]
+
+
+def escape_formula(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _spreadsheet_row(row):
+    return [escape_formula(value) for value in row]
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def stream_csv(survey_id):
+    questions = export_questions(survey_id)
+    writer = csv.writer(_Echo())
+    # BOM so Excel opens the Cyrillic headers as UTF-8.
+    yield "\ufeff" + writer.writerow(_spreadsheet_row(export_header(questions)))
+    for row in iter_export_rows(survey_id, questions):
+        yield writer.writerow(_spreadsheet_row(row))
+
+
+def write_xlsx(survey_id, destination):
+    try:
+        from openpyxl import Workbook
+    except ImportError as exc:
+        raise ExportDependencyError("XLSX export requires the openpyxl package.") from exc
+
+    questions = export_questions(survey_id)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("responses")
+    sheet.append(_spreadsheet_row(export_header(questions)))
+    for row in iter_export_rows(survey_id, questions):
+        sheet.append(_spreadsheet_row(row))
+    workbook.save(destination)
+
+
+class _ChunkSink:
+    # Write-only file for ParquetWriter; the bytes are handed on as they come.
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_parquet(survey_id):
+    """Raises ExportDependencyError right away when pyarrow is missing."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ExportDependencyError("Parquet export requires the pyarrow package.") from exc
+
+    questions = export_questions(survey_id)
+    header = export_header(questions)
+    # Parquet needs unique column names; question texts may repeat.
+    names = [name if header.count(name) == 1 else f"{name} ({idx})" for idx, name in enumerate(header)]
+    types = [pa.int64(), pa.string(), pa.int64()] + [pa.string()] * (len(names) - 3)
+    schema = pa.schema(list(zip(names, types)))
+
+    def to_table(rows):
+        return pa.Table.from_arrays(
+            [pa.array(column, type=type_) for column, type_ in zip(zip(*rows), types)],
+            schema=schema,
+        )
+
+    def chunks():
+        sink = _ChunkSink()
+        with pq.ParquetWriter(sink, schema) as writer:
+            batch = []
+            for row in iter_export_rows(survey_id, questions):
+                batch.append(row)
+                if len(batch) >= PARQUET_ROW_GROUP_SIZE:
+                    writer.write_table(to_table(batch))
+                    batch = []
+                    yield sink.take()
+            if batch:
+                writer.write_table(to_table(batch))
+        yield sink.take()
+
+    return chunks()
+
+
+def write_parquet(survey_id, destination):
+    for chunk in stream_parquet(survey_id):
+        destination.write(chunk)
+
+
+def export_to_tempfile(survey_id):
+    handle = tempfile.TemporaryFile()
+    write_xlsx(survey_id, handle)
+    handle.seek(0)
+    return handle
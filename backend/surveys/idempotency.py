@@ -0,0 +1,92 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+HEADER = "HTTP_IDEMPOTENCY_KEY"
+REPLAYED_HEADER = "Idempotent-Replayed"
+CACHE_KEY = "idempotency:{digest}"
+MAX_KEY_LENGTH = 255
+IN_PROGRESS = 0
+
+# A claim left behind by a crashed request stops blocking retries after this.
+IN_PROGRESS_TIMEOUT = 30
+
+MISMATCH_MESSAGE = "Idempotency-Key was already used with a different request body."
+IN_PROGRESS_MESSAGE = "A request with this Idempotency-Key is still being processed."
+INVALID_KEY_MESSAGE = f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters."
+
+
+class IdempotencyConflict(Exception):
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def _ttl():
+    return getattr(settings, "IDEMPOTENCY_KEY_TTL", 86400)
+
+
+def request_key(request):
+    """Cache key for the request's Idempotency-Key, or None when the client sent none."""
+    key = request.META.get(HEADER)
+    if key is None:
+        return None
+    key = key.strip()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise IdempotencyConflict(INVALID_KEY_MESSAGE, 400)
+    # The key alone identifies the request: a retry may arrive from another
+    # address or proxy hop. Reusing a key for a different body gets a 422, and
+    # the raw header never reaches the cache backend.
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return CACHE_KEY.format(digest=digest)
+
+
+def fingerprint(body):
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+def _replay(entry, digest):
+    # Entries are (status, fingerprint, body, location); status is
+    # IN_PROGRESS while the first request is still running.
+    status, stored_digest, data, location = entry
+    if stored_digest != digest:
+        raise IdempotencyConflict(MISMATCH_MESSAGE, 422)
+    if status == IN_PROGRESS:
+        raise IdempotencyConflict(IN_PROGRESS_MESSAGE, 409)
+    return status, data, location
+
+
+def claim(key, digest):
+    """None for a new key, else the (status, body, location) stored for it."""
+    while not cache.add(key, (IN_PROGRESS, digest, None, None), IN_PROGRESS_TIMEOUT):
+        entry = cache.get(key)
+        if entry is not None:
+            return _replay(entry, digest)
+        # Expired between add() and get(); try to claim it again.
+    return None
+
+
+def complete(key, digest, status, data, location=None):
+    cache.set(key, (status, digest, data, location), _ttl())
+
+
+def release(key):
+    cache.delete(key)
+
+
+async def aclaim(key, digest):
+    while not await cache.aadd(key, (IN_PROGRESS, digest, None, None), IN_PROGRESS_TIMEOUT):
+        entry = await cache.aget(key)
+        if entry is not None:
+            return _replay(entry, digest)
+    return None
+
+
+async def acomplete(key, digest, status, data, location=None):
+    await cache.aset(key, (status, digest, data, location), _ttl())
+
+
+async def arelease(key):
+    await cache.adelete(key)
@@ -0,0 +1,264 @@
+import csv
+import io
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import Q
+
+from .models import Driver
+from .roster import invalidate_roster
+from .search import canonical_phone, canonical_plate, driver_search_key
+
+CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+FORMATS = ("csv", "xlsx")
+
+# Header aliases (compared case-insensitively). Model field names and the
+# admin's verbose names both work, so an export from the admin re-imports.
+COLUMNS = {
+    "last_name": ("last_name", "овог", "surname"),
+    "name": ("name", "нэр", "first_name"),
+    "phone_number": ("phone_number", "утас", "утасны дугаар", "phone"),
+    "car_number": ("car_number", "машины дугаар", "улсын дугаар", "plate"),
+}
+
+
+class DriverImportError(Exception):
+    pass
+
+
+@dataclass
+class ImportResult:
+    inserted: int = 0
+    updated: int = 0
+    deactivated: int = 0
+    skipped: int = 0
+    errors: list = field(default_factory=list)
+
+    def error(self, line, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "detail": message})
+
+    def as_dict(self):
+        return {
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "deactivated": self.deactivated,
+            "skipped": self.skipped,
+            "errors": self.errors,
+        }
+
+
+def _column_map(header):
+    lookup = {alias: name for name, aliases in COLUMNS.items() for alias in aliases}
+    columns = {}
+    for idx, title in enumerate(header):
+        name = lookup.get(str(title or "").strip().lower())
+        if name and name not in columns:
+            columns[name] = idx
+    if "name" not in columns:
+        raise DriverImportError("Файлд 'Нэр' (name) багана алга.")
+    if "phone_number" not in columns and "car_number" not in columns:
+        raise DriverImportError("Файлд утасны эсвэл машины дугаарын багана алга.")
+    return columns
+
+
+def _cell(value):
+    # Spreadsheets often turn phone numbers into floats (99112233.0).
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return value
+
+
+def _records(rows):
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        raise DriverImportError("Файл хоосон байна.")
+    columns = _column_map(header)
+    for line, row in enumerate(rows, start=2):
+        record = {}
+        for name, idx in columns.items():
+            value = row[idx] if idx < len(row) else None
+            record[name] = "" if value is None else str(_cell(value)).strip()
+        if any(record.values()):
+            yield line, record
+
+
+def iter_csv_rows(handle):
+    try:
+        yield from csv.reader(io.TextIOWrapper(handle, encoding="utf-8-sig", newline=""))
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise DriverImportError(f"CSV файлыг уншиж чадсангүй (UTF-8 байх ёстой): {exc}") from exc
+
+
+def iter_xlsx_rows(handle):
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:
+        raise DriverImportError("XLSX import requires the openpyxl package.") from exc
+
+    try:
+        workbook = load_workbook(handle, read_only=True, data_only=True)
+    except Exception as exc:
+        raise DriverImportError(f"XLSX файлыг уншиж чадсангүй: {exc}") from exc
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_rows(handle, file_format):
+    if file_format not in FORMATS:
+        raise DriverImportError(f"Unsupported format: {file_format}")
+    return iter_xlsx_rows(handle) if file_format == "xlsx" else iter_csv_rows(handle)
+
+
+class _Importer:
+    def __init__(self):
+        self.result = ImportResult()
+        self.seen_phones = set()
+        self.seen_plates = set()
+        self.claimed = set()
+        self.touched = set()
+
+    def parse(self, line, record):
+        name = record.get("name", "")
+        phone = canonical_phone(record.get("phone_number"))
+        plate = canonical_plate(record.get("car_number"))
+        if not name:
+            return self.result.error(line, "Нэр хоосон байна.")
+        if not phone and not plate:
+            return self.result.error(line, "Утасны эсвэл машины дугаар шаардлагатай.")
+        if phone and len(phone) > 20 or plate and len(plate) > 20:
+            return self.result.error(line, "Дугаар хэт урт байна.")
+        if phone in self.seen_phones:
+            return self.result.error(line, f"Утасны дугаар {phone} файлд давхардсан.")
+        if phone:
+            self.seen_phones.add(phone)
+        if plate:
+            self.seen_plates.add(plate)
+        return Driver(
+            last_name=record.get("last_name", ""),
+            name=name,
+            phone_number=phone,
+            car_number=plate,
+            is_active=True,
+            search_key=driver_search_key(record.get("last_name", ""), name, phone, plate),
+        )
+
+    def _target(self, line, driver, by_phone, by_plate):
+        target = by_phone.get(driver.phone_number)
+        if target is not None:
+            return target
+        # Drivers on shifts share a car, so a plate only identifies a driver
+        # when it belongs to exactly one who could be this row.
+        holders = [
+            holder
+            for holder in by_plate.get(driver.car_number, ())
+            if not (driver.phone_number and holder.phone_number)
+        ]
+        if len(holders) > 1 and not driver.phone_number:
+            self.result.error(
+                line, f"Машины дугаар {driver.car_number} олон жолоочид бүртгэлтэй; утасны дугаар оруулна уу."
+            )
+            return False
+        return holders[0] if len(holders) == 1 else None
+
+    def upsert(self, chunk):
+        phones = [driver.phone_number for _, driver in chunk if driver.phone_number]
+        plates = [driver.car_number for _, driver in chunk if driver.car_number]
+        existing = Driver.objects.filter(Q(phone_number__in=phones) | Q(car_number__in=plates)).only(
+            "id", "last_name", "name", "phone_number", "car_number"
+        )
+        by_phone = {}
+        by_plate = {}
+        for current in existing:
+            if current.phone_number:
+                by_phone[current.phone_number] = current
+            if current.car_number:
+                by_plate.setdefault(current.car_number, []).append(current)
+
+        by_phone_rows = []
+        by_id_rows = []
+        new_rows = []
+        for line, driver in chunk:
+            target = self._target(line, driver, by_phone, by_plate)
+            if target is False:
+                continue
+            if target is None:
+                self.result.inserted += 1
+                (by_phone_rows if driver.phone_number else new_rows).append(driver)
+                continue
+            if target.id in self.claimed:
+                self.result.error(line, "Энэ жолооч файлд өөр мөрөөр давхардсан.")
+                continue
+            self.claimed.add(target.id)
+            self.result.updated += 1
+            # Blank cells keep what the driver already has.
+            driver.last_name = driver.last_name or target.last_name
+            driver.phone_number = driver.phone_number or target.phone_number
+            driver.car_number = driver.car_number or target.car_number
+            driver.search_key = driver_search_key(
+                driver.last_name, driver.name, driver.phone_number, driver.car_number
+            )
+            if target.phone_number:
+                by_phone_rows.append(driver)
+            else:
+                driver.pk = target.id
+                driver.updated_at = timezone.now()
+                by_id_rows.append(driver)
+
+        fields = ["last_name", "name", "phone_number", "car_number", "is_active", "search_key", "updated_at"]
+        if by_phone_rows:
+            Driver.objects.bulk_create(
+                by_phone_rows,
+                update_conflicts=True,
+                unique_fields=["phone_number"],
+                update_fields=[name for name in fields if name != "phone_number"],
+            )
+        if by_id_rows:
+            Driver.objects.bulk_update(by_id_rows, fields)
+        if new_rows:
+            Driver.objects.bulk_create(new_rows)
+        self.touched.update(driver.pk for driver in (*by_phone_rows, *by_id_rows, *new_rows))
+
+    def deactivate_missing(self):
+        touched = self.touched
+        if None in touched:
+            # The backend didn't return ids from the upsert; look them up.
+            touched = set(
+                Driver.objects.filter(
+                    Q(phone_number__in=self.seen_phones) | Q(car_number__in=self.seen_plates)
+                ).values_list("id", flat=True)
+            )
+        self.result.deactivated = (
+            Driver.objects.filter(is_active=True)
+            .exclude(id__in=touched)
+            .update(is_active=False, updated_at=timezone.now())
+        )
+
+
+def import_drivers(rows, deactivate_missing=False, chunk_size=CHUNK_SIZE):
+    """Upsert drivers from spreadsheet rows (header first) and return an ImportResult."""
+    importer = _Importer()
+    records = _records(rows)
+    with transaction.atomic():
+        while True:
+            batch = list(islice(records, chunk_size))
+            if not batch:
+                break
+            chunk = []
+            for line, record in batch:
+                driver = importer.parse(line, record)
+                if driver is not None:
+                    chunk.append((line, driver))
+            if chunk:
+                importer.upsert(chunk)
+        if deactivate_missing and not importer.result.skipped:
+            importer.deactivate_missing()
+        transaction.on_commit(invalidate_roster)
+    return importer.result
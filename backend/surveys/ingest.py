@@ -0,0 +1,216 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from .serializers import DUPLICATE_RESPONSE_MESSAGE, FAILED_MESSAGE
+from .submissions import STATUS_DUPLICATE, STATUS_FAILED, STATUS_STORED, store_submissions
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_PROCESSING = "processing"
+
+# Claimed entries whose flusher died are handed out again after this long.
+CLAIM_TIMEOUT = 300
+
+FLUSH_BATCH_SIZE = 200
+FLUSH_INTERVAL = 0.5
+# Settled receipts stay available to the status endpoint for this long.
+RECEIPT_RETENTION = 24 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submission (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    receipt TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    response_id INTEGER,
+    error TEXT,
+    enqueued_at REAL NOT NULL,
+    claimed_at REAL,
+    processed_at REAL
+);
+CREATE INDEX IF NOT EXISTS submission_status ON submission (status, seq);
+"""
+
+
+class SubmissionJournal:
+    """Local SQLite queue of validated submissions."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, payload):
+        receipt = uuid.uuid4().hex
+        self._connection().execute(
+            "INSERT INTO submission (receipt, payload, status, enqueued_at) VALUES (?, ?, ?, ?)",
+            (receipt, json.dumps(payload), STATUS_PENDING, time.time()),
+        )
+        return receipt
+
+    def claim(self, limit):
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT seq, payload FROM submission "
+                "WHERE status = ? OR (status = ? AND claimed_at < ?) ORDER BY seq LIMIT ?",
+                (STATUS_PENDING, STATUS_PROCESSING, now - CLAIM_TIMEOUT, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE submission SET status = ?, claimed_at = ? WHERE seq = ?",
+                [(STATUS_PROCESSING, now, seq) for seq, _ in rows],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return [(seq, json.loads(payload)) for seq, payload in rows]
+
+    def resolve(self, outcomes):
+        """`outcomes` is a list of (seq, status, response_id, error)."""
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "UPDATE submission SET status = ?, response_id = ?, error = ?, processed_at = ? WHERE seq = ?",
+                [(status, response_id, error, now, seq) for seq, status, response_id, error in outcomes],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def lookup(self, receipt):
+        row = self._connection().execute(
+            "SELECT status, response_id, error FROM submission WHERE receipt = ?", (receipt,)
+        ).fetchone()
+        if row is None:
+            return None
+        status, response_id, error = row
+        if status == STATUS_PROCESSING:
+            status = STATUS_PENDING
+        return {"receipt": receipt, "status": status, "response_id": response_id, "error": error}
+
+    def backlog(self):
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM submission WHERE status IN (?, ?)", (STATUS_PENDING, STATUS_PROCESSING)
+        ).fetchone()[0]
+
+    def prune(self, max_age):
+        cursor = self._connection().execute(
+            "DELETE FROM submission WHERE processed_at IS NOT NULL AND processed_at < ?",
+            (time.time() - max_age,),
+        )
+        return cursor.rowcount
+
+
+_journals = {}
+_journals_lock = threading.Lock()
+
+
+def get_journal():
+    path = str(settings.SUBMISSION_QUEUE_PATH)
+    with _journals_lock:
+        journal = _journals.get(path)
+        if journal is None:
+            journal = _journals[path] = SubmissionJournal(path)
+    return journal
+
+
+def queue_enabled():
+    return settings.SUBMISSION_INGEST_MODE == "queue"
+
+
+def flush_batch(journal, batch_size):
+    """Returns the number of entries settled."""
+    batch = journal.claim(batch_size)
+    if not batch:
+        return 0
+    results = store_submissions([payload for _, payload in batch])
+
+    outcomes = []
+    for (seq, _), (status, response_id) in zip(batch, results):
+        error = None
+        if status == STATUS_DUPLICATE:
+            error = DUPLICATE_RESPONSE_MESSAGE
+        elif status == STATUS_FAILED:
+            error = FAILED_MESSAGE
+        outcomes.append((seq, status, response_id, error))
+    journal.resolve(outcomes)
+    return len(outcomes)
+
+
+def flush_forever(journal, batch_size=FLUSH_BATCH_SIZE, interval=FLUSH_INTERVAL, retain=RECEIPT_RETENTION):
+    last_prune = 0.0
+    while True:
+        close_old_connections()
+        flushed = flush_batch(journal, batch_size)
+        if time.monotonic() - last_prune > 60:
+            journal.prune(retain)
+            last_prune = time.monotonic()
+        if not flushed:
+            time.sleep(interval)
+
+
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def start_flusher():
+    """Drain the journal from a daemon thread of this process (SUBMISSION_FLUSH_MODE "thread").
+
+    The journal is a file local to the container, so the web process that
+    appends to it is also the one that writes it out. Every worker runs a
+    flusher; claim() keeps them from taking the same entries.
+    """
+    global _flusher
+    if getattr(settings, "SUBMISSION_FLUSH_MODE", "thread") != "thread":
+        return
+    with _flusher_lock:
+        if _flusher is not None and _flusher.is_alive():
+            return
+
+        def run():
+            journal = get_journal()
+            while True:
+                try:
+                    flush_forever(journal)
+                except Exception:
+                    logger.exception("Submission flusher failed; restarting")
+                    connection.close()
+                    time.sleep(FLUSH_INTERVAL)
+
+        _flusher = threading.Thread(target=run, name="submission-flusher", daemon=True)
+        _flusher.start()
+
+
+def receipt_status(receipt):
+    entry = get_journal().lookup(receipt)
+    if entry is None:
+        return None
+    data = {"receipt": receipt, "status": entry["status"]}
+    if entry["status"] == STATUS_STORED:
+        data["id"] = entry["response_id"]
+    elif entry["error"]:
+        data["detail"] = entry["error"]
+    return data
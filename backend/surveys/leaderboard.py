@@ -0,0 +1,136 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import F, Sum
+
+from .models import Driver, DriverDailyStat
+
+# Snapshots kept per worker; the least recently used window is dropped first.
+MAX_SNAPSHOTS = 64
+
+
+class LeaderboardSnapshot:
+    """Ranking of the active drivers by Bayesian-smoothed average rating."""
+
+    def __init__(self, rows, prior_weight):
+        self.built_at = time.monotonic()
+        total_sum = sum(row["rating_sum"] for row in rows)
+        total_count = sum(row["rating_count"] for row in rows)
+        self.prior_weight = prior_weight
+        self.prior_mean = total_sum / total_count if total_count else None
+
+        entries = []
+        for row in rows:
+            score = (prior_weight * self.prior_mean + row["rating_sum"]) / (prior_weight + row["rating_count"])
+            entries.append(
+                {
+                    "driver_id": row["driver_id"],
+                    "label": Driver.format_label(row["last_name"], row["name"], row["car_number"]),
+                    "score": score,
+                    "rating_avg": row["rating_sum"] / row["rating_count"],
+                    "rating_count": row["rating_count"],
+                    "response_count": row["response_count"],
+                }
+            )
+        entries.sort(key=lambda entry: (-entry["score"], -entry["rating_count"], entry["driver_id"]))
+        self.entries = entries
+        self._keys = [-entry["score"] for entry in entries]
+        self._scores = {entry["driver_id"]: entry["score"] for entry in entries}
+        self._positions = {entry["driver_id"]: idx for idx, entry in enumerate(entries)}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def rank(self, driver_id):
+        """1-based rank (drivers with the same score share it), or None if unranked."""
+        score = self._scores.get(driver_id)
+        if score is None:
+            return None
+        return bisect_left(self._keys, -score) + 1
+
+    def percentile(self, driver_id):
+        """Share of ranked drivers scoring below, counting ties as half; None if unranked."""
+        score = self._scores.get(driver_id)
+        if score is None:
+            return None
+        above = bisect_left(self._keys, -score)
+        level = bisect_right(self._keys, -score) - above
+        below = len(self._keys) - above - level
+        return round(100 * (below + level / 2) / len(self._keys), 1)
+
+    def _ranked(self, entries):
+        return [{"rank": self.rank(entry["driver_id"]), **entry} for entry in entries]
+
+    def top(self, limit):
+        return self._ranked(self.entries[:limit])
+
+    def bottom(self, limit):
+        return self._ranked(reversed(self.entries[-limit:] if limit else []))
+
+    def entry(self, driver_id):
+        position = self._positions.get(driver_id)
+        if position is None:
+            return None
+        return self._ranked([self.entries[position]])[0]
+
+
+_snapshots = OrderedDict()
+_lock = threading.Lock()
+
+
+def _max_age():
+    return getattr(settings, "LEADERBOARD_MAX_AGE", 60)
+
+
+def _prior_weight():
+    return getattr(settings, "LEADERBOARD_PRIOR_WEIGHT", 10)
+
+
+def _load(survey_id, date_from, date_to):
+    stats = DriverDailyStat.objects.filter(driver__is_active=True)
+    if survey_id is not None:
+        stats = stats.filter(survey_id=survey_id)
+    if date_from is not None:
+        stats = stats.filter(day__gte=date_from)
+    if date_to is not None:
+        stats = stats.filter(day__lte=date_to)
+    return list(
+        stats.values(
+            "driver_id",
+            last_name=F("driver__last_name"),
+            name=F("driver__name"),
+            car_number=F("driver__car_number"),
+        )
+        .annotate(
+            rating_sum=Sum("rating_sum"),
+            rating_count=Sum("rating_count"),
+            response_count=Sum("response_count"),
+        )
+        .filter(rating_count__gt=0)
+        .order_by()
+    )
+
+
+def get_leaderboard(survey_id=None, date_from=None, date_to=None):
+    key = (survey_id, date_from, date_to)
+    snapshot = _snapshots.get(key)
+    if snapshot is not None and time.monotonic() - snapshot.built_at < _max_age():
+        return snapshot
+
+    with _lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is None or time.monotonic() - snapshot.built_at >= _max_age():
+            snapshot = LeaderboardSnapshot(_load(survey_id, date_from, date_to), _prior_weight())
+            _snapshots[key] = snapshot
+        _snapshots.move_to_end(key)
+        while len(_snapshots) > MAX_SNAPSHOTS:
+            _snapshots.popitem(last=False)
+    return snapshot
+
+
+def invalidate_leaderboards():
+    with _lock:
+        _snapshots.clear()
@@ -0,0 +1,134 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from surveys.models import Choice, Driver, Question, Survey
+from surveys.pivot import dashboard_rows
+from surveys.renderers import ORJSONParser, ORJSONRenderer
+from surveys.serializers import DriverSerializer, SurveyPublicSerializer
+from surveys.submissions import write_responses
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF's stdlib JSON renderer/parser with the orjson ones on real "
+        "serializer output (driver list, survey schema, dashboard table) and check "
+        "that both produce identical bytes. Runs inside a transaction that is "
+        "rolled back, so no data is kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--drivers", type=int, default=5000)
+        parser.add_argument("--questions", type=int, default=50)
+        parser.add_argument("--responses", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            payloads = self._payloads(options)
+            self.stdout.write(
+                f"{'payload':>16} {'KiB':>8} {'stdlib ms':>10} {'orjson ms':>10} {'speedup':>8} {'identical':>10}"
+            )
+            for name, data in payloads.items():
+                self._compare_render(name, data, options["repeat"])
+            body = ORJSONRenderer().render(payloads["submission"])
+            self._compare_parse("parse submission", body, options["repeat"])
+            transaction.set_rollback(True)
+
+    def _time(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def _compare_render(self, name, data, repeat):
+        stdlib, expected = self._time(lambda: JSONRenderer().render(data), repeat)
+        fast, actual = self._time(lambda: ORJSONRenderer().render(data), repeat)
+        self.stdout.write(
+            f"{name:>16} {len(expected) / 1024:>8.0f} {stdlib * 1000:>10.2f} {fast * 1000:>10.2f} "
+            f"{stdlib / fast:>7.1f}x {str(expected == actual):>10}"
+        )
+
+    def _compare_parse(self, name, body, repeat, loops=100):
+        # One parse is a few microseconds: time `loops` of them, best of `repeat`.
+        stdlib, expected = self._time(
+            lambda: [JSONParser().parse(io.BytesIO(body)) for _ in range(loops)], repeat
+        )
+        fast, actual = self._time(
+            lambda: [ORJSONParser().parse(io.BytesIO(body)) for _ in range(loops)], repeat
+        )
+        self.stdout.write(
+            f"{name:>16} {len(body) / 1024:>8.0f} {stdlib * 1000 / loops:>10.3f} "
+            f"{fast * 1000 / loops:>10.3f} {stdlib / fast:>7.1f}x {str(expected == actual):>10}"
+        )
+
+    def _payloads(self, options):
+        survey = Survey.objects.create(title="Бенчмарк судалгаа", is_active=True)
+        Question.objects.bulk_create(
+            [
+                Question(
+                    survey=survey,
+                    text=f"Жолоочийн үйлчилгээ {idx}?",
+                    question_type=Question.TYPE_MULTI if idx % 2 else Question.TYPE_RATING,
+                    order=idx,
+                )
+                for idx in range(options["questions"])
+            ]
+        )
+        questions = list(Question.objects.filter(survey=survey).order_by("order", "id"))
+        Choice.objects.bulk_create(
+            [
+                Choice(question=question, text=f"Сонголт {c_idx}", order=c_idx)
+                for question in questions
+                if question.question_type == Question.TYPE_MULTI
+                for c_idx in range(4)
+            ]
+        )
+        choices = {}
+        for choice_id, question_id in Choice.objects.filter(question__survey=survey).values_list(
+            "id", "question_id"
+        ):
+            choices.setdefault(question_id, []).append(choice_id)
+
+        Driver.objects.bulk_create(
+            [
+                Driver(
+                    name=f"Бат{idx}",
+                    last_name="Дорж",
+                    phone_number=f"99{idx:06d}",
+                    car_number=f"{idx % 10000:04d}УБА",
+                )
+                for idx in range(options["drivers"])
+            ],
+            batch_size=1000,
+        )
+        drivers = list(Driver.objects.order_by("id").values_list("id", flat=True))
+
+        answers = []
+        for question in questions:
+            if question.question_type == Question.TYPE_MULTI:
+                answers.append({"question_id": question.id, "choice_ids": choices[question.id][:2]})
+            else:
+                answers.append({"question_id": question.id, "rating_value": 4})
+        write_responses(
+            [
+                {"survey_id": survey.id, "driver_id": driver_id, "answers": answers}
+                for driver_id in drivers[: options["responses"]]
+            ]
+        )
+
+        survey = Survey.objects.prefetch_related("questions__choices").get(pk=survey.pk)
+        rows, _ = dashboard_rows(survey_id=survey.id, question_limit=None)
+        return {
+            "drivers": DriverSerializer(Driver.objects.order_by("name", "last_name", "id"), many=True).data,
+            "survey schema": SurveyPublicSerializer(survey).data,
+            "dashboard table": {"rows": rows, "next": None},
+            "submission": {"survey_id": survey.id, "driver_id": drivers[0], "answers": answers},
+        }
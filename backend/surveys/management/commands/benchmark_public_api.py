@@ -0,0 +1,63 @@
+import http.client
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the public survey endpoints of a running server with many "
+        "concurrent keep-alive clients. Run it once against the WSGI server and "
+        "once against the ASGI server (ASYNC_PUBLIC_API=1) to compare."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server base URL.")
+        parser.add_argument("--slug", required=True, help="Slug of an active survey.")
+        parser.add_argument("--search", default="", help="Driver search text.")
+        parser.add_argument("--concurrency", type=int, default=300)
+        parser.add_argument("--requests", type=int, default=3000, help="Requests per endpoint.")
+
+    def handle(self, *args, **options):
+        base = urlsplit(options["url"])
+        if base.scheme != "http":
+            raise CommandError("Only plain http:// URLs are supported.")
+        paths = {
+            "survey detail": f"/api/surveys/active/{quote(options['slug'])}/",
+            "driver search": f"/api/drivers/active/?search={quote(options['search'])}",
+        }
+        local = threading.local()
+
+        def fetch(path):
+            conn = getattr(local, "conn", None)
+            if conn is None:
+                conn = local.conn = http.client.HTTPConnection(base.hostname, base.port or 80, timeout=30)
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                local.conn = None
+                ok = False
+            return ok, time.perf_counter() - started
+
+        self.stdout.write(f"{'endpoint':>14} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+        for name, path in paths.items():
+            with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+                started = time.perf_counter()
+                results = list(pool.map(fetch, [path] * options["requests"]))
+                elapsed = time.perf_counter() - started
+            latencies = sorted(duration for _, duration in results)
+            errors = sum(1 for ok, _ in results if not ok)
+            p95 = latencies[int(len(latencies) * 0.95) - 1]
+            self.stdout.write(
+                f"{name:>14} {len(results) / elapsed:9.0f} {statistics.median(latencies) * 1000:8.1f} "
+                f"{p95 * 1000:8.1f} {errors:7d}"
+            )
@@ -0,0 +1,120 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from surveys.models import Choice, Driver, Question, Survey
+from surveys.readers import DRIVER_READER, public_survey_data
+from surveys.renderers import ORJSONRenderer
+from surveys.serializers import DriverSerializer, SurveyPublicSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Check that the compiled readers (surveys/readers.py) render exactly the "
+        "same JSON as the DRF serializers, on the existing data and on a synthetic "
+        "survey and roster, and compare their speed. Synthetic rows are created "
+        "inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--drivers", type=int, default=20000)
+        parser.add_argument("--questions", type=int, default=50)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.stdout.write("Existing data:")
+        mismatches = self._compare_all(Survey.objects.all(), Driver.objects.all(), 1)
+
+        with transaction.atomic():
+            survey = self._build(options)
+            self.stdout.write(f"Synthetic ({options['questions']} questions, {options['drivers']} drivers):")
+            mismatches += self._compare_all(
+                Survey.objects.filter(pk=survey.pk),
+                Driver.objects.filter(last_name="Бенчмарк"),
+                options["repeat"],
+            )
+            transaction.set_rollback(True)
+
+        if mismatches:
+            raise CommandError(f"{mismatches} payload(s) differ from the DRF serializers.")
+
+    def _compare_all(self, surveys, drivers, repeat):
+        drivers = drivers.order_by("name", "last_name", "id")
+        self.stdout.write(f"{'payload':>10} {'rows':>7} {'DRF ms':>9} {'compiled ms':>12} {'speedup':>8} {'identical':>10}")
+        return sum(
+            [
+                self._compare(
+                    "surveys",
+                    surveys.count(),
+                    lambda: SurveyPublicSerializer(
+                        surveys.prefetch_related("questions__choices"), many=True
+                    ).data,
+                    lambda: public_survey_data(surveys),
+                    repeat,
+                ),
+                self._compare(
+                    "drivers",
+                    drivers.count(),
+                    lambda: DriverSerializer(drivers, many=True).data,
+                    lambda: DRIVER_READER.to_data(DRIVER_READER.values(drivers)),
+                    repeat,
+                ),
+            ]
+        )
+
+    def _time(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = ORJSONRenderer().render(func())
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, body
+
+    def _compare(self, name, count, drf, compiled, repeat):
+        slow, expected = self._time(drf, repeat)
+        fast, actual = self._time(compiled, repeat)
+        identical = expected == actual
+        self.stdout.write(
+            f"{name:>10} {count:>7} {slow * 1000:>9.1f} {fast * 1000:>12.1f} "
+            f"{slow / fast:>7.1f}x {str(identical):>10}"
+        )
+        return 0 if identical else 1
+
+    def _build(self, options):
+        survey = Survey.objects.create(title="Бенчмарк судалгаа", description="Тест", is_active=True)
+        Question.objects.bulk_create(
+            [
+                Question(
+                    survey=survey,
+                    text=f"Жолоочийн үйлчилгээ {idx}?",
+                    question_type=Question.TYPE_MULTI if idx % 2 else Question.TYPE_RATING,
+                    is_required=bool(idx % 3),
+                    # Repeated orders exercise the id tie-break.
+                    order=idx // 2,
+                )
+                for idx in range(options["questions"])
+            ]
+        )
+        Choice.objects.bulk_create(
+            [
+                Choice(question=question, text=f"Сонголт {c_idx}", order=(4 - c_idx) % 3)
+                for question in Question.objects.filter(survey=survey, question_type=Question.TYPE_MULTI)
+                for c_idx in range(4)
+            ]
+        )
+        Driver.objects.bulk_create(
+            [
+                Driver(
+                    name=f"Бат{idx % 997}",
+                    last_name="Бенчмарк",
+                    phone_number=f"88{idx:06d}",
+                    car_number=f"{idx % 10000:04d}УБА",
+                    is_active=bool(idx % 7),
+                )
+                for idx in range(options["drivers"])
+            ],
+            batch_size=1000,
+        )
+        return survey
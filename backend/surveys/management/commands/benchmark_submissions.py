@@ -0,0 +1,87 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from surveys.models import Choice, Driver, Question, Survey
+from surveys.serializers import ResponseCreateSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure queries and time per survey submission for growing survey sizes. "
+        "Runs inside a transaction that is rolled back, so no data is kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=[5, 20, 60],
+            help="Number of questions per generated survey.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'questions':>10} {'validate':>10} {'create':>8} {'ms':>8}")
+        with transaction.atomic():
+            for size in options["sizes"]:
+                validate_queries, create_queries, elapsed = self._run(size)
+                self.stdout.write(
+                    f"{size:>10} {validate_queries:>10} {create_queries:>8} {elapsed * 1000:>8.1f}"
+                )
+            transaction.set_rollback(True)
+
+    def _run(self, size):
+        survey = Survey.objects.create(title=f"benchmark {size}", is_active=True)
+        driver = Driver.objects.create(name="benchmark")
+        question_types = [Question.TYPE_RATING, Question.TYPE_SINGLE, Question.TYPE_MULTI, Question.TYPE_TEXT]
+        Question.objects.bulk_create(
+            [
+                Question(survey=survey, text=f"Q{idx}", question_type=question_types[idx % 4], order=idx)
+                for idx in range(size)
+            ]
+        )
+        questions = list(Question.objects.filter(survey=survey).order_by("order", "id"))
+        Choice.objects.bulk_create(
+            [
+                Choice(question=question, text=f"C{c_idx}", order=c_idx)
+                for question in questions
+                if question.question_type in (Question.TYPE_SINGLE, Question.TYPE_MULTI)
+                for c_idx in range(4)
+            ]
+        )
+        choice_map = {}
+        for choice_id, question_id in Choice.objects.filter(
+            question__survey=survey
+        ).values_list("id", "question_id"):
+            choice_map.setdefault(question_id, []).append(choice_id)
+
+        answers = []
+        for question in questions:
+            payload = {"question_id": question.id}
+            if question.question_type == Question.TYPE_RATING:
+                payload["rating_value"] = 4
+            elif question.question_type == Question.TYPE_SINGLE:
+                payload["choice_ids"] = choice_map[question.id][:1]
+            elif question.question_type == Question.TYPE_MULTI:
+                payload["choice_ids"] = choice_map[question.id][:3]
+            else:
+                payload["text_value"] = "benchmark"
+            answers.append(payload)
+
+        serializer = ResponseCreateSerializer(
+            data={"survey_id": survey.id, "driver_id": driver.id, "answers": answers}
+        )
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as validate_ctx:
+            serializer.is_valid(raise_exception=True)
+        with CaptureQueriesContext(connection) as create_ctx:
+            serializer.save()
+        elapsed = time.perf_counter() - started
+        # Savepoint statements from transaction.atomic are not round trips to the tables.
+        create_queries = sum(
+            1 for query in create_ctx.captured_queries if "SAVEPOINT" not in query["sql"]
+        )
+        return len(validate_ctx.captured_queries), create_queries, elapsed
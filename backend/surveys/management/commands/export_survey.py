@@ -0,0 +1,45 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from surveys.exports import ExportDependencyError, stream_csv, write_parquet, write_xlsx
+from surveys.models import Survey
+
+
+class Command(BaseCommand):
+    help = "Export every response of a survey as CSV, XLSX or Parquet"
+
+    def add_arguments(self, parser):
+        parser.add_argument("survey_id", type=int)
+        parser.add_argument("--format", choices=["csv", "xlsx", "parquet"], default="csv", dest="file_format")
+        parser.add_argument(
+            "--output",
+            help="Destination file. CSV is written to stdout when omitted.",
+        )
+
+    def handle(self, *args, **options):
+        survey_id = options["survey_id"]
+        if not Survey.objects.filter(id=survey_id).exists():
+            raise CommandError(f"Survey {survey_id} does not exist.")
+
+        file_format = options["file_format"]
+        output = options["output"]
+        if file_format == "csv":
+            handle = open(output, "w", encoding="utf-8", newline="") if output else sys.stdout
+            try:
+                for chunk in stream_csv(survey_id):
+                    handle.write(chunk)
+            finally:
+                if output:
+                    handle.close()
+            return
+
+        if not output:
+            raise CommandError(f"--output is required for {file_format} exports.")
+        writer = write_xlsx if file_format == "xlsx" else write_parquet
+        try:
+            with open(output, "wb") as handle:
+                writer(survey_id, handle)
+        except ExportDependencyError as exc:
+            raise CommandError(str(exc))
+        self.stderr.write(self.style.SUCCESS(f"Wrote {output}"))
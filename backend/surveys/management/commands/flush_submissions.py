@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from surveys.ingest import FLUSH_BATCH_SIZE, FLUSH_INTERVAL, RECEIPT_RETENTION, flush_batch, get_journal
+
+
+class Command(BaseCommand):
+    help = "Write journaled survey submissions to the database in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=FLUSH_BATCH_SIZE)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and poll the journal instead of exiting once it is empty.",
+        )
+        parser.add_argument("--interval", type=float, default=FLUSH_INTERVAL, help="Seconds to sleep when idle.")
+        parser.add_argument(
+            "--retain-hours",
+            type=float,
+            default=RECEIPT_RETENTION / 3600,
+            help="How long settled receipts stay available to the status endpoint.",
+        )
+
+    def handle(self, *args, **options):
+        journal = get_journal()
+        retain = options["retain_hours"] * 3600
+        total = 0
+        last_prune = 0.0
+        while True:
+            flushed = flush_batch(journal, options["batch_size"])
+            total += flushed
+            if time.monotonic() - last_prune > 60:
+                journal.prune(retain)
+                last_prune = time.monotonic()
+            if flushed:
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS(f"Flushed {total} submissions"))
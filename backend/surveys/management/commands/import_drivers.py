@@ -0,0 +1,46 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from surveys.imports import CHUNK_SIZE, FORMATS, DriverImportError, import_drivers, iter_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Create or update drivers from a CSV/XLSX file (columns: Овог, Нэр, Утасны дугаар, "
+        "Машины дугаар). Drivers are matched on phone number, then on plate."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=FORMATS, dest="file_format", help="Defaults to the file extension.")
+        parser.add_argument(
+            "--deactivate-missing",
+            action="store_true",
+            help="Deactivate active drivers that are not in the file.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["file_format"] or os.path.splitext(path)[1].lstrip(".").lower()
+        try:
+            with open(path, "rb") as handle:
+                result = import_drivers(
+                    iter_rows(handle, file_format),
+                    deactivate_missing=options["deactivate_missing"],
+                    chunk_size=options["chunk_size"],
+                )
+        except (OSError, DriverImportError) as exc:
+            raise CommandError(str(exc))
+
+        for error in result.errors:
+            self.stderr.write(f"line {error['line']}: {error['detail']}")
+        if options["deactivate_missing"] and result.skipped:
+            self.stderr.write(self.style.WARNING("Rows were skipped, so no drivers were deactivated."))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"inserted={result.inserted} updated={result.updated} "
+                f"deactivated={result.deactivated} skipped={result.skipped}"
+            )
+        )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from surveys.stats import rebuild_survey_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the pre-aggregated survey statistics from raw responses"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--survey",
+            type=int,
+            action="append",
+            dest="survey_ids",
+            help="Only rebuild this survey id (repeatable). Defaults to all surveys.",
+        )
+
+    def handle(self, *args, **options):
+        survey_ids = options["survey_ids"]
+        rebuild_survey_stats(survey_ids)
+        scope = ", ".join(str(survey_id) for survey_id in survey_ids) if survey_ids else "all surveys"
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt survey statistics for {scope}"))
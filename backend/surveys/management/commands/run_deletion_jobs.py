@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from surveys.deletion import BATCH_SIZE, pending_deletion_jobs, run_deletion_job
+
+
+class Command(BaseCommand):
+    help = "Run queued and interrupted bulk response deletions (POST /api/admin/responses/delete/)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and poll for new jobs instead of exiting when none are left.",
+        )
+        parser.add_argument("--interval", type=float, default=5, help="Seconds to sleep when idle.")
+        parser.add_argument("--retry-failed", action="store_true", help="Resume failed jobs as well.")
+
+    def handle(self, *args, **options):
+        # A job that fails again isn't retried within the same run.
+        attempted = set()
+        while True:
+            job_ids = [
+                job_id
+                for job_id in pending_deletion_jobs(include_failed=options["retry_failed"])
+                if job_id not in attempted
+            ]
+            attempted.update(job_ids)
+            for job_id in job_ids:
+                job = run_deletion_job(
+                    job_id, batch_size=options["batch_size"], include_failed=options["retry_failed"]
+                )
+                if job is None:
+                    continue
+                message = (
+                    f"Job {job.pk}: {job.status}, {job.deleted_responses}/{job.total_responses} responses"
+                )
+                if job.status == job.STATUS_FAILED:
+                    self.stderr.write(self.style.ERROR(f"{message} ({job.error})"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(message))
+            if job_ids:
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,51 @@
+# Generated manually for driver search
+
+from django.db import migrations, models
+
+from surveys.search import (
+    driver_search_key,
+    install_driver_search_index,
+    uninstall_driver_search_index,
+)
+
+
+def backfill_search_key(apps, schema_editor):
+    Driver = apps.get_model("surveys", "Driver")
+    batch = []
+    for driver in Driver.objects.only("id", "last_name", "name", "phone_number", "car_number").iterator(
+        chunk_size=1000
+    ):
+        driver.search_key = driver_search_key(
+            driver.last_name, driver.name, driver.phone_number, driver.car_number
+        )
+        batch.append(driver)
+        if len(batch) >= 1000:
+            Driver.objects.bulk_update(batch, ["search_key"])
+            batch = []
+    if batch:
+        Driver.objects.bulk_update(batch, ["search_key"])
+
+
+def install_index(apps, schema_editor):
+    install_driver_search_index(schema_editor)
+
+
+def uninstall_index(apps, schema_editor):
+    uninstall_driver_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0006_add_performance_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='driver',
+            name='search_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=400),
+        ),
+        migrations.RunPython(backfill_search_key, migrations.RunPython.noop),
+        migrations.RunPython(install_index, uninstall_index),
+    ]
@@ -0,0 +1,109 @@
+# Generated manually for pre-aggregated survey statistics
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def rating_aggregates():
+    aggregates = {
+        'rating_count': Count('rating_value'),
+        'rating_sum': Sum('rating_value', default=0),
+    }
+    for value in range(1, 6):
+        aggregates[f'rating_{value}'] = Count('id', filter=Q(rating_value=value))
+    return aggregates
+
+
+def backfill_stats(apps, schema_editor):
+    Response = apps.get_model('surveys', 'Response')
+    Answer = apps.get_model('surveys', 'Answer')
+    AnswerChoice = apps.get_model('surveys', 'AnswerChoice')
+    SurveyDailyStat = apps.get_model('surveys', 'SurveyDailyStat')
+    QuestionDailyStat = apps.get_model('surveys', 'QuestionDailyStat')
+    ChoiceStat = apps.get_model('surveys', 'ChoiceStat')
+
+    SurveyDailyStat.objects.bulk_create(
+        (
+            SurveyDailyStat(**row)
+            for row in Response.objects.annotate(day=TruncDate('submitted_at'))
+            .values('survey_id', 'day')
+            .annotate(response_count=Count('id'), last_submitted_at=Max('submitted_at'))
+            .order_by()
+        ),
+        batch_size=1000,
+    )
+    QuestionDailyStat.objects.bulk_create(
+        (
+            QuestionDailyStat(**row)
+            for row in Answer.objects.filter(rating_value__isnull=False)
+            .annotate(day=TruncDate('response__submitted_at'))
+            .values('question_id', 'day')
+            .annotate(**rating_aggregates())
+            .order_by()
+        ),
+        batch_size=1000,
+    )
+    ChoiceStat.objects.bulk_create(
+        (
+            ChoiceStat(**row)
+            for row in AnswerChoice.objects.values('choice_id').annotate(count=Count('id')).order_by()
+        ),
+        batch_size=1000,
+    )
+
+
+def rating_fields():
+    return [
+        ('rating_count', models.PositiveIntegerField(default=0)),
+        ('rating_sum', models.PositiveIntegerField(default=0)),
+        ('rating_1', models.PositiveIntegerField(default=0)),
+        ('rating_2', models.PositiveIntegerField(default=0)),
+        ('rating_3', models.PositiveIntegerField(default=0)),
+        ('rating_4', models.PositiveIntegerField(default=0)),
+        ('rating_5', models.PositiveIntegerField(default=0)),
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0007_driver_search_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveyDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('survey', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='surveys.survey')),
+                ('day', models.DateField()),
+                ('response_count', models.PositiveIntegerField(default=0)),
+                ('last_submitted_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'unique_together': {('survey', 'day')},
+            },
+        ),
+        migrations.CreateModel(
+            name='QuestionDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ] + rating_fields() + [
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='surveys.question')),
+                ('day', models.DateField()),
+            ],
+            options={
+                'unique_together': {('question', 'day')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ChoiceStat',
+            fields=[
+                ('choice', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stat', serialize=False, to='surveys.choice')),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated manually for bulk driver import
+
+from django.db import migrations, models
+
+from surveys.search import (
+    canonical_phone,
+    canonical_plate,
+    driver_search_key,
+    install_driver_search_index,
+)
+
+
+def canonicalize_drivers(apps, schema_editor):
+    """
+    Rewrite phone numbers and plates in their stored form. Phone numbers
+    become unique, so the migration stops, listing the drivers, when several
+    drivers have the same one.
+    """
+    Driver = apps.get_model("surveys", "Driver")
+    phones = {}
+    batch = []
+    drivers = Driver.objects.order_by("id").only("id", "last_name", "name", "phone_number", "car_number")
+    for driver in drivers.iterator(chunk_size=1000):
+        phone = canonical_phone(driver.phone_number)
+        plate = canonical_plate(driver.car_number)
+        if phone:
+            phones.setdefault(phone, []).append(driver.id)
+        if phone == driver.phone_number and plate == driver.car_number:
+            continue
+        driver.phone_number = phone
+        driver.car_number = plate
+        driver.search_key = driver_search_key(driver.last_name, driver.name, phone, plate)
+        batch.append(driver)
+        if len(batch) >= 1000:
+            Driver.objects.bulk_update(batch, ["phone_number", "car_number", "search_key"])
+            batch = []
+    if batch:
+        Driver.objects.bulk_update(batch, ["phone_number", "car_number", "search_key"])
+
+    duplicates = {phone: ids for phone, ids in phones.items() if len(ids) > 1}
+    if duplicates:
+        report = "\n".join(
+            f"  {phone}: drivers {', '.join(map(str, ids))}" for phone, ids in sorted(duplicates.items())
+        )
+        raise RuntimeError(
+            "Several drivers share a phone number. Give each one its own number (or clear it) "
+            f"and migrate again:\n{report}"
+        )
+
+
+def install_index(apps, schema_editor):
+    # SQLite rebuilds the driver table for the field changes (either way),
+    # dropping the search triggers.
+    install_driver_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0008_survey_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, install_index),
+        migrations.RunPython(canonicalize_drivers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='driver',
+            name='phone_number',
+            field=models.CharField(blank=True, max_length=20, null=True, unique=True, verbose_name='Утасны дугаар'),
+        ),
+        migrations.AlterField(
+            model_name='driver',
+            name='car_number',
+            field=models.CharField(blank=True, db_index=True, max_length=20, null=True, verbose_name='Машины дугаар'),
+        ),
+        migrations.RunPython(install_index, migrations.RunPython.noop),
+    ]
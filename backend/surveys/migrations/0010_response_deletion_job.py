@@ -0,0 +1,37 @@
+# Generated manually for background response deletion
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0009_driver_unique_phone_car'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResponseDeletionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('survey_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('driver_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Хүлээгдэж буй'), ('running', 'Ажиллаж буй'), ('done', 'Дууссан'), ('failed', 'Алдаатай')], db_index=True, default='pending', max_length=20)),
+                ('max_response_id', models.PositiveBigIntegerField(default=0)),
+                ('last_response_id', models.PositiveBigIntegerField(default=0)),
+                ('survey_ids', models.JSONField(default=list)),
+                ('total_responses', models.PositiveIntegerField(default=0)),
+                ('deleted_responses', models.PositiveIntegerField(default=0)),
+                ('deleted_answers', models.PositiveIntegerField(default=0)),
+                ('deleted_answer_choices', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
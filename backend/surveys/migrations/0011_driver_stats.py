@@ -0,0 +1,102 @@
+# Generated manually for the driver scorecard rollups
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def rating_aggregates():
+    aggregates = {
+        'rating_count': Count('rating_value'),
+        'rating_sum': Sum('rating_value', default=0),
+    }
+    for value in range(1, 6):
+        aggregates[f'rating_{value}'] = Count('id', filter=Q(rating_value=value))
+    return aggregates
+
+
+def backfill_driver_stats(apps, schema_editor):
+    Response = apps.get_model('surveys', 'Response')
+    Answer = apps.get_model('surveys', 'Answer')
+    DriverDailyStat = apps.get_model('surveys', 'DriverDailyStat')
+    DriverQuestionDailyStat = apps.get_model('surveys', 'DriverQuestionDailyStat')
+
+    key = ('driver_id', 'survey_id', 'day')
+    unrated = {'rating_count': 0, 'rating_sum': 0, **{f'rating_{value}': 0 for value in range(1, 6)}}
+    rows = {}
+    for row in (
+        Response.objects.annotate(day=TruncDate('submitted_at'))
+        .values(*key)
+        .annotate(response_count=Count('id'))
+        .order_by()
+    ):
+        rows[tuple(row[name] for name in key)] = {**row, **unrated}
+    rated = Answer.objects.filter(rating_value__isnull=False).annotate(day=TruncDate('response__submitted_at'))
+    for row in (
+        rated.values('day', driver_id=F('response__driver_id'), survey_id=F('response__survey_id'))
+        .annotate(**rating_aggregates())
+        .order_by()
+    ):
+        rows[tuple(row[name] for name in key)].update(row)
+    DriverDailyStat.objects.bulk_create((DriverDailyStat(**row) for row in rows.values()), batch_size=1000)
+
+    DriverQuestionDailyStat.objects.bulk_create(
+        (
+            DriverQuestionDailyStat(**row)
+            for row in rated.values('question_id', 'day', driver_id=F('response__driver_id'))
+            .annotate(**rating_aggregates())
+            .order_by()
+        ),
+        batch_size=1000,
+    )
+
+
+def rating_fields():
+    return [
+        ('rating_count', models.PositiveIntegerField(default=0)),
+        ('rating_sum', models.PositiveIntegerField(default=0)),
+        ('rating_1', models.PositiveIntegerField(default=0)),
+        ('rating_2', models.PositiveIntegerField(default=0)),
+        ('rating_3', models.PositiveIntegerField(default=0)),
+        ('rating_4', models.PositiveIntegerField(default=0)),
+        ('rating_5', models.PositiveIntegerField(default=0)),
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0010_response_deletion_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DriverDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ] + rating_fields() + [
+                ('driver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='surveys.driver')),
+                ('survey', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='driver_daily_stats', to='surveys.survey')),
+                ('day', models.DateField()),
+                ('response_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('driver', 'survey', 'day')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DriverQuestionDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ] + rating_fields() + [
+                ('driver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_daily_stats', to='surveys.driver')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='driver_daily_stats', to='surveys.question')),
+                ('day', models.DateField()),
+            ],
+            options={
+                'unique_together': {('driver', 'question', 'day')},
+            },
+        ),
+        migrations.RunPython(backfill_driver_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated manually for driver list ETags shared by every worker
+
+import django.utils.timezone
+from django.db import migrations, models
+
+from surveys.search import install_driver_search_index
+
+
+def install_index(apps, schema_editor):
+    # SQLite rebuilds the driver table to add the column (either way),
+    # dropping the search triggers.
+    install_driver_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0011_driver_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, install_index),
+        migrations.AddField(
+            model_name='driver',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(install_index, migrations.RunPython.noop),
+    ]
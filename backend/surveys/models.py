@@ -1,13 +1,22 @@
-from django.db import models
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import Length
 from django.utils.text import slugify
 
+from .search import canonical_phone, canonical_plate, driver_search_key
+
 
 class Driver(models.Model):
     last_name = models.CharField(max_length=120, verbose_name="Овог", blank=True)
     name = models.CharField(max_length=120, verbose_name="Нэр")
-    phone_number = models.CharField(max_length=20, blank=True, null=True, verbose_name="Утасны дугаар", db_index=True)
-    car_number = models.CharField(max_length=20, blank=True, null=True, verbose_name="Машины дугаар", db_index=True)
+    # Stored in canonical form (see surveys/search.py); bulk imports upsert on
+    # the phone number. Drivers on shifts share a car, so plates can repeat.
+    phone_number = models.CharField(max_length=20, blank=True, null=True, unique=True, verbose_name="Утасны дугаар")
+    car_number = models.CharField(max_length=20, blank=True, null=True, db_index=True, verbose_name="Машины дугаар")
     is_active = models.BooleanField(default=True, verbose_name="Идэвхтэй", db_index=True)
+    # Normalized name/phone/plate text; indexed for substring search (see surveys/search.py).
+    search_key = models.CharField(max_length=400, blank=True, default="", editable=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         verbose_name = "жолооч"
@@ -17,11 +26,76 @@ class Driver(models.Model):
         ]
 
     def __str__(self) -> str:
-        display = f"{self.last_name} {self.name}" if self.last_name else self.name
-        if self.car_number:
-            display += f" [{self.car_number}]"
+        return self.format_label(self.last_name, self.name, self.car_number)
+
+    @staticmethod
+    def format_label(last_name, name, car_number):
+        display = f"{last_name} {name}" if last_name else name
+        if car_number:
+            display += f" [{car_number}]"
         return display
 
+    def save(self, *args, **kwargs):
+        self.phone_number = canonical_phone(self.phone_number)
+        self.car_number = canonical_plate(self.car_number)
+        self.search_key = driver_search_key(
+            self.last_name, self.name, self.phone_number, self.car_number
+        )
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "phone_number", "car_number", "search_key", "updated_at"}
+        super().save(*args, **kwargs)
+
+
+# Attempts at a free slug before an IntegrityError from a concurrent create
+# is re-raised.
+SLUG_ATTEMPTS = 5
+
+
+class SurveyManager(models.Manager):
+    def slug_base(self, title):
+        # Room is left for a "-<n>" suffix. Slugs are ASCII: a Cyrillic title
+        # becomes "survey", so suffixes pile up on few bases.
+        max_length = self.model._meta.get_field("slug").max_length
+        return (slugify(title) or "survey")[: max_length - 20]
+
+    def allocate_slugs(self, base, count=1, exclude_pk=None):
+        # Bases are slugify() output, so they hold no regex metacharacters. The
+        # prefix filter lets the slug index (PostgreSQL's "_like" one) narrow
+        # the rows before the regex runs.
+        existing = self.filter(slug__startswith=base, slug__regex=rf"^{base}(-[1-9][0-9]*)?$")
+        if exclude_pk is not None:
+            existing = existing.exclude(pk=exclude_pk)
+        # The longest slug, then the highest string, has the highest number.
+        highest = existing.order_by(Length("slug").desc(), "-slug").values_list("slug", flat=True).first()
+        if highest is None:
+            start = 0
+        else:
+            start = 1 if highest == base else int(highest.rsplit("-", 1)[1]) + 1
+        return [base if number == 0 else f"{base}-{number}" for number in range(start, start + count)]
+
+    def assign_slugs(self, surveys):
+        by_base = {}
+        for survey in surveys:
+            if not survey.slug:
+                by_base.setdefault(self.slug_base(survey.title), []).append(survey)
+        for base, group in by_base.items():
+            for survey, slug in zip(group, self.allocate_slugs(base, len(group))):
+                survey.slug = slug
+
+    def bulk_create_with_slugs(self, surveys):
+        automatic = [survey for survey in surveys if not survey.slug]
+        for attempt in range(SLUG_ATTEMPTS):
+            self.assign_slugs(automatic)
+            try:
+                with transaction.atomic():
+                    return self.bulk_create(surveys)
+            except IntegrityError:
+                if not automatic or attempt == SLUG_ATTEMPTS - 1:
+                    raise
+                for survey in automatic:
+                    survey.slug = ""
+
 
 class Survey(models.Model):
     title = models.CharField(max_length=200, verbose_name="Судалгааны нэр")
@@ -31,22 +105,33 @@ class Survey(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = SurveyManager()
+
     def __str__(self) -> str:
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The stored slug, so a rename can drop the old cached schema.
+        instance._loaded_slug = instance.__dict__.get("slug")
+        return instance
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_length = self._meta.get_field("slug").max_length
-            base_slug = slugify(self.title) or "survey"
-            base_slug = base_slug[:max_length]
-            candidate = base_slug
-            suffix = 1
-            while Survey.objects.filter(slug=candidate).exclude(pk=self.pk).exists():
-                suffix_text = f"-{suffix}"
-                candidate = f"{base_slug[: max_length - len(suffix_text)]}{suffix_text}"
-                suffix += 1
-            self.slug = candidate
-        super().save(*args, **kwargs)
+        if self.slug:
+            return super().save(*args, **kwargs)
+        base = Survey.objects.slug_base(self.title)
+        for attempt in range(SLUG_ATTEMPTS):
+            self.slug = Survey.objects.allocate_slugs(base, exclude_pk=self.pk)[0]
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                # Another request took the slug between the lookup and the insert.
+                taken = Survey.objects.filter(slug=self.slug).exclude(pk=self.pk).exists()
+                self.slug = ""
+                if not taken or attempt == SLUG_ATTEMPTS - 1:
+                    raise
 
 
 class Question(models.Model):
@@ -132,3 +217,94 @@ class AnswerChoice(models.Model):
 
     class Meta:
         unique_together = [("answer", "choice")]
+
+
+class RatingRollup(models.Model):
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class SurveyDailyStat(models.Model):
+    survey = models.ForeignKey(Survey, on_delete=models.CASCADE, related_name="daily_stats")
+    day = models.DateField()
+    response_count = models.PositiveIntegerField(default=0)
+    last_submitted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = [("survey", "day")]
+
+
+class QuestionDailyStat(RatingRollup):
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name="daily_stats")
+    day = models.DateField()
+
+    class Meta:
+        unique_together = [("question", "day")]
+
+
+class ChoiceStat(models.Model):
+    choice = models.OneToOneField(Choice, on_delete=models.CASCADE, primary_key=True, related_name="stat")
+    count = models.PositiveIntegerField(default=0)
+
+
+class ResponseDeletionJob(models.Model):
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Хүлээгдэж буй"),
+        (STATUS_RUNNING, "Ажиллаж буй"),
+        (STATUS_DONE, "Дууссан"),
+        (STATUS_FAILED, "Алдаатай"),
+    ]
+
+    # Filters as plain ids: the job outlives the survey/driver it targets.
+    survey_id = models.PositiveIntegerField(null=True, blank=True)
+    driver_id = models.PositiveIntegerField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    # Responses up to max_response_id are deleted in id order; last_response_id
+    # is where a resumed run continues.
+    max_response_id = models.PositiveBigIntegerField(default=0)
+    last_response_id = models.PositiveBigIntegerField(default=0)
+    survey_ids = models.JSONField(default=list)
+    total_responses = models.PositiveIntegerField(default=0)
+    deleted_responses = models.PositiveIntegerField(default=0)
+    deleted_answers = models.PositiveIntegerField(default=0)
+    deleted_answer_choices = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Heartbeat: bumped after every batch.
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+
+class DriverDailyStat(RatingRollup):
+    driver = models.ForeignKey(Driver, on_delete=models.CASCADE, related_name="daily_stats")
+    survey = models.ForeignKey(Survey, on_delete=models.CASCADE, related_name="driver_daily_stats")
+    day = models.DateField()
+    response_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = [("driver", "survey", "day")]
+
+
+class DriverQuestionDailyStat(RatingRollup):
+    driver = models.ForeignKey(Driver, on_delete=models.CASCADE, related_name="question_daily_stats")
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name="driver_daily_stats")
+    day = models.DateField()
+
+    class Meta:
+        unique_together = [("driver", "question", "day")]
@@ -0,0 +1,116 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _cursor_value(value):
+    # Full-precision ISO strings; DjangoJSONEncoder would drop microseconds.
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination over the view's `keyset_ordering`, which must end in a unique column."""
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 50
+    max_page_size = 500
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, ordering=None):
+        self.ordering = ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        if queryset.query.is_sliced:
+            # Already capped (e.g. ranked search results).
+            return None
+
+        self.request = request
+        self.ordering = tuple(getattr(view, "keyset_ordering", None) or self.ordering or ("pk",))
+        self.limit = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self._after(position))
+
+        rows = list(queryset[: self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        rows = rows[: self.limit]
+        self.next_position = self._position(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            value = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if value <= 0:
+            return self.page_size
+        return min(value, self.max_page_size)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(self.next_position, default=_cursor_value).encode()
+        ).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([("next", self.get_next_link()), ("results", data)]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def _position(self, row):
+        values = []
+        for field in self.ordering:
+            name = field.lstrip("-")
+            if isinstance(row, dict):
+                values.append(row[name])
+            else:
+                values.append(getattr(row, name))
+        return values
+
+    def _after(self, position):
+        # (a, b, c) > (x, y, z)  ==  a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        condition = Q(pk__in=[])
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
@@ -0,0 +1,152 @@
+from django.db import connection
+
+from .models import Answer, AnswerChoice, Choice, Driver, Question, Response, Survey
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _choice_text_sql():
+    answer_choice, choice = _table(AnswerChoice), _table(Choice)
+    order = connection.ops.quote_name("order")
+    if connection.vendor == "postgresql":
+        return (
+            f"(SELECT string_agg(c.text, ', ' ORDER BY c.{order}, c.id) "
+            f"FROM {answer_choice} ac JOIN {choice} c ON c.id = ac.choice_id "
+            f"WHERE ac.answer_id = a.id)"
+        )
+    # SQLite's group_concat has no ORDER BY clause before 3.44; it keeps the
+    # order of an ordered subquery.
+    return (
+        f"(SELECT group_concat(t.text, ', ') FROM ("
+        f"SELECT c.text AS text FROM {answer_choice} ac JOIN {choice} c ON c.id = ac.choice_id "
+        f"WHERE ac.answer_id = a.id ORDER BY c.{order}, c.id) t)"
+    )
+
+
+def dashboard_rows(
+    survey_id=None,
+    driver_id=None,
+    after=None,
+    limit=None,
+    question_offset=0,
+    question_limit=8,
+):
+    """Returns (rows, next_key); next_key is None on the last page."""
+    order = connection.ops.quote_name("order")
+    where = []
+    params = []
+    if survey_id is not None:
+        where.append("r.survey_id = %s")
+        params.append(survey_id)
+    if driver_id is not None:
+        where.append("r.driver_id = %s")
+        params.append(driver_id)
+    if after is not None:
+        where.append("(r.survey_id > %s OR (r.survey_id = %s AND r.driver_id > %s))")
+        params.extend([after[0], after[0], after[1]])
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+    limit_sql = ""
+    if limit is not None:
+        limit_sql = "LIMIT %s"
+        params.append(limit + 1)
+
+    window = ["qp.position >= %s"]
+    window_params = [question_offset]
+    if question_limit is not None:
+        window.append("qp.position < %s")
+        window_params.append(question_offset + question_limit)
+
+    sql = f"""
+        WITH page AS (
+            SELECT r.id, r.survey_id, r.driver_id, r.ip_address
+            FROM {_table(Response)} r
+            {where_sql}
+            ORDER BY r.survey_id, r.driver_id
+            {limit_sql}
+        ),
+        qp AS (
+            SELECT q.id, ROW_NUMBER() OVER (PARTITION BY q.survey_id ORDER BY q.{order}, q.id) - 1 AS position
+            FROM {_table(Question)} q
+            WHERE q.survey_id IN (SELECT survey_id FROM page)
+        ),
+        cells AS (
+            SELECT a.response_id, qp.position,
+                CASE
+                    WHEN a.rating_value IS NOT NULL THEN CAST(a.rating_value AS TEXT)
+                    ELSE COALESCE({_choice_text_sql()}, NULLIF(a.text_value, ''))
+                END AS value
+            FROM {_table(Answer)} a
+            JOIN page ON page.id = a.response_id
+            JOIN qp ON qp.id = a.question_id
+            WHERE {' AND '.join(window)}
+        )
+        SELECT page.survey_id, page.driver_id, s.title, d.last_name, d.name, page.ip_address,
+            cells.position, cells.value
+        FROM page
+        JOIN {_table(Survey)} s ON s.id = page.survey_id
+        JOIN {_table(Driver)} d ON d.id = page.driver_id
+        LEFT JOIN cells ON cells.response_id = page.id
+        ORDER BY page.survey_id, page.driver_id, cells.position
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + window_params)
+        records = cursor.fetchall()
+
+    width = question_limit if question_limit is not None else _max_width(records, question_offset)
+    rows = []
+    current_key = None
+    for survey, driver, title, last_name, name, ip_address, position, value in records:
+        key = (survey, driver)
+        if key != current_key:
+            if limit is not None and len(rows) == limit:
+                return rows, current_key
+            current_key = key
+            rows.append(
+                {
+                    "id": f"{survey}-{driver}",
+                    "survey_id": survey,
+                    "driver_id": driver,
+                    "survey": title,
+                    "driver": f"{last_name} {name}".strip() if last_name else name,
+                    # (survey, driver) is unique, so each row is one response.
+                    "response_count": 1,
+                    "ip_address": ip_address or "",
+                    "answers": [[] for _ in range(width)],
+                }
+            )
+        if position is not None and value:
+            rows[-1]["answers"][position - question_offset].append(value)
+    return rows, None
+
+
+def _max_width(records, question_offset):
+    positions = [record[6] for record in records if record[6] is not None]
+    return max(positions) - question_offset + 1 if positions else 0
+
+
+def question_headers(survey_ids, question_offset=0, question_limit=None):
+    texts = {}
+    for survey_id, text in (
+        Question.objects.filter(survey_id__in=survey_ids)
+        .order_by("survey_id", "order", "id")
+        .values_list("survey_id", "text")
+    ):
+        texts.setdefault(survey_id, []).append(text)
+    end = None if question_limit is None else question_offset + question_limit
+    headers = {str(survey_id): items[question_offset:end] for survey_id, items in texts.items()}
+    total = max((len(items) for items in texts.values()), default=0)
+    return headers, total
+
+
+def to_columns(rows, width):
+    columns = [[] for _ in range(width)]
+    meta = []
+    for row in rows:
+        answers = row.pop("answers")
+        meta.append(row)
+        for idx in range(width):
+            values = answers[idx] if idx < len(answers) else []
+            columns[idx].append(" | ".join(values))
+    return meta, columns
@@ -0,0 +1,49 @@
+from rest_framework.serializers import ListSerializer
+
+FIELDS_QUERY_PARAM = "fields"
+
+
+def requested_fields(request):
+    """Parse `?fields=id,name` into a list, or None."""
+    if request is None or request.method != "GET":
+        return None
+    raw = request.query_params.get(FIELDS_QUERY_PARAM, "")
+    fields = [name.strip() for name in raw.split(",") if name.strip()]
+    return fields or None
+
+
+def project_serializer(serializer, fields):
+    if not fields:
+        return serializer
+    target = serializer.child if isinstance(serializer, ListSerializer) else serializer
+    for name in set(target.fields) - set(fields):
+        target.fields.pop(name)
+    return serializer
+
+
+def project_queryset(queryset, fields, extra=()):
+    if not fields:
+        return queryset
+    pk_name = queryset.model._meta.pk.name
+    columns = {pk_name}
+    for field in queryset.model._meta.concrete_fields:
+        if field.name in fields or field.attname in fields:
+            columns.add(field.name)
+    for name in extra:
+        name = name.lstrip("-")
+        columns.add(pk_name if name == "pk" else name)
+    return queryset.select_related(None).only(*columns)
+
+
+class FieldProjectionMixin:
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return project_queryset(
+            queryset,
+            requested_fields(self.request),
+            extra=getattr(self, "keyset_ordering", ()),
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        return project_serializer(serializer, requested_fields(self.request))
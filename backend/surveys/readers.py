@@ -0,0 +1,106 @@
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .models import Choice, Question
+from .projection import requested_fields
+from .serializers import ChoiceSerializer, DriverSerializer, QuestionSerializer, SurveyPublicSerializer
+
+# Field types whose to_representation() leaves a value read from the database
+# unchanged, so rows from .values() can be returned as they are.
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+)
+
+
+class CompiledReader:
+    """The dicts of `serializer_class(..., many=True).data`, built from `.values()` rows."""
+
+    def __init__(self, serializer_class, exclude=()):
+        self.converters = {}
+        self.names = []
+        for name, field in serializer_class().fields.items():
+            if name in exclude:
+                continue
+            if isinstance(field, serializers.BaseSerializer) or field.source != name:
+                raise ValueError(f"{serializer_class.__name__}.{name} is not a plain model column.")
+            self.names.append(name)
+            if not isinstance(field, PASSTHROUGH_FIELDS):
+                self.converters[name] = field.to_representation
+
+    def fields(self, only=None):
+        if not only:
+            return list(self.names)
+        return [name for name in self.names if name in only]
+
+    def values(self, queryset, only=None, extra=()):
+        return queryset.values(*self.fields(only), *extra)
+
+    def convert(self, row):
+        for name, to_representation in self.converters.items():
+            value = row.get(name)
+            if value is not None:
+                row[name] = to_representation(value)
+        return row
+
+    def to_data(self, rows):
+        if not self.converters:
+            return rows if isinstance(rows, list) else list(rows)
+        return [self.convert(row) for row in rows]
+
+
+class CompiledListMixin:
+    reader = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        only = requested_fields(request)
+        names = self.reader.fields(only)
+        ordering = [field.lstrip("-") for field in getattr(self, "keyset_ordering", ())]
+        extra = [name for name in ordering if name not in names]
+
+        rows = self.reader.values(queryset, only, extra)
+        page = self.paginate_queryset(rows)
+        data = self.reader.to_data(page if page is not None else rows)
+        for row in data if extra else ():
+            for name in extra:
+                del row[name]
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+DRIVER_READER = CompiledReader(DriverSerializer)
+_SURVEY_READER = CompiledReader(SurveyPublicSerializer, exclude=("questions",))
+_QUESTION_READER = CompiledReader(QuestionSerializer, exclude=("choices",))
+_CHOICE_READER = CompiledReader(ChoiceSerializer)
+
+
+def public_survey_data(queryset, extra=()):
+    """`SurveyPublicSerializer(queryset, many=True).data` from flat `.values()` queries."""
+    surveys = _SURVEY_READER.to_data(list(_SURVEY_READER.values(queryset, extra=extra)))
+    if not surveys:
+        return []
+    survey_ids = [survey["id"] for survey in surveys]
+
+    by_survey = {survey_id: [] for survey_id in survey_ids}
+    by_question = {}
+    questions = _QUESTION_READER.values(
+        Question.objects.filter(survey_id__in=survey_ids), extra=("survey_id",)
+    )
+    for question in _QUESTION_READER.to_data(list(questions)):
+        survey_id = question.pop("survey_id")
+        question["choices"] = by_question[question["id"]] = []
+        by_survey[survey_id].append(question)
+
+    choices = _CHOICE_READER.values(
+        Choice.objects.filter(question__survey_id__in=survey_ids), extra=("question_id",)
+    )
+    for choice in _CHOICE_READER.to_data(list(choices)):
+        by_question[choice.pop("question_id")].append(choice)
+
+    for survey in surveys:
+        survey["questions"] = by_survey[survey["id"]]
+    return surveys
@@ -0,0 +1,123 @@
+import hashlib
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+
+from .models import Driver
+from .search import search_terms
+
+ROSTER_VERSION_KEY = "driver-roster:generation"
+
+_PLATE = re.compile(r"^(\d+)(\D+)$")
+
+
+class RosterSnapshot:
+    """Active drivers with a sorted word index for prefix lookups."""
+
+    def __init__(self, rows, generation, stamp=None):
+        self.generation = generation
+        self.stamp = stamp
+        self.built_at = time.monotonic()
+        self.labels = {}
+        entries = []
+        for driver_id, last_name, name, car_number, search_key in rows:
+            self.labels[driver_id] = Driver.format_label(last_name, name, car_number)
+            for word in search_key.split():
+                entries.append((word, driver_id))
+                plate = _PLATE.match(word)
+                if plate:
+                    entries.append((plate.group(2), driver_id))
+        entries.sort()
+        self._words = [word for word, _ in entries]
+        self._ids = [driver_id for _, driver_id in entries]
+        self.ordered_ids = sorted(self.labels, key=lambda driver_id: (self.labels[driver_id], driver_id))
+
+        digest = hashlib.sha1()
+        for driver_id in self.ordered_ids:
+            digest.update(f"{driver_id}:{self.labels[driver_id]}\n".encode())
+        digest.update(" ".join(self._words).encode())
+        self.version = digest.hexdigest()[:16]
+
+    def _prefix_ids(self, term):
+        lo = bisect_left(self._words, term)
+        hi = bisect_left(self._words, term + "\uffff", lo)
+        return set(self._ids[lo:hi])
+
+    def search(self, query, limit):
+        terms = search_terms(query)
+        if not terms:
+            return []
+        matched = None
+        for term in terms:
+            ids = self._prefix_ids(term)
+            matched = ids if matched is None else matched & ids
+            if not matched:
+                return []
+        ordered = sorted(matched, key=lambda driver_id: (self.labels[driver_id], driver_id))
+        return [{"id": driver_id, "label": self.labels[driver_id]} for driver_id in ordered[:limit]]
+
+    def as_list(self):
+        return [{"id": driver_id, "label": self.labels[driver_id]} for driver_id in self.ordered_ids]
+
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+def _max_age():
+    return getattr(settings, "DRIVER_ROSTER_MAX_AGE", 60)
+
+
+def _current_generation():
+    return cache.get_or_set(ROSTER_VERSION_KEY, 0, None)
+
+
+def roster_stamp():
+    """Changes with every driver added, edited or removed, as seen by every worker."""
+    # Saves move the indexed updated_at; deletes and bulk imports bump the
+    # shared generation.
+    updated_at = Driver.objects.aggregate(updated_at=Max("updated_at"))["updated_at"]
+    return f"{_current_generation()}-{updated_at.timestamp() if updated_at else 0}"
+
+
+def _fresh(snapshot, generation, stamp):
+    return (
+        snapshot is not None
+        and snapshot.generation == generation
+        and (stamp is None or snapshot.stamp == stamp)
+        and time.monotonic() - snapshot.built_at < _max_age()
+    )
+
+
+def get_roster(stamp=None):
+    # `stamp` (from roster_stamp) makes a worker that missed an invalidation
+    # rebuild before serving a body under that ETag.
+    global _snapshot
+    generation = _current_generation()
+    snapshot = _snapshot
+    if _fresh(snapshot, generation, stamp):
+        return snapshot
+
+    with _lock:
+        snapshot = _snapshot
+        if not _fresh(snapshot, generation, stamp):
+            rows = Driver.objects.filter(is_active=True).values_list(
+                "id", "last_name", "name", "car_number", "search_key"
+            )
+            snapshot = RosterSnapshot(list(rows), generation, stamp)
+            _snapshot = snapshot
+    return snapshot
+
+
+def invalidate_roster():
+    global _snapshot
+    _snapshot = None
+    try:
+        cache.incr(ROSTER_VERSION_KEY)
+    except ValueError:
+        cache.set(ROSTER_VERSION_KEY, 1, None)
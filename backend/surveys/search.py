@@ -0,0 +1,172 @@
+import re
+import sqlite3
+import unicodedata
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+SQLITE_SEARCH_TABLE = "surveys_driver_search"
+
+# Trigram indexes (pg_trgm, FTS5) can't serve terms shorter than this.
+MIN_INDEXED_TERM = 3
+
+# FTS5's trigram tokenizer; older SQLite builds search with LIKE alone.
+SQLITE_TRIGRAM_VERSION = (3, 34, 0)
+
+# Latin input is folded onto Cyrillic so "bat" finds "Бат" and "uba" finds a
+# "УБА" plate. Digraphs are replaced before single letters.
+_LATIN_TO_CYRILLIC = [
+    ("kh", "х"), ("ts", "ц"), ("ch", "ч"), ("sh", "ш"),
+    ("ya", "я"), ("yo", "е"), ("yu", "ю"), ("ye", "е"),
+    ("a", "а"), ("b", "б"), ("c", "ц"), ("d", "д"), ("e", "е"), ("f", "ф"),
+    ("g", "г"), ("h", "х"), ("i", "и"), ("j", "ж"), ("k", "к"), ("l", "л"),
+    ("m", "м"), ("n", "н"), ("o", "о"), ("p", "п"), ("q", "к"), ("r", "р"),
+    ("s", "с"), ("t", "т"), ("u", "у"), ("v", "в"), ("w", "в"), ("x", "х"),
+    ("y", "и"), ("z", "з"),
+]
+
+# Letters people swap when typing Mongolian on a Russian or phone keyboard.
+_CYRILLIC_FOLD = str.maketrans({"ё": "е", "э": "е", "ө": "о", "ү": "у", "й": "и", "ъ": None, "ь": None})
+
+_NON_WORD = re.compile(r"[^0-9a-zа-яёөү]+")
+
+
+def normalize_search_text(value):
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFKC", str(value)).lower()
+    value = _NON_WORD.sub(" ", value)
+    for latin, cyrillic in _LATIN_TO_CYRILLIC:
+        value = value.replace(latin, cyrillic)
+    return " ".join(value.translate(_CYRILLIC_FOLD).split())
+
+
+def normalize_phone(value):
+    digits = re.sub(r"\D", "", value or "")
+    if len(digits) == 11 and digits.startswith("976"):
+        digits = digits[3:]
+    return digits
+
+
+def normalize_plate(value):
+    # "1234 УБА", "1234-уба" and "1234UBA" all become "1234уба".
+    return normalize_search_text(value).replace(" ", "")
+
+
+def canonical_phone(value):
+    """Stored form of a phone number: digits only, without the +976 prefix; None when empty."""
+    return normalize_phone(value) or None
+
+
+def canonical_plate(value):
+    """Stored form of a plate: "1234 уба" and "1234-УБА" become "1234УБА"; None when empty."""
+    if not value:
+        return None
+    value = unicodedata.normalize("NFKC", str(value)).upper()
+    return re.sub(r"[\W_]+", "", value) or None
+
+
+def driver_search_key(last_name, name, phone_number, car_number):
+    parts = [
+        normalize_search_text(last_name),
+        normalize_search_text(name),
+        normalize_phone(phone_number),
+        normalize_plate(car_number),
+    ]
+    return " ".join(part for part in parts if part)
+
+
+def search_terms(query):
+    terms = []
+    for term in normalize_search_text(query).split():
+        terms.append(normalize_phone(term) if term.isdigit() else term)
+    return [term for term in terms if term]
+
+
+def install_driver_search_index(schema_editor):
+    """pg_trgm index on PostgreSQL; FTS5 table and triggers on SQLite (rerun after rebuilding the table)."""
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS surveys_driver_search_key_trgm "
+            "ON surveys_driver USING gin (search_key gin_trgm_ops)"
+        )
+    elif vendor == "sqlite" and sqlite3.sqlite_version_info >= SQLITE_TRIGRAM_VERSION:
+        statements = [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_SEARCH_TABLE} USING fts5("
+            "search_key, content='surveys_driver', content_rowid='id', tokenize='trigram')",
+            f"CREATE TRIGGER IF NOT EXISTS {SQLITE_SEARCH_TABLE}_ai AFTER INSERT ON surveys_driver BEGIN "
+            f"INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, search_key) VALUES (new.id, new.search_key); END",
+            f"CREATE TRIGGER IF NOT EXISTS {SQLITE_SEARCH_TABLE}_ad AFTER DELETE ON surveys_driver BEGIN "
+            f"INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}, rowid, search_key) "
+            "VALUES ('delete', old.id, old.search_key); END",
+            f"CREATE TRIGGER IF NOT EXISTS {SQLITE_SEARCH_TABLE}_au AFTER UPDATE ON surveys_driver BEGIN "
+            f"INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}, rowid, search_key) "
+            "VALUES ('delete', old.id, old.search_key); "
+            f"INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, search_key) VALUES (new.id, new.search_key); END",
+            f"INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}) VALUES ('rebuild')",
+        ]
+        for statement in statements:
+            schema_editor.execute(statement)
+
+
+def uninstall_driver_search_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS surveys_driver_search_key_trgm")
+    elif vendor == "sqlite":
+        for suffix in ("ai", "ad", "au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {SQLITE_SEARCH_TABLE}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SQLITE_SEARCH_TABLE}")
+
+
+_sqlite_index_available = None
+
+
+def _sqlite_index_ready():
+    global _sqlite_index_available
+    if _sqlite_index_available is None:
+        _sqlite_index_available = SQLITE_SEARCH_TABLE in connection.introspection.table_names()
+    return _sqlite_index_available
+
+
+def search_drivers(queryset, query, limit):
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+
+    # Queries made only of terms shorter than MIN_INDEXED_TERM match word
+    # prefixes of active drivers ("ба" finds "Бат", not "Жамба"); longer
+    # queries match substrings. Every word-prefix hit is also a substring
+    # hit, so typing a third letter only drops drivers the new letter rules
+    # out.
+    indexed = [term for term in terms if len(term) >= MIN_INDEXED_TERM]
+    if not indexed:
+        # The trigram index can't serve these, and a substring scan for "ба"
+        # would match most drivers anyway: use the in-memory roster.
+        from .roster import get_roster
+
+        matches = get_roster().search(query, limit)
+        queryset = queryset.filter(id__in=[match["id"] for match in matches])
+    for term in terms:
+        queryset = queryset.filter(search_key__contains=term)
+
+    if connection.vendor == "sqlite" and _sqlite_index_ready():
+        if indexed:
+            match = " AND ".join(f'"{term}"' for term in indexed)
+            queryset = queryset.filter(
+                id__in=RawSQL(
+                    f"SELECT rowid FROM {SQLITE_SEARCH_TABLE} WHERE {SQLITE_SEARCH_TABLE} MATCH %s",
+                    [match],
+                )
+            )
+
+    first = terms[0]
+    rank = Case(
+        When(Q(search_key__startswith=first) | Q(search_key__contains=f" {first}"), then=Value(0)),
+        default=Value(1),
+        output_field=IntegerField(),
+    )
+    return queryset.annotate(search_rank=rank).order_by("search_rank", "name", "last_name", "id")[:limit]
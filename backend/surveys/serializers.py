@@ -1,8 +1,15 @@
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Max, Prefetch, Sum
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueValidator
 
-from .models import Answer, AnswerChoice, Choice, Driver, Question, Response, Survey
+from .models import Choice, Driver, Question, Response, ResponseDeletionJob, Survey
+from .search import canonical_phone, canonical_plate
+from .structure import aget_survey_structure, get_survey_structure, get_survey_structures
+from .submissions import write_response
 
 User = get_user_model()
 
@@ -29,7 +36,34 @@ class SurveyPublicSerializer(serializers.ModelSerializer):
         fields = ["id", "title", "slug", "description", "is_active", "questions"]
 
 
+class CanonicalCharField(serializers.CharField):
+    def __init__(self, canonical, **kwargs):
+        self.canonical = canonical
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        # "" rather than None: Driver.save() stores both as NULL, and
+        # UniqueValidator would treat None as "IS NULL".
+        return self.canonical(super().to_internal_value(data)) or ""
+
+
 class DriverSerializer(serializers.ModelSerializer):
+    phone_number = CanonicalCharField(
+        canonical_phone,
+        max_length=20,
+        required=False,
+        allow_blank=True,
+        allow_null=True,
+        validators=[UniqueValidator(Driver.objects.all())],
+    )
+    car_number = CanonicalCharField(
+        canonical_plate,
+        max_length=20,
+        required=False,
+        allow_blank=True,
+        allow_null=True,
+    )
+
     class Meta:
         model = Driver
         fields = ["id", "last_name", "name", "phone_number", "car_number", "is_active"]
@@ -72,18 +106,123 @@ class AdminUserCreateSerializer(serializers.ModelSerializer):
         user.save()
         return user
 
+class ResponseDeletionJobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ResponseDeletionJob
+        fields = [
+            "id",
+            "survey_id",
+            "driver_id",
+            "status",
+            "total_responses",
+            "deleted_responses",
+            "deleted_answers",
+            "deleted_answer_choices",
+            "progress",
+            "error",
+            "created_at",
+            "updated_at",
+            "finished_at",
+        ]
+
+    def get_progress(self, obj):
+        if obj.status == ResponseDeletionJob.STATUS_DONE:
+            return 1.0
+        if not obj.total_responses:
+            return 0.0
+        return round(min(obj.deleted_responses / obj.total_responses, 1.0), 4)
+
+
 class SurveyOverviewSerializer(serializers.ModelSerializer):
     questions = serializers.SerializerMethodField()
+    response_count = serializers.IntegerField(read_only=True, default=0)
+    last_submitted_at = serializers.DateTimeField(read_only=True, default=None)
 
     class Meta:
         model = Survey
-        fields = ["id", "title", "slug", "description", "is_active", "questions"]
+        fields = [
+            "id",
+            "title",
+            "slug",
+            "description",
+            "is_active",
+            "questions",
+            "response_count",
+            "last_submitted_at",
+        ]
 
     def get_questions(self, obj):
-        questions = obj.questions.all().order_by("order", "id")[:8]
+        # Filled by overview_queryset() with one windowed prefetch query.
+        if hasattr(obj, "overview_questions"):
+            return [question.text for question in obj.overview_questions]
+        # `question_limit` in context: None/0 returns every question.
+        limit = self.context.get("question_limit", 8)
+        questions = obj.questions.all().order_by("order", "id")
+        if limit:
+            questions = questions[:limit]
         return [question.text for question in questions]
 
 
+def overview_queryset(question_limit=8):
+    questions = Question.objects.order_by("order", "id").only("id", "survey_id", "text")
+    if question_limit:
+        questions = questions[:question_limit]
+    return (
+        Survey.objects.only("id", "title", "description", "slug", "is_active")
+        .annotate(
+            response_count=Coalesce(Sum("daily_stats__response_count"), 0),
+            last_submitted_at=Max("daily_stats__last_submitted_at"),
+        )
+        .prefetch_related(Prefetch("questions", queryset=questions, to_attr="overview_questions"))
+        .order_by("id")
+    )
+
+
+def _filled_rows(items):
+    if not isinstance(items, list):
+        return items
+    rows = []
+    for idx, item in enumerate(items):
+        if not isinstance(item, dict) or not str(item.get("text") or "").strip():
+            continue
+        row = {"order": idx}
+        row.update((key, value) for key, value in item.items() if value not in (None, ""))
+        rows.append(row)
+    return rows
+
+
+class SurveyChoiceInputSerializer(serializers.Serializer):
+    text = serializers.CharField(max_length=200)
+    order = serializers.IntegerField(min_value=0)
+
+
+class SurveyQuestionInputSerializer(serializers.Serializer):
+    text = serializers.CharField(max_length=500)
+    question_type = serializers.ChoiceField(choices=Question.TYPE_CHOICES, default=Question.TYPE_RATING)
+    is_required = serializers.BooleanField(default=True)
+    order = serializers.IntegerField(min_value=0)
+    choices = SurveyChoiceInputSerializer(many=True, required=False)
+
+    def to_internal_value(self, data):
+        if isinstance(data, dict) and "choices" in data:
+            data = {**data, "choices": _filled_rows(data["choices"])}
+        return super().to_internal_value(data)
+
+
+class SurveyBuildSerializer(SurveyAdminSerializer):
+    questions = SurveyQuestionInputSerializer(many=True, required=False)
+
+    class Meta(SurveyAdminSerializer.Meta):
+        fields = SurveyAdminSerializer.Meta.fields + ["questions"]
+
+    def to_internal_value(self, data):
+        if isinstance(data, dict) and "questions" in data:
+            data = {**data, "questions": _filled_rows(data["questions"])}
+        return super().to_internal_value(data)
+
+
 class QuestionAdminSerializer(serializers.ModelSerializer):
     class Meta:
         model = Question
@@ -112,59 +251,128 @@ class AnswerInputSerializer(serializers.Serializer):
     )
 
 
+DUPLICATE_RESPONSE_MESSAGE = "Энэ жолоочид нэг л удаа судалгаа бөглөх боломжтой."
+SURVEY_UNAVAILABLE_MESSAGE = "Survey not found or inactive."
+DRIVER_UNAVAILABLE_MESSAGE = "Driver not found or inactive."
+FAILED_MESSAGE = "Submission could not be stored."
+
+
 class ResponseCreateSerializer(serializers.Serializer):
     survey_id = serializers.IntegerField()
     driver_id = serializers.IntegerField()
     answers = AnswerInputSerializer(many=True)
 
     def validate(self, data):
-        survey = Survey.objects.filter(id=data["survey_id"], is_active=True).first()
-        if not survey:
-            raise serializers.ValidationError("Survey not found or inactive.")
-        driver = Driver.objects.filter(id=data["driver_id"], is_active=True).first()
-        if not driver:
-            raise serializers.ValidationError("Driver not found or inactive.")
-        if Response.objects.filter(survey=survey, driver=driver).exists():
-            raise serializers.ValidationError("Энэ жолоочид нэг л удаа судалгаа бөглөх боломжтой.")
-
-        data["survey"] = survey
-        data["driver"] = driver
+        # Survey activity and layout come from the cached structure; the driver
+        # is the only lookup. Duplicates are caught by the unique constraint.
+        structure = get_survey_structure(data["survey_id"])
+        if structure is None:
+            raise serializers.ValidationError(SURVEY_UNAVAILABLE_MESSAGE)
+        if not Driver.objects.filter(id=data["driver_id"], is_active=True).exists():
+            raise serializers.ValidationError(DRIVER_UNAVAILABLE_MESSAGE)
+
+        self._validate_answers(data["answers"], structure)
         return data
 
-    @transaction.atomic
+    async def avalidate(self, data):
+        structure = await aget_survey_structure(data["survey_id"])
+        if structure is None:
+            raise serializers.ValidationError(SURVEY_UNAVAILABLE_MESSAGE)
+        if not await Driver.objects.filter(id=data["driver_id"], is_active=True).aexists():
+            raise serializers.ValidationError(DRIVER_UNAVAILABLE_MESSAGE)
+
+        self._validate_answers(data["answers"], structure)
+        return data
+
+    async def ais_valid(self, raise_exception=False):
+        try:
+            self._validated_data = await self.avalidate(self.to_internal_value(self.initial_data))
+        except serializers.ValidationError as exc:
+            self._validated_data = {}
+            self._errors = serializers.as_serializer_error(exc)
+        else:
+            self._errors = {}
+
+        if self._errors and raise_exception:
+            raise serializers.ValidationError(self.errors)
+        return not bool(self._errors)
+
+    def _validate_answers(self, answers, structure):
+        seen = set()
+        for answer in answers:
+            question_id = answer["question_id"]
+            question = structure.get(question_id)
+            if question is None:
+                raise serializers.ValidationError(
+                    {"answers": f"Question {question_id} does not belong to this survey."}
+                )
+            if question_id in seen:
+                raise serializers.ValidationError(
+                    {"answers": f"Question {question_id} is answered more than once."}
+                )
+            seen.add(question_id)
+            invalid = set(answer.get("choice_ids") or []) - question["choice_ids"]
+            if invalid:
+                raise serializers.ValidationError(
+                    {"answers": f"Invalid choices for question {question_id}: {sorted(invalid)}."}
+                )
+
     def create(self, validated_data):
         request = self.context.get("request")
         ip_address = None
         if request:
             ip_address = request.META.get("REMOTE_ADDR")
 
-        response = Response.objects.create(
-            survey=validated_data["survey"],
-            driver=validated_data["driver"],
-            ip_address=ip_address,
-        )
-
-        question_map = {
-            q.id: q for q in validated_data["survey"].questions.all()
-        }
-
-        for answer_payload in validated_data["answers"]:
-            question = question_map.get(answer_payload["question_id"])
-            if not question:
-                continue
-
-            answer = Answer.objects.create(
-                response=response,
-                question=question,
-                rating_value=answer_payload.get("rating_value"),
-                text_value=answer_payload.get("text_value", ""),
-            )
-
-            choice_ids = answer_payload.get("choice_ids") or []
-            if choice_ids:
-                choices = Choice.objects.filter(question=question, id__in=choice_ids)
-                AnswerChoice.objects.bulk_create(
-                    [AnswerChoice(answer=answer, choice=choice) for choice in choices]
+        try:
+            with transaction.atomic():
+                return write_response(
+                    survey_id=validated_data["survey_id"],
+                    driver_id=validated_data["driver_id"],
+                    answers=validated_data["answers"],
+                    ip_address=ip_address,
                 )
+        except IntegrityError:
+            if Response.objects.filter(
+                survey_id=validated_data["survey_id"], driver_id=validated_data["driver_id"]
+            ).exists():
+                raise serializers.ValidationError(
+                    {api_settings.NON_FIELD_ERRORS_KEY: [DUPLICATE_RESPONSE_MESSAGE]}
+                )
+            raise
+
+
+def validate_submission_batch(items):
+    """Returns (validated_data, errors) pairs aligned with `items`."""
+    checker = ResponseCreateSerializer()
+    parsed = []
+    for item in items:
+        try:
+            parsed.append((checker.to_internal_value(item), None))
+        except serializers.ValidationError as exc:
+            parsed.append((None, serializers.as_serializer_error(exc)))
+
+    valid = [data for data, _ in parsed if data is not None]
+    structures = get_survey_structures([data["survey_id"] for data in valid])
+    active_drivers = set(
+        Driver.objects.filter(id__in={data["driver_id"] for data in valid}, is_active=True).values_list(
+            "id", flat=True
+        )
+    )
 
-        return response
+    results = []
+    for data, errors in parsed:
+        if data is None:
+            results.append((None, errors))
+            continue
+        try:
+            structure = structures[data["survey_id"]]
+            if structure is None:
+                raise serializers.ValidationError(SURVEY_UNAVAILABLE_MESSAGE)
+            if data["driver_id"] not in active_drivers:
+                raise serializers.ValidationError(DRIVER_UNAVAILABLE_MESSAGE)
+            checker._validate_answers(data["answers"], structure)
+        except serializers.ValidationError as exc:
+            results.append((None, serializers.as_serializer_error(exc)))
+        else:
+            results.append((data, None))
+    return results
@@ -0,0 +1,134 @@
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import invalidate_survey_schema
+from .leaderboard import invalidate_leaderboards
+from .models import Choice, Driver, Question, Survey
+from .roster import invalidate_roster
+from .stats import rebuild_survey_stats
+
+_pending = threading.local()
+
+
+def touch_survey(survey_ids):
+    survey_ids = [survey_id for survey_id in survey_ids if survey_id]
+    if not survey_ids:
+        return
+    Survey.objects.filter(id__in=survey_ids).update(updated_at=timezone.now())
+    slugs = Survey.objects.filter(id__in=survey_ids).values_list("slug", flat=True)
+    invalidate_survey_schema(*slugs, survey_ids=survey_ids)
+
+
+class _Batch:
+    # Ids gathered per thread until the transaction commits; `flush` then
+    # handles all of them at once.
+    def __init__(self, flush):
+        self.flush = flush
+        self.ids = {}
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        self.flush(**self.ids)
+
+
+def _registered(batch):
+    # A rollback drops the on_commit callback; its ids go with it.
+    connection = transaction.get_connection()
+    return (
+        not batch.done
+        and connection.in_atomic_block
+        and any(entry[1] is batch for entry in connection.run_on_commit)
+    )
+
+
+def _collect(flush, **ids):
+    ids = {name: {value for value in values if value} for name, values in ids.items()}
+    if not any(ids.values()):
+        return
+    batch = _pending.__dict__.get(flush.__name__)
+    if batch is None or not _registered(batch):
+        batch = _pending.__dict__[flush.__name__] = _Batch(flush)
+        for name, values in ids.items():
+            batch.ids.setdefault(name, set()).update(values)
+        transaction.on_commit(batch)
+        return
+    for name, values in ids.items():
+        batch.ids.setdefault(name, set()).update(values)
+
+
+def _flush_touched(survey_ids=(), question_ids=()):
+    survey_ids = set(survey_ids)
+    if question_ids:
+        survey_ids |= set(
+            Question.objects.filter(id__in=question_ids).values_list("survey_id", flat=True)
+        )
+    touch_survey(survey_ids)
+
+
+def touch_survey_on_commit(survey_ids=(), question_ids=()):
+    _collect(_flush_touched, survey_ids=survey_ids, question_ids=question_ids)
+
+
+def _flush_stats(survey_ids):
+    rebuild_survey_stats(sorted(survey_ids))
+    invalidate_leaderboards()
+
+
+def rebuild_stats_on_commit(survey_ids):
+    # For changes that bypass record_submissions: admin edits and deletes of
+    # responses and answers, and deleted questions.
+    _collect(_flush_stats, survey_ids=survey_ids)
+
+
+@receiver(pre_save, sender=Survey)
+def remember_previous_slug(sender, instance, **kwargs):
+    instance._previous_slug = None
+    if not instance.pk:
+        return
+    if getattr(instance, "_loaded_slug", None):
+        instance._previous_slug = instance._loaded_slug
+    else:
+        instance._previous_slug = (
+            Survey.objects.filter(pk=instance.pk).values_list("slug", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Survey)
+@receiver(post_delete, sender=Survey)
+def survey_changed(sender, instance, **kwargs):
+    invalidate_survey_schema(
+        instance.slug,
+        getattr(instance, "_previous_slug", None),
+        survey_ids=[instance.pk],
+    )
+    instance._loaded_slug = instance.slug
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_changed(sender, instance, signal, **kwargs):
+    touch_survey_on_commit(survey_ids=[instance.survey_id])
+    if signal is post_delete:
+        # Its ratings are part of the driver rollups.
+        rebuild_stats_on_commit([instance.survey_id])
+
+
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+def choice_changed(sender, instance, **kwargs):
+    if Choice.question.is_cached(instance):
+        touch_survey_on_commit(survey_ids=[instance.question.survey_id])
+    else:
+        # Resolved with one query for the whole transaction.
+        touch_survey_on_commit(question_ids=[instance.question_id])
+
+
+@receiver(post_save, sender=Driver)
+@receiver(post_delete, sender=Driver)
+def driver_changed(sender, instance, **kwargs):
+    invalidate_roster()
@@ -0,0 +1,465 @@
+from datetime import datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, Min, Q, Sum
+from django.db.models.functions import Trunc, TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .leaderboard import get_leaderboard
+from .models import (
+    Answer,
+    AnswerChoice,
+    ChoiceStat,
+    DriverDailyStat,
+    DriverQuestionDailyStat,
+    Question,
+    QuestionDailyStat,
+    Response,
+    SurveyDailyStat,
+)
+
+RATING_VALUES = (1, 2, 3, 4, 5)
+RATING_FIELDS = ["rating_count", "rating_sum", *(f"rating_{value}" for value in RATING_VALUES)]
+
+
+def _upsert(model, key_fields, rows, latest_fields=()):
+    if not rows:
+        return
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    names = list(rows[0])
+    fields = [model._meta.get_field(name) for name in names]
+    columns = [quote(field.column) for field in fields]
+    keys = {quote(model._meta.get_field(name).column) for name in key_fields}
+    latest = {quote(model._meta.get_field(name).column) for name in latest_fields}
+
+    updates = []
+    for column in columns:
+        if column in keys:
+            continue
+        if column in latest:
+            updates.append(
+                f"{column} = CASE WHEN {table}.{column} IS NULL OR EXCLUDED.{column} > {table}.{column} "
+                f"THEN EXCLUDED.{column} ELSE {table}.{column} END"
+            )
+        else:
+            updates.append(f"{column} = {table}.{column} + EXCLUDED.{column}")
+
+    placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([placeholders] * len(rows))} "
+        f"ON CONFLICT ({', '.join(sorted(keys))}) DO UPDATE SET {', '.join(updates)}"
+    )
+    params = []
+    for row in rows:
+        for name, field in zip(names, fields):
+            params.append(field.get_db_prep_value(row[name], connection))
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def _rating_columns(rating_value):
+    row = {"rating_count": 0, "rating_sum": 0}
+    for value in RATING_VALUES:
+        row[f"rating_{value}"] = 0
+    if rating_value is not None:
+        row["rating_count"] = 1
+        row["rating_sum"] = rating_value
+        row[f"rating_{rating_value}"] = 1
+    return row
+
+
+def _merge(rows, key_fields, latest_fields=()):
+    # ON CONFLICT can't touch the same row twice in one statement, so rows
+    # sharing a key are summed first.
+    merged = {}
+    for row in rows:
+        key = tuple(row[name] for name in key_fields)
+        current = merged.get(key)
+        if current is None:
+            merged[key] = dict(row)
+            continue
+        for name, value in row.items():
+            if name in key_fields:
+                continue
+            if name in latest_fields:
+                if current[name] is None or (value is not None and value > current[name]):
+                    current[name] = value
+            else:
+                current[name] += value
+    # Key order, so concurrent batches lock shared rows in the same order
+    # instead of deadlocking.
+    return [merged[key] for key in sorted(merged)]
+
+
+def record_submissions(items):
+    """`items` is a list of (response, answers) pairs."""
+    survey_daily_rows = []
+    question_daily_rows = []
+    choice_rows = []
+    driver_rows = []
+    driver_question_rows = []
+    for response, answers in items:
+        day = timezone.localdate(response.submitted_at)
+        survey_daily_rows.append(
+            {
+                "survey_id": response.survey_id,
+                "day": day,
+                "response_count": 1,
+                "last_submitted_at": response.submitted_at,
+            }
+        )
+        driver_row = {
+            "driver_id": response.driver_id,
+            "survey_id": response.survey_id,
+            "day": day,
+            "response_count": 1,
+            **_rating_columns(None),
+        }
+        for payload in answers:
+            rating = _rating_columns(payload.get("rating_value"))
+            if rating["rating_count"]:
+                question_daily_rows.append({"question_id": payload["question_id"], "day": day, **rating})
+                driver_question_rows.append(
+                    {"driver_id": response.driver_id, "question_id": payload["question_id"], "day": day, **rating}
+                )
+                for name in RATING_FIELDS:
+                    driver_row[name] += rating[name]
+            for choice_id in set(payload.get("choice_ids") or []):
+                choice_rows.append({"choice_id": choice_id, "count": 1})
+        driver_rows.append(driver_row)
+
+    latest = ["last_submitted_at"]
+    survey_key = ["survey_id", "day"]
+    _upsert(SurveyDailyStat, survey_key, _merge(survey_daily_rows, survey_key, latest), latest_fields=latest)
+    _upsert(QuestionDailyStat, ["question_id", "day"], _merge(question_daily_rows, ["question_id", "day"]))
+    _upsert(ChoiceStat, ["choice_id"], _merge(choice_rows, ["choice_id"]))
+    driver_key = ["driver_id", "survey_id", "day"]
+    _upsert(DriverDailyStat, driver_key, _merge(driver_rows, driver_key))
+    driver_question_key = ["driver_id", "question_id", "day"]
+    _upsert(DriverQuestionDailyStat, driver_question_key, _merge(driver_question_rows, driver_question_key))
+
+
+def record_submission(response, answers):
+    record_submissions([(response, answers)])
+
+
+def _rating_aggregates():
+    value = "rating_value"
+    aggregates = {
+        "rating_count": Count(value),
+        "rating_sum": Sum(value, default=0),
+    }
+    for rating in RATING_VALUES:
+        aggregates[f"rating_{rating}"] = Count("id", filter=Q(**{value: rating}))
+    return aggregates
+
+
+def rebuild_survey_stats(survey_ids=None):
+    def scoped(queryset, path):
+        if survey_ids is None:
+            return queryset
+        return queryset.filter(**{f"{path}__in": survey_ids})
+
+    with transaction.atomic():
+        scoped(SurveyDailyStat.objects.all(), "survey_id").delete()
+        scoped(QuestionDailyStat.objects.all(), "question__survey_id").delete()
+        scoped(ChoiceStat.objects.all(), "choice__question__survey_id").delete()
+
+        SurveyDailyStat.objects.bulk_create(
+            (
+                SurveyDailyStat(**row)
+                for row in scoped(Response.objects.all(), "survey_id")
+                .annotate(day=TruncDate("submitted_at"))
+                .values("survey_id", "day")
+                .annotate(response_count=Count("id"), last_submitted_at=Max("submitted_at"))
+                .order_by()
+            ),
+            batch_size=1000,
+        )
+
+        answers = scoped(Answer.objects.all(), "response__survey_id")
+        QuestionDailyStat.objects.bulk_create(
+            (
+                QuestionDailyStat(**row)
+                for row in answers.filter(rating_value__isnull=False)
+                .annotate(day=TruncDate("response__submitted_at"))
+                .values("question_id", "day")
+                .annotate(**_rating_aggregates())
+                .order_by()
+            ),
+            batch_size=1000,
+        )
+        ChoiceStat.objects.bulk_create(
+            (
+                ChoiceStat(**row)
+                for row in scoped(AnswerChoice.objects.all(), "answer__response__survey_id")
+                .values("choice_id")
+                .annotate(count=Count("id"))
+                .order_by()
+            ),
+            batch_size=1000,
+        )
+        rebuild_driver_stats(survey_ids)
+
+
+def rebuild_driver_stats(survey_ids=None):
+    def scoped(queryset, path):
+        if survey_ids is None:
+            return queryset
+        return queryset.filter(**{f"{path}__in": survey_ids})
+
+    with transaction.atomic():
+        scoped(DriverDailyStat.objects.all(), "survey_id").delete()
+        scoped(DriverQuestionDailyStat.objects.all(), "question__survey_id").delete()
+
+        key = ("driver_id", "survey_id", "day")
+        rows = {}
+        for row in (
+            scoped(Response.objects.all(), "survey_id")
+            .annotate(day=TruncDate("submitted_at"))
+            .values(*key)
+            .annotate(response_count=Count("id"))
+            .order_by()
+        ):
+            rows[tuple(row[name] for name in key)] = {**row, **_rating_columns(None)}
+        rated = scoped(Answer.objects.filter(rating_value__isnull=False), "response__survey_id").annotate(
+            day=TruncDate("response__submitted_at")
+        )
+        for row in (
+            rated.values("day", driver_id=F("response__driver_id"), survey_id=F("response__survey_id"))
+            .annotate(**_rating_aggregates())
+            .order_by()
+        ):
+            rows[tuple(row[name] for name in key)].update(row)
+        DriverDailyStat.objects.bulk_create((DriverDailyStat(**row) for row in rows.values()), batch_size=1000)
+
+        DriverQuestionDailyStat.objects.bulk_create(
+            (
+                DriverQuestionDailyStat(**row)
+                for row in rated.values("question_id", "day", driver_id=F("response__driver_id"))
+                .annotate(**_rating_aggregates())
+                .order_by()
+            ),
+            batch_size=1000,
+        )
+
+
+def survey_rating_average(survey_id):
+    totals = QuestionDailyStat.objects.filter(
+        question__survey_id=survey_id, question__question_type=Question.TYPE_RATING
+    ).aggregate(rating_sum=Sum("rating_sum"), rating_count=Sum("rating_count"))
+    if not totals["rating_count"]:
+        return None
+    return totals["rating_sum"] / totals["rating_count"]
+
+
+def survey_response_count(survey_id):
+    return SurveyDailyStat.objects.filter(survey_id=survey_id).aggregate(
+        total=Sum("response_count", default=0)
+    )["total"]
+
+
+def survey_daily_counts(survey_id):
+    return list(
+        SurveyDailyStat.objects.filter(survey_id=survey_id)
+        .order_by("day")
+        .values("day", count=F("response_count"))
+    )
+
+
+TREND_BUCKETS = {"day": None, "week": TruncWeek, "month": TruncMonth}
+
+
+def _average(rating_sum, rating_count):
+    return rating_sum / rating_count if rating_count else None
+
+
+def _period(bucket):
+    trunc = TREND_BUCKETS[bucket]
+    return F("day") if trunc is None else trunc("day")
+
+
+def driver_survey_summaries(driver_id):
+    rows = (
+        DriverDailyStat.objects.filter(driver_id=driver_id)
+        .values("survey_id", title=F("survey__title"), slug=F("survey__slug"))
+        .annotate(
+            response_count=Sum("response_count"),
+            rating_sum=Sum("rating_sum"),
+            rating_count=Sum("rating_count"),
+            first_day=Min("day"),
+            last_day=Max("day"),
+        )
+        .order_by("first_day", "survey_id")
+    )
+    return [{**row, "rating_avg": _average(row["rating_sum"], row["rating_count"])} for row in rows]
+
+
+def driver_rating_trend(driver_id, bucket="month"):
+    rows = (
+        DriverDailyStat.objects.filter(driver_id=driver_id)
+        .annotate(period=_period(bucket))
+        .values("period")
+        .annotate(
+            response_count=Sum("response_count"),
+            rating_sum=Sum("rating_sum"),
+            rating_count=Sum("rating_count"),
+        )
+        .order_by("period")
+    )
+    return [
+        {
+            "period": row["period"],
+            "response_count": row["response_count"],
+            "rating_count": row["rating_count"],
+            "rating_avg": _average(row["rating_sum"], row["rating_count"]),
+        }
+        for row in rows
+    ]
+
+
+def driver_question_trends(driver_id, bucket="month"):
+    """Questions are matched by text across surveys."""
+    rows = (
+        DriverQuestionDailyStat.objects.filter(driver_id=driver_id)
+        .annotate(period=_period(bucket))
+        .values("period", text=F("question__text"))
+        .annotate(rating_sum=Sum("rating_sum"), rating_count=Sum("rating_count"))
+        .order_by("text", "period")
+    )
+    series = {}
+    for row in rows:
+        series.setdefault(row["text"], []).append(
+            {
+                "period": row["period"],
+                "rating_count": row["rating_count"],
+                "rating_avg": _average(row["rating_sum"], row["rating_count"]),
+            }
+        )
+    return [{"question": text, "trend": trend} for text, trend in series.items()]
+
+
+def driver_scorecard(driver_id, bucket="month"):
+    surveys = driver_survey_summaries(driver_id)
+    rating_sum = sum(row["rating_sum"] for row in surveys)
+    rating_count = sum(row["rating_count"] for row in surveys)
+    # Placed on the all-time leaderboard: active drivers, smoothed averages.
+    leaderboard = get_leaderboard()
+    for row in surveys:
+        del row["rating_sum"]
+    return {
+        "response_count": sum(row["response_count"] for row in surveys),
+        "rating_count": rating_count,
+        "rating_avg": _average(rating_sum, rating_count),
+        "rank": leaderboard.rank(driver_id),
+        "percentile": leaderboard.percentile(driver_id),
+        "fleet_size": len(leaderboard),
+        "surveys": surveys,
+        "trend": driver_rating_trend(driver_id, bucket),
+        "questions": driver_question_trends(driver_id, bucket),
+    }
+
+
+GRANULARITIES = ("hour", "day", "week", "month")
+
+
+def _rollup_buckets(survey_id, granularity, date_from, date_to):
+    period = _period(granularity)
+    days = {}
+    if date_from is not None:
+        days["day__gte"] = date_from
+    if date_to is not None:
+        days["day__lte"] = date_to
+    responses = (
+        SurveyDailyStat.objects.filter(survey_id=survey_id, **days)
+        .annotate(period=period)
+        .values("period")
+        .annotate(response_count=Sum("response_count"))
+        .order_by()
+    )
+    ratings = (
+        QuestionDailyStat.objects.filter(question__survey_id=survey_id, **days)
+        .annotate(period=period)
+        .values("period", "question_id", text=F("question__text"))
+        .annotate(rating_sum=Sum("rating_sum"), rating_count=Sum("rating_count"))
+        .order_by()
+    )
+    return responses, ratings
+
+
+def _query_buckets(survey_id, granularity, tz, date_from, date_to):
+    submitted = {}
+    if date_from is not None:
+        submitted["submitted_at__gte"] = datetime.combine(date_from, time(), tz)
+    if date_to is not None:
+        submitted["submitted_at__lt"] = datetime.combine(date_to + timedelta(days=1), time(), tz)
+    responses = (
+        Response.objects.filter(survey_id=survey_id, **submitted)
+        .annotate(period=Trunc("submitted_at", granularity, tzinfo=tz))
+        .values("period")
+        .annotate(response_count=Count("id"))
+        .order_by()
+    )
+    ratings = (
+        Answer.objects.filter(
+            response__survey_id=survey_id,
+            rating_value__isnull=False,
+            **{f"response__{name}": value for name, value in submitted.items()},
+        )
+        .annotate(period=Trunc("response__submitted_at", granularity, tzinfo=tz))
+        .values("period", "question_id", text=F("question__text"))
+        .annotate(rating_sum=Sum("rating_value"), rating_count=Count("rating_value"))
+        .order_by()
+    )
+    return responses, ratings
+
+
+def survey_timeseries(survey_id, granularity="day", tz=None, date_from=None, date_to=None):
+    default_tz = timezone.get_default_timezone()
+    tz = tz or default_tz
+    use_rollups = granularity != "hour" and str(tz) == str(default_tz)
+    if use_rollups:
+        responses, ratings = _rollup_buckets(survey_id, granularity, date_from, date_to)
+    else:
+        responses, ratings = _query_buckets(survey_id, granularity, tz, date_from, date_to)
+
+    def start(period):
+        if isinstance(period, datetime):
+            return period.astimezone(tz)
+        return datetime.combine(period, time(), tz)
+
+    buckets = {}
+
+    def bucket(period):
+        key = start(period)
+        if key not in buckets:
+            buckets[key] = {"response_count": 0, "rating_count": 0, "rating_sum": 0, "questions": []}
+        return buckets[key]
+
+    for row in responses:
+        bucket(row["period"])["response_count"] = row["response_count"]
+    for row in sorted(ratings, key=lambda row: (row["period"], row["question_id"])):
+        current = bucket(row["period"])
+        current["rating_count"] += row["rating_count"]
+        current["rating_sum"] += row["rating_sum"]
+        current["questions"].append(
+            {
+                "question_id": row["question_id"],
+                "text": row["text"],
+                "rating_count": row["rating_count"],
+                "rating_avg": _average(row["rating_sum"], row["rating_count"]),
+            }
+        )
+
+    series = [
+        {
+            "start": key,
+            "response_count": current["response_count"],
+            "rating_count": current["rating_count"],
+            "rating_avg": _average(current["rating_sum"], current["rating_count"]),
+            "questions": current["questions"],
+        }
+        for key, current in sorted(buckets.items())
+    ]
+    return {"source": "rollup" if use_rollups else "query", "buckets": series}
@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Choice, Question, Survey
+
+STRUCTURE_KEY = "survey-structure:{survey_id}"
+
+
+def cache_timeout():
+    return getattr(settings, "SURVEY_SCHEMA_CACHE_TIMEOUT", 300)
+
+
+def _questions(survey_id):
+    return (
+        Question.objects.filter(survey_id=survey_id)
+        .order_by("order", "id")
+        .values_list("id", "question_type", "is_required")
+    )
+
+
+def _choices(survey_id):
+    return Choice.objects.filter(question__survey_id=survey_id).values_list("id", "question_id")
+
+
+def _build_structure(questions, choices):
+    structure = {}
+    for question_id, question_type, is_required in questions:
+        structure[question_id] = {
+            "question_type": question_type,
+            "is_required": is_required,
+            "choice_ids": set(),
+        }
+    for choice_id, question_id in choices:
+        question = structure.get(question_id)
+        if question is not None:
+            question["choice_ids"].add(choice_id)
+    for question in structure.values():
+        question["choice_ids"] = frozenset(question["choice_ids"])
+    return structure
+
+
+def load_survey_structure(survey_id):
+    """{question_id: {"question_type", "is_required", "choice_ids"}}"""
+    return _build_structure(_questions(survey_id), _choices(survey_id))
+
+
+def get_survey_structure(survey_id):
+    """None if the survey is missing or inactive."""
+    key = STRUCTURE_KEY.format(survey_id=survey_id)
+    entry = cache.get(key)
+    if entry is None:
+        is_active = Survey.objects.filter(id=survey_id, is_active=True).exists()
+        entry = {
+            "is_active": is_active,
+            "questions": load_survey_structure(survey_id) if is_active else {},
+        }
+        cache.set(key, entry, cache_timeout())
+    if not entry["is_active"]:
+        return None
+    return entry["questions"]
+
+
+def get_survey_structures(survey_ids):
+    """{survey_id: structure or None}"""
+    keys = {STRUCTURE_KEY.format(survey_id=survey_id): survey_id for survey_id in set(survey_ids)}
+    entries = cache.get_many(list(keys))
+    structures = {}
+    for key, survey_id in keys.items():
+        entry = entries.get(key)
+        if entry is None:
+            structures[survey_id] = get_survey_structure(survey_id)
+        else:
+            structures[survey_id] = entry["questions"] if entry["is_active"] else None
+    return structures
+
+
+async def aget_survey_structure(survey_id):
+    key = STRUCTURE_KEY.format(survey_id=survey_id)
+    entry = await cache.aget(key)
+    if entry is None:
+        is_active = await Survey.objects.filter(id=survey_id, is_active=True).aexists()
+        questions = {}
+        if is_active:
+            questions = _build_structure(
+                [row async for row in _questions(survey_id)],
+                [row async for row in _choices(survey_id)],
+            )
+        entry = {"is_active": is_active, "questions": questions}
+        await cache.aset(key, entry, cache_timeout())
+    if not entry["is_active"]:
+        return None
+    return entry["questions"]
@@ -0,0 +1,135 @@
+from django.db import IntegrityError, connection, transaction
+
+from .models import Answer, AnswerChoice, Response
+from .stats import record_submissions
+
+STATUS_STORED = "stored"
+STATUS_DUPLICATE = "duplicate"
+STATUS_FAILED = "failed"
+
+
+def _insert_answers(items):
+    answer_objects = []
+    payloads = []
+    for response, answers in items:
+        for payload in answers:
+            answer_objects.append(
+                Answer(
+                    response=response,
+                    question_id=payload["question_id"],
+                    rating_value=payload.get("rating_value"),
+                    text_value=payload.get("text_value", ""),
+                )
+            )
+            payloads.append(payload)
+    if answer_objects:
+        Answer.objects.bulk_create(answer_objects)
+
+    if answer_objects and not connection.features.can_return_rows_from_bulk_insert:
+        # Older backends don't hand back primary keys from bulk INSERT.
+        answer_ids = {
+            (response_id, question_id): answer_id
+            for answer_id, response_id, question_id in Answer.objects.filter(
+                response__in=[response for response, _ in items]
+            ).values_list("id", "response_id", "question_id")
+        }
+        for answer in answer_objects:
+            answer.id = answer_ids[(answer.response_id, answer.question_id)]
+
+    answer_choices = []
+    for answer, payload in zip(answer_objects, payloads):
+        for choice_id in dict.fromkeys(payload.get("choice_ids") or []):
+            answer_choices.append(AnswerChoice(answer_id=answer.id, choice_id=choice_id))
+    if answer_choices:
+        AnswerChoice.objects.bulk_create(answer_choices)
+
+    record_submissions(items)
+
+
+def write_response(survey_id, driver_id, answers, ip_address=None):
+    """Must run in a transaction; a second (survey, driver) submission raises IntegrityError."""
+    response = Response.objects.create(
+        survey_id=survey_id,
+        driver_id=driver_id,
+        ip_address=ip_address,
+    )
+    _insert_answers([(response, answers)])
+    return response
+
+
+def _stored_pairs(pairs):
+    pairs = set(pairs)
+    # Two IN lists instead of one OR term per pair: SQLite caps expression
+    # depth at 1000, and the few extra cross-pair rows are dropped below.
+    rows = Response.objects.filter(
+        survey_id__in={survey_id for survey_id, _ in pairs},
+        driver_id__in={driver_id for _, driver_id in pairs},
+    ).values_list("id", "survey_id", "driver_id")
+    return {
+        (survey_id, driver_id): response_id
+        for response_id, survey_id, driver_id in rows
+        if (survey_id, driver_id) in pairs
+    }
+
+
+def write_responses(submissions):
+    """Returns one (status, response_id) pair per submission."""
+    if not submissions:
+        return []
+
+    taken = _stored_pairs((submission["survey_id"], submission["driver_id"]) for submission in submissions)
+
+    results = []
+    fresh = []
+    for submission in submissions:
+        key = (submission["survey_id"], submission["driver_id"])
+        if key in taken:
+            results.append((STATUS_DUPLICATE, key))
+            continue
+        response = Response(
+            survey_id=key[0],
+            driver_id=key[1],
+            ip_address=submission.get("ip_address"),
+        )
+        taken[key] = response
+        results.append((STATUS_STORED, key))
+        fresh.append((response, submission["answers"]))
+
+    if fresh:
+        Response.objects.bulk_create([response for response, _ in fresh])
+        if not connection.features.can_return_rows_from_bulk_insert:
+            ids = _stored_pairs((response.survey_id, response.driver_id) for response, _ in fresh)
+            for response, _ in fresh:
+                response.id = ids[(response.survey_id, response.driver_id)]
+        _insert_answers(fresh)
+
+    def response_id(key):
+        stored = taken[key]
+        return stored.id if isinstance(stored, Response) else stored
+
+    return [(status, response_id(key)) for status, key in results]
+
+
+def _store_one(submission):
+    try:
+        with transaction.atomic():
+            return write_responses([submission])[0]
+    except IntegrityError:
+        # Lost a race with another writer for the same pair, or the driver or
+        # a question was deleted after validation.
+        existing = (
+            Response.objects.filter(survey_id=submission["survey_id"], driver_id=submission["driver_id"])
+            .values_list("id", flat=True)
+            .first()
+        )
+        if existing is not None:
+            return STATUS_DUPLICATE, existing
+        return STATUS_FAILED, None
+
+
+def store_submissions(submissions):
+    try:
+        with transaction.atomic():
+            return write_responses(submissions)
+    except IntegrityError:
+        return [_store_one(submission) for submission in submissions]
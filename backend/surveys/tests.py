@@ -0,0 +1,713 @@
+import io
+import os
+import tempfile
+from datetime import datetime, timedelta
+from unittest import mock
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import deletion
+from .builder import survey_blueprint
+from .imports import import_drivers
+from .ingest import flush_batch, get_journal
+from .leaderboard import invalidate_leaderboards
+from .models import Answer, Choice, Driver, DriverDailyStat, Question, Response, ResponseDeletionJob, Survey
+from .readers import DRIVER_READER, public_survey_data
+from .renderers import ORJSONRenderer
+from .search import install_driver_search_index, search_drivers
+from .serializers import DUPLICATE_RESPONSE_MESSAGE, DriverSerializer, SurveyPublicSerializer
+from .signals import rebuild_stats_on_commit
+from .stats import rebuild_survey_stats, survey_rating_average, survey_response_count, survey_timeseries
+
+
+class AdminSurveysOverviewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("admin", password="x", is_staff=True)
+        )
+        self.drivers = [Driver.objects.create(name=f"Driver {idx}") for idx in range(3)]
+
+    def _survey(self, title, questions=3):
+        survey = Survey.objects.create(title=title, is_active=True)
+        for order in range(questions):
+            Question.objects.create(
+                survey=survey, text=f"{title} {order}", question_type=Question.TYPE_RATING, order=order
+            )
+        for rating, driver in enumerate(self.drivers, start=1):
+            payload = {
+                "survey_id": survey.id,
+                "driver_id": driver.id,
+                "answers": [
+                    {"question_id": question.id, "rating_value": rating} for question in survey.questions.all()
+                ],
+            }
+            self.assertEqual(self.client.post("/api/responses/", payload, format="json").status_code, 201)
+        return survey
+
+    def test_query_count_does_not_grow_with_surveys(self):
+        self._survey("First")
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/admin/surveys-overview/")
+        self.assertEqual(len(response.data), 1)
+
+        for idx in range(4):
+            self._survey(f"More {idx}", questions=10)
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/admin/surveys-overview/")
+        self.assertEqual(len(response.data), 5)
+
+    def test_counts_and_question_limit(self):
+        survey = self._survey("Counted", questions=10)
+        response = self.client.get("/api/admin/surveys-overview/", {"question_limit": 2})
+        [row] = response.data
+        self.assertEqual(row["id"], survey.id)
+        self.assertEqual(row["response_count"], 3)
+        self.assertIsNotNone(row["last_submitted_at"])
+        self.assertEqual(row["questions"], ["Counted 0", "Counted 1"])
+
+
+class SubmissionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.driver = Driver.objects.create(name="Driver")
+
+    def _survey(self, questions):
+        survey = Survey.objects.create(title=f"{questions} questions", is_active=True)
+        answers = []
+        for order in range(questions):
+            if order % 2:
+                question = Question.objects.create(
+                    survey=survey, text=f"Q{order}", question_type=Question.TYPE_MULTI, order=order
+                )
+                choices = [Choice.objects.create(question=question, text=f"C{idx}") for idx in range(3)]
+                answers.append({"question_id": question.id, "choice_ids": [choices[0].id, choices[1].id]})
+            else:
+                question = Question.objects.create(
+                    survey=survey, text=f"Q{order}", question_type=Question.TYPE_RATING, order=order
+                )
+                answers.append({"question_id": question.id, "rating_value": 4})
+        return survey, answers
+
+    def _post(self, survey, answers):
+        payload = {"survey_id": survey.id, "driver_id": self.driver.id, "answers": answers}
+        return self.client.post("/api/responses/", payload, format="json")
+
+    def _submit_queries(self, questions):
+        survey, answers = self._survey(questions)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self._post(survey, answers).status_code, 201)
+        self.assertEqual(Answer.objects.filter(response__survey=survey).count(), questions)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_answers(self):
+        self.assertEqual(self._submit_queries(2), self._submit_queries(12))
+
+    def test_second_submission_is_reported_from_the_unique_constraint(self):
+        survey, answers = self._survey(2)
+        self.assertEqual(self._post(survey, answers).status_code, 201)
+        with CaptureQueriesContext(connection) as ctx:
+            duplicate = self._post(survey, answers)
+        self.assertEqual(duplicate.status_code, 400)
+        self.assertEqual(duplicate.data["non_field_errors"], [DUPLICATE_RESPONSE_MESSAGE])
+        # No lookup up front: the insert fails and the error is mapped.
+        inserts = [query for query in ctx.captured_queries if query["sql"].startswith('INSERT INTO "surveys_response"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Response.objects.filter(survey=survey).count(), 1)
+
+
+class QueuedIngestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.survey = Survey.objects.create(title="Queued", is_active=True)
+        self.question = Question.objects.create(survey=self.survey, text="Q", question_type=Question.TYPE_RATING)
+        self.drivers = [Driver.objects.create(name=f"Driver {idx}") for idx in range(2)]
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        # The test flushes by hand instead of a background flusher.
+        self.enterContext(
+            self.settings(
+                SUBMISSION_INGEST_MODE="queue",
+                SUBMISSION_FLUSH_MODE="worker",
+                SUBMISSION_QUEUE_PATH=os.path.join(directory, "queue.sqlite3"),
+            )
+        )
+
+    def _post(self, driver):
+        payload = {
+            "survey_id": self.survey.id,
+            "driver_id": driver.id,
+            "answers": [{"question_id": self.question.id, "rating_value": 5}],
+        }
+        response = self.client.post("/api/responses/", payload, format="json")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["status"], "pending")
+        return response["Location"]
+
+    def test_flushed_receipts_report_each_outcome(self):
+        stored = self._post(self.drivers[0])
+        duplicate = self._post(self.drivers[0])
+        other = self._post(self.drivers[1])
+        self.assertFalse(Response.objects.exists())
+        self.assertEqual(self.client.get(stored).data["status"], "pending")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(flush_batch(get_journal(), 10), 3)
+        self.assertEqual(flush_batch(get_journal(), 10), 0)
+
+        first = self.client.get(stored).data
+        self.assertEqual(first["status"], "stored")
+        self.assertEqual(first["id"], Response.objects.get(driver=self.drivers[0]).id)
+        self.assertEqual(self.client.get(duplicate).data["detail"], DUPLICATE_RESPONSE_MESSAGE)
+        self.assertEqual(self.client.get(other).data["status"], "stored")
+        self.assertEqual(survey_response_count(self.survey.id), 2)
+        self.assertEqual(self.client.get("/api/responses/receipts/unknown/").status_code, 404)
+
+
+class BatchSubmissionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.survey = Survey.objects.create(title="Offline", is_active=True)
+        self.question = Question.objects.create(survey=self.survey, text="Q", question_type=Question.TYPE_RATING)
+        self.drivers = [Driver.objects.create(name=f"Driver {idx}") for idx in range(3)]
+
+    def _item(self, driver, rating=5):
+        return {
+            "survey_id": self.survey.id,
+            "driver_id": driver.id,
+            "answers": [{"question_id": self.question.id, "rating_value": rating}],
+        }
+
+    def test_each_item_gets_its_outcome(self):
+        self.client.post("/api/responses/", self._item(self.drivers[0]), format="json")
+        items = [
+            self._item(self.drivers[0]),
+            self._item(self.drivers[1]),
+            self._item(self.drivers[2], rating=9),
+            self._item(self.drivers[1]),
+        ]
+        response = self.client.post("/api/responses/batch/", items, format="json")
+        self.assertEqual(response.status_code, 200)
+        results = response.data["results"]
+        self.assertEqual([result["index"] for result in results], [0, 1, 2, 3])
+        self.assertEqual(
+            [result["status"] for result in results], ["duplicate", "stored", "invalid", "duplicate"]
+        )
+        self.assertEqual(results[1]["id"], Response.objects.get(driver=self.drivers[1]).id)
+        self.assertIn("answers", results[2]["errors"])
+        self.assertEqual(results[3]["detail"], DUPLICATE_RESPONSE_MESSAGE)
+        self.assertEqual(Response.objects.count(), 2)
+
+    def test_rejects_oversized_batches(self):
+        with self.settings(SUBMISSION_BATCH_LIMIT=2):
+            items = [self._item(driver) for driver in self.drivers]
+            self.assertEqual(self.client.post("/api/responses/batch/", items, format="json").status_code, 400)
+        self.assertEqual(self.client.post("/api/responses/batch/", [], format="json").status_code, 400)
+        self.assertFalse(Response.objects.exists())
+
+
+class ResponseDeletionJobTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("admin", password="x", is_staff=True)
+        )
+        self.surveys = [Survey.objects.create(title=f"Survey {idx}", is_active=True) for idx in range(2)]
+        self.drivers = [Driver.objects.create(name=f"Driver {idx}") for idx in range(6)]
+        for survey in self.surveys:
+            question = Question.objects.create(survey=survey, text="Q", question_type=Question.TYPE_RATING)
+            for driver in self.drivers[:5]:
+                self._submit(survey, question, driver)
+
+    def _submit(self, survey, question, driver):
+        payload = {
+            "survey_id": survey.id,
+            "driver_id": driver.id,
+            "answers": [{"question_id": question.id, "rating_value": 4}],
+        }
+        self.assertEqual(self.client.post("/api/responses/", payload, format="json").status_code, 201)
+
+    def test_interrupted_job_resumes_where_it_stopped(self):
+        target, other = self.surveys
+        response = self.client.post("/api/admin/responses/delete/", {"survey_id": target.id}, format="json")
+        self.assertEqual(response.status_code, 202)
+        job = ResponseDeletionJob.objects.get()
+        self.assertEqual(job.status, ResponseDeletionJob.STATUS_PENDING)
+        self.assertEqual(job.total_responses, 5)
+        # Submitted after the request: outside the job.
+        self._submit(target, target.questions.get(), self.drivers[5])
+
+        real_batch = deletion._delete_batch
+        batches = []
+
+        def stop_after_one_batch(job, batch_size):
+            if batches:
+                raise RuntimeError("worker stopped")
+            batches.append(batch_size)
+            return real_batch(job, batch_size)
+
+        with mock.patch.object(deletion, "_delete_batch", side_effect=stop_after_one_batch):
+            with self.assertLogs("surveys.deletion", "ERROR"):
+                job = deletion.run_deletion_job(job.pk, batch_size=2)
+        self.assertEqual(job.status, ResponseDeletionJob.STATUS_FAILED)
+        self.assertEqual(job.deleted_responses, 2)
+
+        call_command("run_deletion_jobs", "--retry-failed", "--batch-size", "2", stdout=io.StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, ResponseDeletionJob.STATUS_DONE)
+        self.assertEqual((job.deleted_responses, job.deleted_answers), (5, 5))
+        remaining = Response.objects.filter(survey=target).values_list("driver_id", flat=True)
+        self.assertEqual(list(remaining), [self.drivers[5].id])
+        self.assertEqual(Response.objects.filter(survey=other).count(), 5)
+        self.assertEqual(survey_response_count(target.id), 1)
+
+    def test_stale_running_job_is_claimed_again(self):
+        job = deletion.create_deletion_job(survey_id=self.surveys[0].id)
+        self.assertTrue(deletion.claim_deletion_job(job.pk))
+        self.assertEqual(deletion.pending_deletion_jobs(), [])
+        ResponseDeletionJob.objects.filter(pk=job.pk).update(
+            updated_at=timezone.now() - timedelta(seconds=deletion.STALE_AFTER + 1)
+        )
+        self.assertEqual(deletion.pending_deletion_jobs(), [job.pk])
+        self.assertEqual(deletion.run_deletion_job(job.pk).status, ResponseDeletionJob.STATUS_DONE)
+
+
+class SurveyBuildTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("admin", password="x", is_staff=True)
+        )
+
+    def _payload(self, questions):
+        return {
+            "title": "Үйлчилгээ",
+            "questions": [
+                {
+                    "text": f"Q{idx}",
+                    "question_type": Question.TYPE_SINGLE,
+                    "choices": [{"text": "Тийм"}, {"text": "Үгүй"}, {"text": ""}],
+                }
+                for idx in range(questions)
+            ],
+        }
+
+    def _build_queries(self, questions):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post("/api/admin/surveys/", self._payload(questions), format="json")
+        self.assertEqual(response.status_code, 201)
+        return response, len(ctx.captured_queries)
+
+    def test_build_inserts_in_bulk(self):
+        response, small = self._build_queries(1)
+        _, large = self._build_queries(10)
+        self.assertEqual(small, large)
+        survey = Survey.objects.get(pk=response.data["id"])
+        self.assertTrue(survey.is_active)
+        [question] = survey_blueprint(survey.id)
+        self.assertEqual(question["text"], "Q0")
+        self.assertEqual(question["question_type"], Question.TYPE_SINGLE)
+        # The blank choice is skipped; the rest are numbered in order.
+        self.assertEqual(question["choices"], [{"text": "Тийм", "order": 0}, {"text": "Үгүй", "order": 1}])
+
+    def test_invalid_question_writes_nothing(self):
+        payload = self._payload(2)
+        payload["questions"][1]["question_type"] = "essay"
+        response = self.client.post("/api/admin/surveys/", payload, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Survey.objects.exists())
+        self.assertFalse(Question.objects.exists())
+
+    def test_clone_copies_questions_into_an_inactive_survey(self):
+        original, _ = self._build_queries(3)
+        response = self.client.post(f"/api/admin/surveys/{original.data['id']}/clone/", {}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["title"], "Үйлчилгээ (хуулбар)")
+        self.assertFalse(response.data["is_active"])
+        self.assertNotEqual(response.data["slug"], original.data["slug"])
+        self.assertEqual(survey_blueprint(response.data["id"]), survey_blueprint(original.data["id"]))
+
+
+class SlugAllocationTests(TestCase):
+    def test_next_number_follows_the_highest_in_one_query(self):
+        for slug in ("weekly", "weekly-2", "weekly-10", "weekly-report", "weekly-01", "weeklyx-99"):
+            Survey.objects.create(title=slug, slug=slug)
+        with self.assertNumQueries(1):
+            self.assertEqual(Survey.objects.allocate_slugs("weekly", 2), ["weekly-11", "weekly-12"])
+        self.assertEqual(Survey.objects.allocate_slugs("monthly"), ["monthly"])
+
+    def test_new_surveys_take_consecutive_slugs(self):
+        slugs = [Survey.objects.create(title="Weekly").slug for _ in range(3)]
+        self.assertEqual(slugs, ["weekly", "weekly-1", "weekly-2"])
+        self.assertEqual(Survey.objects.create(title="Долоо хоног").slug, "survey")
+
+    def test_slug_taken_concurrently_is_allocated_again(self):
+        Survey.objects.create(title="Weekly")
+        # Another request took "weekly" between the lookup and the insert.
+        with mock.patch.object(type(Survey.objects), "allocate_slugs", side_effect=[["weekly"], ["weekly-1"]]):
+            survey = Survey.objects.create(title="Weekly")
+        self.assertEqual(survey.slug, "weekly-1")
+
+
+class DriverRankingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_leaderboards()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("admin", password="x", is_staff=True)
+        )
+        self.steady, self.lucky, self.weak, self.retired = [
+            Driver.objects.create(name=name) for name in ("Steady", "Lucky", "Weak", "Retired")
+        ]
+        ratings = {self.steady: [5, 5, 5, 5], self.lucky: [5], self.weak: [3, 3], self.retired: [5, 5, 5, 5]}
+        for idx in range(4):
+            survey = Survey.objects.create(title=f"Month {idx}", is_active=True)
+            question = Question.objects.create(survey=survey, text="Q", question_type=Question.TYPE_RATING)
+            for driver, values in ratings.items():
+                if idx < len(values):
+                    payload = {
+                        "survey_id": survey.id,
+                        "driver_id": driver.id,
+                        "answers": [{"question_id": question.id, "rating_value": values[idx]}],
+                    }
+                    self.assertEqual(self.client.post("/api/responses/", payload, format="json").status_code, 201)
+        Driver.objects.filter(pk=self.retired.pk).update(is_active=False)
+
+    def test_scorecard_places_the_driver_among_active_drivers(self):
+        card = self.client.get(f"/api/admin/drivers/{self.steady.id}/scorecard/").data
+        self.assertEqual((card["response_count"], card["rating_count"], card["rating_avg"]), (4, 4, 5.0))
+        self.assertEqual([row["title"] for row in card["surveys"]], [f"Month {idx}" for idx in range(4)])
+        self.assertEqual((card["rank"], card["fleet_size"]), (1, 3))
+        self.assertEqual(card["percentile"], 83.3)
+
+        self.assertEqual(self.client.get(f"/api/admin/drivers/{self.weak.id}/scorecard/").data["percentile"], 16.7)
+        retired = self.client.get(f"/api/admin/drivers/{self.retired.id}/scorecard/").data
+        self.assertEqual((retired["rating_avg"], retired["rank"], retired["percentile"]), (5.0, None, None))
+
+    def test_leaderboard_ranks_by_smoothed_average(self):
+        board = self.client.get("/api/admin/drivers/leaderboard/", {"limit": 2, "driver": self.lucky.id}).data
+        self.assertEqual(board["fleet_size"], 3)
+        self.assertAlmostEqual(board["prior_mean"], 31 / 7)
+        # One 5 counts for less than four of them.
+        top = [(row["rank"], row["driver_id"]) for row in board["top"]]
+        self.assertEqual(top, [(1, self.steady.id), (2, self.lucky.id)])
+        self.assertEqual([row["driver_id"] for row in board["bottom"]], [self.weak.id, self.lucky.id])
+        self.assertEqual((board["driver"]["rank"], board["driver"]["rating_avg"]), (2, 5.0))
+
+        month = Survey.objects.get(title="Month 1").id
+        board = self.client.get("/api/admin/drivers/leaderboard/", {"survey": month}).data
+        self.assertEqual([row["driver_id"] for row in board["top"]], [self.steady.id, self.weak.id])
+
+
+class TimeseriesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("admin", password="x", is_staff=True)
+        )
+        self.survey = Survey.objects.create(title="Timed", is_active=True)
+        question = Question.objects.create(survey=self.survey, text="Q", question_type=Question.TYPE_RATING)
+        ulaanbaatar = ZoneInfo("Asia/Ulaanbaatar")
+        # Monday 2 March late evening and just after midnight, then the next week.
+        submissions = [
+            (datetime(2026, 3, 2, 23, 30, tzinfo=ulaanbaatar), 5),
+            (datetime(2026, 3, 3, 1, 0, tzinfo=ulaanbaatar), 3),
+            (datetime(2026, 3, 10, 10, 0, tzinfo=ulaanbaatar), 4),
+        ]
+        for idx, (submitted_at, rating) in enumerate(submissions):
+            driver = Driver.objects.create(name=f"Driver {idx}")
+            payload = {
+                "survey_id": self.survey.id,
+                "driver_id": driver.id,
+                "answers": [{"question_id": question.id, "rating_value": rating}],
+            }
+            self.assertEqual(self.client.post("/api/responses/", payload, format="json").status_code, 201)
+            Response.objects.filter(driver=driver).update(submitted_at=submitted_at)
+        rebuild_survey_stats([self.survey.id])
+
+    def _buckets(self, **params):
+        response = self.client.get(f"/api/admin/surveys/{self.survey.id}/timeseries/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data["source"], [
+            (bucket["start"].isoformat(), bucket["response_count"], bucket["rating_avg"])
+            for bucket in response.data["buckets"]
+        ]
+
+    def test_days_and_weeks_follow_the_requested_timezone(self):
+        self.assertEqual(
+            self._buckets(),
+            (
+                "rollup",
+                [
+                    ("2026-03-02T00:00:00+08:00", 1, 5.0),
+                    ("2026-03-03T00:00:00+08:00", 1, 3.0),
+                    ("2026-03-10T00:00:00+08:00", 1, 4.0),
+                ],
+            ),
+        )
+        self.assertEqual(
+            self._buckets(tz="UTC"),
+            ("query", [("2026-03-02T00:00:00+00:00", 2, 4.0), ("2026-03-10T00:00:00+00:00", 1, 4.0)]),
+        )
+        self.assertEqual(
+            self._buckets(granularity="week"),
+            ("rollup", [("2026-03-02T00:00:00+08:00", 2, 4.0), ("2026-03-09T00:00:00+08:00", 1, 4.0)]),
+        )
+        self.assertEqual(self._buckets(**{"from": "2026-03-03"})[1][0][0], "2026-03-03T00:00:00+08:00")
+
+    def test_rollups_match_querying_the_responses(self):
+        for granularity in ("day", "week", "month"):
+            rollup = survey_timeseries(self.survey.id, granularity)
+            # Same offset as Ulaanbaatar, but not the default zone: read from the responses.
+            query = survey_timeseries(self.survey.id, granularity, ZoneInfo("Asia/Shanghai"))
+            self.assertEqual((rollup["source"], query["source"]), ("rollup", "query"))
+            for bucket in rollup["buckets"] + query["buckets"]:
+                bucket["start"] = bucket["start"].replace(tzinfo=None)
+            self.assertEqual(rollup["buckets"], query["buckets"])
+
+    def test_rejects_unknown_granularity_and_timezone(self):
+        url = f"/api/admin/surveys/{self.survey.id}/timeseries/"
+        self.assertEqual(self.client.get(url, {"granularity": "year"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"tz": "Mars/Base"}).status_code, 400)
+
+
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.survey = Survey.objects.create(title="Keyed", is_active=True)
+        self.question = Question.objects.create(survey=self.survey, text="Q", question_type=Question.TYPE_RATING)
+        self.drivers = [Driver.objects.create(name=f"Driver {idx}") for idx in range(2)]
+
+    def _post(self, driver, ip):
+        payload = {
+            "survey_id": self.survey.id,
+            "driver_id": driver.id,
+            "answers": [{"question_id": self.question.id, "rating_value": 5}],
+        }
+        return self.client.post(
+            "/api/responses/", payload, format="json", HTTP_IDEMPOTENCY_KEY="retry-1", REMOTE_ADDR=ip
+        )
+
+    def test_retry_from_another_address_replays(self):
+        first = self._post(self.drivers[0], "10.0.0.1")
+        self.assertEqual(first.status_code, 201)
+
+        replay = self._post(self.drivers[0], "10.0.0.2")
+        self.assertEqual(replay.status_code, 201)
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertEqual(replay.data, first.data)
+        self.assertEqual(Response.objects.count(), 1)
+        self.assertEqual(self._post(self.drivers[1], "10.0.0.1").status_code, 422)
+
+
+class RosterETagTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.driver = Driver.objects.create(name="Бат")
+
+    def test_etag_follows_the_database_not_the_worker(self):
+        first = self.client.get("/api/drivers/roster/")
+        self.assertIn("public", first["Cache-Control"])
+        self.assertEqual(self.client.get("/api/drivers/roster/", HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+
+        # A change another worker made: no signal reaches this process.
+        Driver.objects.filter(pk=self.driver.pk).update(name="Дорж", updated_at=timezone.now())
+        second = self.client.get("/api/drivers/roster/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second["ETag"], first["ETag"])
+        self.assertEqual(second.data["drivers"], [{"id": self.driver.pk, "label": "Дорж"}])
+
+    def test_autocomplete_etag_is_cheap_and_public(self):
+        self.client.get("/api/drivers/autocomplete/", {"q": "ба"})
+        with CaptureQueriesContext(connection) as ctx:
+            cached = self.client.get("/api/drivers/autocomplete/", {"q": "ба"})
+        self.assertEqual(cached.status_code, 200)
+        self.assertIn("public", cached["Cache-Control"])
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertNotIn("COUNT", ctx.captured_queries[0]["sql"].upper())
+
+        self.driver.delete()
+        deleted = self.client.get("/api/drivers/autocomplete/", {"q": "ба"}, HTTP_IF_NONE_MATCH=cached["ETag"])
+        self.assertEqual(deleted.status_code, 200)
+        self.assertEqual(deleted.data["results"], [])
+
+
+class CompiledReaderParityTests(TestCase):
+    def assertSameJSON(self, compiled, serialized):
+        self.assertEqual(compiled, serialized)
+        # Key order too: clients see the rendered body.
+        self.assertEqual(ORJSONRenderer().render(compiled), ORJSONRenderer().render(serialized))
+
+    def test_public_survey_data_matches_serializer(self):
+        full = Survey.objects.create(title="Full", description="Сар бүрийн судалгаа", is_active=True)
+        Survey.objects.create(title="Empty", is_active=True)
+        Question.objects.create(survey=full, text="Үнэлгээ", question_type=Question.TYPE_RATING, order=2)
+        single = Question.objects.create(
+            survey=full, text="Нэг", question_type=Question.TYPE_SINGLE, is_required=False, order=1
+        )
+        multi = Question.objects.create(survey=full, text="Олон", question_type=Question.TYPE_MULTI, order=1)
+        Question.objects.create(
+            survey=full, text="Санал", question_type=Question.TYPE_TEXT, is_required=False, order=3
+        )
+        Choice.objects.create(question=single, text="Тийм", order=1)
+        Choice.objects.create(question=single, text="Үгүй", order=0)
+        for order in (2, 0, 1):
+            Choice.objects.create(question=multi, text=f"Сонголт {order}", order=order)
+
+        surveys = Survey.objects.order_by("id")
+        serialized = SurveyPublicSerializer(surveys.prefetch_related("questions__choices"), many=True).data
+        self.assertSameJSON(public_survey_data(surveys), serialized)
+
+    def test_driver_reader_matches_serializer(self):
+        Driver.objects.create(last_name="Дорж", name="Бат", phone_number="+976 9911-2233", car_number="1234 уба")
+        Driver.objects.create(name="Сүх")
+        Driver.objects.create(name="Ганаа", car_number="5678УНГ", is_active=False)
+
+        drivers = Driver.objects.order_by("name", "id")
+        self.assertSameJSON(
+            DRIVER_READER.to_data(list(DRIVER_READER.values(drivers))),
+            DriverSerializer(drivers, many=True).data,
+        )
+
+    def test_projected_driver_list_matches_serializer(self):
+        Driver.objects.create(last_name="Дорж", name="Бат", car_number="1234УБА")
+        Driver.objects.create(name="Сүх", phone_number="99112233")
+
+        response = APIClient().get("/api/drivers/active/", {"fields": "car_number,id"})
+        serialized = [
+            {"id": row["id"], "car_number": row["car_number"]}
+            for row in DriverSerializer(Driver.objects.order_by("name", "last_name", "id"), many=True).data
+        ]
+        self.assertEqual(response.json(), serialized)
+
+
+class DriverImportTests(TestCase):
+    def test_shift_drivers_share_a_plate(self):
+        day = Driver.objects.create(name="Өдөр", phone_number="99112233", car_number="1234 уба")
+        result = import_drivers(
+            [
+                ["name", "phone_number", "car_number"],
+                ["Шөнө", "88001122", "1234-УБА"],
+                ["Өдөр", "99112233", "1234УБА"],
+                ["Хэн", "", "1234УБА"],
+            ]
+        )
+        self.assertEqual((result.inserted, result.updated, result.skipped), (1, 1, 1))
+        self.assertEqual(result.errors[0]["line"], 4)
+        self.assertEqual(
+            sorted(Driver.objects.filter(car_number="1234УБА").values_list("id", flat=True)),
+            [day.id, Driver.objects.get(phone_number="88001122").id],
+        )
+
+    def test_plate_finds_a_driver_without_phone(self):
+        driver = Driver.objects.create(name="Бат", car_number="5555УНА")
+        result = import_drivers([["name", "phone_number", "car_number"], ["Бат", "99001100", "5555УНА"]])
+        self.assertEqual((result.inserted, result.updated), (0, 1))
+        driver.refresh_from_db()
+        self.assertEqual(driver.phone_number, "99001100")
+
+
+class DriverSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for name in ("Бат", "Баяр", "Жамба"):
+            Driver.objects.create(name=name)
+
+    def _names(self, query):
+        return [driver.name for driver in search_drivers(Driver.objects.filter(is_active=True), query, 20)]
+
+    def test_short_terms_match_word_prefixes_and_longer_ones_substrings(self):
+        self.assertEqual(self._names("ба"), ["Бат", "Баяр"])
+        self.assertEqual(self._names("бат"), ["Бат"])
+        self.assertEqual(self._names("амб"), ["Жамба"])
+
+    def test_old_sqlite_searches_without_the_trigram_table(self):
+        schema_editor = mock.Mock()
+        schema_editor.connection.vendor = "sqlite"
+        with mock.patch("surveys.search.sqlite3.sqlite_version_info", (3, 31, 1)):
+            install_driver_search_index(schema_editor)
+        schema_editor.execute.assert_not_called()
+
+
+class RollupUpkeepTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.survey = Survey.objects.create(title="Rolled", is_active=True)
+        self.question = Question.objects.create(survey=self.survey, text="Q", question_type=Question.TYPE_RATING)
+        self.drivers = [Driver.objects.create(name=f"Driver {idx}") for idx in range(3)]
+        for rating, driver in enumerate(self.drivers, start=3):
+            payload = {
+                "survey_id": self.survey.id,
+                "driver_id": driver.id,
+                "answers": [{"question_id": self.question.id, "rating_value": rating}],
+            }
+            self.assertEqual(self.client.post("/api/responses/", payload, format="json").status_code, 201)
+
+    def test_submissions_are_counted(self):
+        self.assertEqual(survey_response_count(self.survey.id), 3)
+        self.assertEqual(survey_rating_average(self.survey.id), 4)
+        self.assertEqual(DriverDailyStat.objects.filter(survey=self.survey).count(), 3)
+
+    def test_admin_delete_and_edit_rebuild(self):
+        self.client.force_login(get_user_model().objects.create_superuser("root", password="x"))
+        response = Response.objects.get(driver=self.drivers[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                "/admin/surveys/response/",
+                {"action": "delete_selected", "_selected_action": [response.id], "post": "yes"},
+            )
+        self.assertEqual(survey_response_count(self.survey.id), 2)
+        self.assertEqual(survey_rating_average(self.survey.id), 4.5)
+
+        answer = Answer.objects.get(response__driver=self.drivers[1])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f"/admin/surveys/answer/{answer.id}/change/",
+                {"response": answer.response_id, "question": self.question.id, "rating_value": 1, "text_value": ""},
+            )
+        self.assertEqual(survey_rating_average(self.survey.id), 3)
+
+    def test_deleted_question_leaves_the_driver_rollups(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.delete()
+        self.assertFalse(DriverDailyStat.objects.filter(rating_count__gt=0).exists())
+        self.assertEqual(survey_response_count(self.survey.id), 3)
+
+    def test_survey_delete_does_not_load_answers(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.survey.delete()
+        # Only ids, never whole rows: nothing listens to answer deletes.
+        loaded = [
+            query["sql"] for query in queries if query["sql"].startswith("SELECT") and "text_value" in query["sql"]
+        ]
+        self.assertEqual(loaded, [])
+
+    def test_rolled_back_changes_are_forgotten(self):
+        with mock.patch("surveys.signals.rebuild_survey_stats") as rebuild:
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        rebuild_stats_on_commit([self.survey.id + 100])
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+                rebuild_stats_on_commit([self.survey.id])
+        rebuild.assert_called_once_with([self.survey.id])
@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from . import async_views
 from .views import (
     ActiveDriverListView,
     ActiveSurveyDetailView,
@@ -13,11 +15,16 @@ from .views import (
     login_view,
     admin_dashboard_view,
     admin_dashboard_table_view,
+    admin_response_deletion_job_view,
     admin_responses_delete_view,
     admin_surveys_overview_view,
     admin_users_view,
     admin_session_view,
+    driver_autocomplete_view,
+    driver_roster_view,
     health_check_view,
+    response_batch_create_view,
+    submission_receipt_view,
 )
 
 router = DefaultRouter()
@@ -30,6 +37,11 @@ urlpatterns = [
     path("dashboard/", admin_dashboard_view, name="admin-dashboard"),
     path("admin/dashboard-table/", admin_dashboard_table_view, name="admin-dashboard-table"),
     path("admin/responses/delete/", admin_responses_delete_view, name="admin-responses-delete"),
+    path(
+        "admin/responses/delete/jobs/<int:pk>/",
+        admin_response_deletion_job_view,
+        name="admin-response-deletion-job",
+    ),
     path("admin/surveys-overview/", admin_surveys_overview_view, name="admin-surveys-overview"),
     path("admin/users/", admin_users_view, name="admin-users"),
     path("admin/session/", admin_session_view, name="admin-session"),
@@ -38,6 +50,18 @@ urlpatterns = [
     path("surveys/active/", ActiveSurveyListView.as_view()),
     path("surveys/active/<slug:slug>/", ActiveSurveyDetailView.as_view()),
     path("drivers/active/", ActiveDriverListView.as_view()),
+    path("drivers/autocomplete/", driver_autocomplete_view, name="driver-autocomplete"),
+    path("drivers/roster/", driver_roster_view, name="driver-roster"),
     path("responses/", ResponseCreateView.as_view()),
+    path("responses/batch/", response_batch_create_view, name="response-batch-create"),
+    path("responses/receipts/<str:receipt>/", submission_receipt_view, name="submission-receipt"),
     path("", include(router.urls)),
 ]
+
+if getattr(settings, "ASYNC_PUBLIC_API", False):
+    # Served before the DRF routes above, which remain as fallbacks.
+    urlpatterns = [
+        path("surveys/active/<slug:slug>/", async_views.survey_detail_view),
+        path("drivers/active/", async_views.driver_list_view),
+        path("responses/", async_views.response_create_view),
+    ] + urlpatterns
@@ -1,26 +1,64 @@
 import os
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from django.conf import settings
 from django.db import connection
-from django.db.models import Avg, Count, Q
-from django.db.models.functions import TruncDate
+from django.db.models import Count, Max, Sum
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.dateparse import parse_date
+from django.utils.decorators import method_decorator
 from rest_framework import generics, status, viewsets, filters
 from rest_framework.authtoken.models import Token
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response as DRFResponse
 
-from .models import Answer, Choice, Driver, Question, Response, Survey
+from . import idempotency
+from .cache import active_surveys_version, get_active_surveys_schema, get_survey_schema, survey_schema_version
+from .conditional import conditional
+from .exports import CONTENT_TYPES, ExportDependencyError, export_to_tempfile, stream_csv, stream_parquet
+from .imports import FORMATS as IMPORT_FORMATS, DriverImportError, import_drivers, iter_rows
+from .ingest import STATUS_PENDING, get_journal, queue_enabled, receipt_status, start_flusher
+from .leaderboard import get_leaderboard
+from .builder import build_surveys, clone_survey
+from .deletion import create_deletion_job, deletion_plan, start_deletion_job
+from .models import Choice, Driver, Question, Response, ResponseDeletionJob, Survey
+from .pagination import KeysetPagination
+from .pivot import dashboard_rows, question_headers, to_columns
+from .projection import FieldProjectionMixin, project_queryset, project_serializer, requested_fields
+from .readers import DRIVER_READER, CompiledListMixin
+from .roster import get_roster, roster_stamp
+from .search import search_drivers
+from .submissions import STATUS_DUPLICATE, STATUS_STORED, store_submissions
+from .stats import (
+    GRANULARITIES,
+    TREND_BUCKETS,
+    driver_scorecard,
+    survey_daily_counts,
+    survey_rating_average,
+    survey_response_count,
+    survey_timeseries,
+)
 from .serializers import (
+    DUPLICATE_RESPONSE_MESSAGE,
+    FAILED_MESSAGE,
     AdminUserSerializer,
     AdminUserCreateSerializer,
     ChoiceAdminSerializer,
     DriverSerializer,
     QuestionAdminSerializer,
     ResponseCreateSerializer,
+    ResponseDeletionJobSerializer,
     SurveyAdminSerializer,
+    SurveyBuildSerializer,
     SurveyOverviewSerializer,
     SurveyPublicSerializer,
+    overview_queryset,
+    validate_submission_batch,
 )
 
 
@@ -28,16 +66,6 @@ from django.shortcuts import render
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import get_user_model, login
 
-def _format_answer_value(answer):
-    if answer.rating_value is not None:
-        return str(answer.rating_value)
-    choices = [choice.choice.text for choice in answer.answer_choices.all()]
-    if choices:
-        return ", ".join(choices)
-    if answer.text_value:
-        return answer.text_value
-    return ""
-
 @staff_member_required
 def admin_dashboard_view(request):
     surveys = Survey.objects.all()
@@ -46,8 +74,7 @@ def admin_dashboard_view(request):
     
     if selected_survey_id:
         survey = Survey.objects.get(id=selected_survey_id)
-        rating_questions = survey.questions.filter(question_type="rating")
-        
+
         driver_stats = (
             Response.objects.filter(survey=survey)
             .values("driver__id", "driver__name", "driver__car_number")
@@ -55,11 +82,7 @@ def admin_dashboard_view(request):
             .order_by("-response_count")
         )
 
-        rating_avg = (
-            Response.objects.filter(survey=survey, answers__question__in=rating_questions)
-            .aggregate(avg_rating=Avg("answers__rating_value"))
-            .get("avg_rating")
-        )
+        rating_avg = survey_rating_average(survey.id)
 
         results = {
             "survey": survey,
@@ -75,135 +98,140 @@ def admin_dashboard_view(request):
     })
 
 
+def _int_param(params, name):
+    value = params.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValidationError({name: "Must be an integer."})
+
+
 @api_view(["GET"])
 @permission_classes([IsAdminUser])
 def admin_dashboard_table_view(request):
-    survey_id = request.query_params.get("survey_id")
-    driver_id = request.query_params.get("driver_id")
-    counts = Response.objects.values("survey_id", "driver_id").annotate(total=Count("id")).order_by(
-        "survey_id", "driver_id"
+    params = request.query_params
+    limit = _int_param(params, "limit")
+    if limit is not None:
+        limit = max(1, min(limit, 1000))
+    after = None
+    cursor = params.get("cursor")
+    if cursor:
+        try:
+            after = tuple(int(part) for part in cursor.split("-", 1))
+        except ValueError:
+            raise ValidationError({"cursor": "Invalid cursor."})
+        if len(after) != 2:
+            raise ValidationError({"cursor": "Invalid cursor."})
+    question_offset = max(_int_param(params, "question_offset") or 0, 0)
+    question_limit = _int_param(params, "question_limit")
+    if question_limit is None:
+        question_limit = 8
+    elif question_limit <= 0:
+        question_limit = None
+
+    rows, next_key = dashboard_rows(
+        survey_id=_int_param(params, "survey_id"),
+        driver_id=_int_param(params, "driver_id"),
+        after=after,
+        limit=limit,
+        question_offset=question_offset,
+        question_limit=question_limit,
     )
-    if survey_id:
-        counts = counts.filter(survey_id=survey_id)
-    if driver_id:
-        counts = counts.filter(driver_id=driver_id)
-    count_list = list(counts)
-    if not count_list:
-        return DRFResponse({"rows": []})
-
-    survey_ids = {row["survey_id"] for row in count_list}
-    driver_ids = {row["driver_id"] for row in count_list}
-
-    # Optimize: only fetch required fields
-    survey_map = {
-        survey.id: survey.title 
-        for survey in Survey.objects.filter(id__in=survey_ids).only("id", "title")
-    }
-    
-    # Optimize: only fetch required fields
-    driver_map = {}
-    for driver in Driver.objects.filter(id__in=driver_ids).only("id", "name", "last_name"):
-        display = f"{driver.last_name} {driver.name}".strip() if driver.last_name else driver.name
-        driver_map[driver.id] = display
-
-    # Optimize: only fetch required fields and limit to 8 questions per survey
-    question_map = {}
-    questions = Question.objects.filter(survey_id__in=survey_ids).only("id", "survey_id", "order").order_by("order", "id")
-    for question in questions:
-        question_list = question_map.setdefault(question.survey_id, [])
-        if len(question_list) < 8:
-            question_list.append(question)
-
-    index_map = {
-        survey_id: {q.id: idx for idx, q in enumerate(question_list)}
-        for survey_id, question_list in question_map.items()
-    }
-    question_ids = [q.id for question_list in question_map.values() for q in question_list]
-
-    # Pre-fetch IP addresses to avoid N+1 queries
-    response_keys = {(row["survey_id"], row["driver_id"]) for row in count_list}
-    ip_map = {}
-    if response_keys:
-        responses = Response.objects.filter(
-            survey_id__in=survey_ids,
-            driver_id__in=driver_ids
-        ).only("survey_id", "driver_id", "ip_address")
-        for response in responses:
-            key = (response.survey_id, response.driver_id)
-            if key in response_keys and response.ip_address:
-                ip_map[key] = response.ip_address
-
-    rows = []
-    row_map = {}
-    for row in count_list:
-        key = (row["survey_id"], row["driver_id"])
-        row_data = {
-            "id": f"{row['survey_id']}-{row['driver_id']}",
-            "survey": survey_map.get(row["survey_id"], ""),
-            "driver": driver_map.get(row["driver_id"], ""),
-            "response_count": row["total"],
-            "ip_address": ip_map.get(key, ""),
-            "answers": [[] for _ in range(8)],
+    next_cursor = f"{next_key[0]}-{next_key[1]}" if next_key else None
+    if params.get("layout") != "columns":
+        return DRFResponse({"rows": rows, "next": next_cursor})
+
+    headers, total = question_headers(
+        {row["survey_id"] for row in rows}, question_offset, question_limit
+    )
+    if question_limit is None:
+        width = max(total - question_offset, 0)
+    else:
+        width = max(min(question_limit, total - question_offset), 0)
+    meta, columns = to_columns(rows, width)
+    return DRFResponse(
+        {
+            "rows": meta,
+            "columns": columns,
+            "headers": headers,
+            "question_offset": question_offset,
+            "total_questions": total,
+            "next": next_cursor,
         }
-        rows.append(row_data)
-        row_map[key] = row_data
-
-    if question_ids:
-        # Optimize: use select_related and prefetch_related more efficiently
-        answers = (
-            Answer.objects.filter(
-                response__survey_id__in=survey_ids,
-                response__driver_id__in=driver_ids,
-                question_id__in=question_ids,
-            )
-            .select_related("response", "question")
-            .prefetch_related("answer_choices__choice")
-            .only(
-                "response__survey_id",
-                "response__driver_id",
-                "question_id",
-                "rating_value",
-                "text_value"
-            )
-        )
-        for answer in answers:
-            key = (answer.response.survey_id, answer.response.driver_id)
-            row = row_map.get(key)
-            if not row:
-                continue
-            idx = index_map.get(key[0], {}).get(answer.question_id)
-            if idx is None:
-                continue
-            value = _format_answer_value(answer)
-            if value:
-                row["answers"][idx].append(value)
+    )
+
+
+def _flag(value):
+    return str(value).lower() in ("1", "true", "yes", "on")
+
 
-    return DRFResponse({"rows": rows})
+def _date_param(params, name):
+    value = params.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: "Must be a date (YYYY-MM-DD)."})
+    return parsed
 
 
 @api_view(["POST"])
 @permission_classes([IsAdminUser])
 def admin_responses_delete_view(request):
-    survey_id = request.data.get("survey_id")
-    driver_id = request.data.get("driver_id")
-    queryset = Response.objects.all()
-    if survey_id:
-        queryset = queryset.filter(survey_id=survey_id)
-    if driver_id:
-        queryset = queryset.filter(driver_id=driver_id)
-    deleted_responses = queryset.count()
-    if deleted_responses:
-        queryset.delete()
-    return DRFResponse({"deleted_responses": deleted_responses})
+    survey_id = _int_param(request.data, "survey_id")
+    driver_id = _int_param(request.data, "driver_id")
+    if _flag(request.data.get("dry_run")):
+        plan = deletion_plan(survey_id, driver_id)
+        return DRFResponse(
+            {
+                "dry_run": True,
+                "responses": plan["response_count"],
+                "answers": plan["answer_count"],
+                "answer_choices": plan["answer_choice_count"],
+            }
+        )
+
+    job = create_deletion_job(survey_id, driver_id, requested_by=request.user)
+    if job is None:
+        return DRFResponse({"deleted_responses": 0})
+    start_deletion_job(job)
+    return DRFResponse(
+        ResponseDeletionJobSerializer(job).data,
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Location": reverse("admin-response-deletion-job", args=[job.pk])},
+    )
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def admin_response_deletion_job_view(request, pk):
+    job = get_object_or_404(ResponseDeletionJob, pk=pk)
+    return DRFResponse(ResponseDeletionJobSerializer(job).data)
+
+
+def _overview_validators(request):
+    totals = Survey.objects.aggregate(
+        count=Count("id", distinct=True),
+        updated_at=Max("updated_at"),
+        responses=Sum("daily_stats__response_count"),
+        submitted_at=Max("daily_stats__last_submitted_at"),
+    )
+    changed = max(filter(None, [totals["updated_at"], totals["submitted_at"]]), default=None)
+    etag = f"{totals['count']}-{totals['responses'] or 0}-{changed.isoformat() if changed else ''}"
+    return etag, changed
 
 
 @api_view(["GET"])
 @permission_classes([IsAdminUser])
+@conditional(_overview_validators)
 def admin_surveys_overview_view(request):
-    # Optimize: only fetch required fields and prefetch questions efficiently
-    surveys = Survey.objects.prefetch_related("questions").only(
-        "id", "title", "description", "slug", "is_active"
-    ).all()
+    question_limit = _int_param(request.query_params, "question_limit")
+    surveys = overview_queryset(8 if question_limit is None else question_limit)
     serializer = SurveyOverviewSerializer(surveys, many=True)
     return DRFResponse(serializer.data)
 
@@ -216,8 +244,15 @@ def admin_users_view(request):
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
         return DRFResponse(AdminUserSerializer(user).data, status=status.HTTP_201_CREATED)
-    users = get_user_model().objects.order_by("username")
-    serializer = AdminUserSerializer(users, many=True)
+    fields = requested_fields(request)
+    users = project_queryset(get_user_model().objects.order_by("username", "id"), fields)
+    paginator = KeysetPagination(ordering=("username", "id"))
+    page = paginator.paginate_queryset(users, request)
+    serializer = project_serializer(
+        AdminUserSerializer(users if page is None else page, many=True), fields
+    )
+    if page is not None:
+        return paginator.get_paginated_response(serializer.data)
     return DRFResponse(serializer.data)
 
 
@@ -280,6 +315,24 @@ def login_view(request):
     return DRFResponse({"token": token.key, "username": user.username})
 
 
+def _results_validators(request, pk=None):
+    row = (
+        Survey.objects.filter(pk=pk)
+        .annotate(
+            response_total=Sum("daily_stats__response_count"),
+            submitted_at=Max("daily_stats__last_submitted_at"),
+        )
+        .values_list("updated_at", "response_total", "submitted_at")
+        .first()
+    )
+    if row is None:
+        return None, None
+    updated_at, responses, submitted_at = row
+    changed = max(filter(None, [updated_at, submitted_at]))
+    # Driver names appear in the body too.
+    return f"{responses or 0}-{changed.isoformat()}-{roster_stamp()}", changed
+
+
 class SurveyAdminViewSet(viewsets.ModelViewSet):
     queryset = Survey.objects.prefetch_related("questions__choices").all()
     serializer_class = SurveyAdminSerializer
@@ -287,7 +340,8 @@ class SurveyAdminViewSet(viewsets.ModelViewSet):
 
     def create(self, request, *args, **kwargs):
         """
-        Create a survey and (optionally) create questions in the same request.
+        Create a survey and (optionally) its questions and choices in the
+        same request, in one transaction.
 
         Expected payload example:
         {
@@ -296,9 +350,12 @@ class SurveyAdminViewSet(viewsets.ModelViewSet):
           "is_active": true,
           "questions": [
             {"text":"...", "question_type":"rating", "is_required": true, "order": 1},
+            {"text":"...", "question_type":"single", "choices": [{"text": "...", "order": 0}]},
             ...
           ]
         }
+        Rows without text are skipped; anything else invalid fails the whole
+        request before a row is written.
         """
         payload = dict(request.data)
 
@@ -306,51 +363,50 @@ class SurveyAdminViewSet(viewsets.ModelViewSet):
         if "is_active" not in payload:
             payload["is_active"] = True
 
-        questions_payload = payload.pop("questions", None)
+        return self._build([payload])
 
-        serializer = self.get_serializer(data=payload)
+    def _build(self, payloads, many=False):
+        context = self.get_serializer_context()
+        serializer = SurveyBuildSerializer(data=payloads if many else payloads[0], many=many, context=context)
         serializer.is_valid(raise_exception=True)
-        survey = serializer.save()
-
-        if isinstance(questions_payload, list):
-            for idx, q in enumerate(questions_payload):
-                if not isinstance(q, dict):
-                    continue
-                text = (q.get("text") or "").strip()
-                if not text:
-                    continue
-
-                question = Question.objects.create(
-                    survey=survey,
-                    text=text,
-                    question_type=q.get("question_type") or "rating",
-                    is_required=bool(q.get("is_required", True)),
-                    order=int(q.get("order", idx)),
-                )
-
-                # Support optional choice list for single/multi questions:
-                # "choices": [{"text": "...", "order": 0}, ...]
-                choices_payload = q.get("choices") or []
-                if isinstance(choices_payload, list):
-                    for c_idx, c in enumerate(choices_payload):
-                        if not isinstance(c, dict):
-                            continue
-                        c_text = (c.get("text") or "").strip()
-                        if not c_text:
-                            continue
-                        Choice.objects.create(
-                            question=question,
-                            text=c_text,
-                            order=int(c.get("order", c_idx)),
-                        )
-
-        headers = self.get_success_headers(serializer.data)
-        return DRFResponse(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+        validated = serializer.validated_data if many else [serializer.validated_data]
+        surveys = build_surveys([(fields, fields.pop("questions", [])) for fields in validated])
+        data = SurveyAdminSerializer(surveys, many=True, context=context).data
+        if many:
+            return DRFResponse(data, status=status.HTTP_201_CREATED)
+        return DRFResponse(data[0], status=status.HTTP_201_CREATED, headers=self.get_success_headers(data[0]))
+
+    @action(detail=False, methods=["post"], url_path="import", permission_classes=[IsAdminUser])
+    def import_survey(self, request):
+        many = isinstance(request.data, list)
+        payloads = []
+        for item in request.data if many else [request.data]:
+            if isinstance(item, dict):
+                item = dict(item)
+                item.pop("slug", None)
+                item["is_active"] = item.get("is_active") is True
+            payloads.append(item)
+        return self._build(payloads, many=many)
+
+    @action(detail=True, methods=["post"], permission_classes=[IsAdminUser])
+    def clone(self, request, pk=None):
+        survey = get_object_or_404(Survey, pk=pk)
+        overrides = SurveyAdminSerializer(data=request.data, partial=True)
+        overrides.is_valid(raise_exception=True)
+        fields = {
+            key: value
+            for key, value in overrides.validated_data.items()
+            if key in ("title", "description", "is_active")
+        }
+        fields.setdefault("title", f"{survey.title} (хуулбар)"[: Survey._meta.get_field("title").max_length])
+        clone = clone_survey(survey, **fields)
+        data = SurveyAdminSerializer(clone, context=self.get_serializer_context()).data
+        return DRFResponse(data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=["get"], permission_classes=[IsAdminUser])
+    @method_decorator(conditional(_results_validators))
     def results(self, request, pk=None):
         survey = self.get_object()
-        rating_questions = survey.questions.filter(question_type="rating")
 
         driver_stats = (
             Response.objects.filter(survey=survey)
@@ -359,56 +415,187 @@ class SurveyAdminViewSet(viewsets.ModelViewSet):
             .order_by("driver__name")
         )
 
-        rating_avg = (
-            Response.objects.filter(survey=survey, answers__question__in=rating_questions)
-            .aggregate(avg_rating=Avg("answers__rating_value"))
-            .get("avg_rating")
-        )
-
-        date_stats = (
-            Response.objects.filter(survey=survey)
-            .annotate(day=TruncDate("submitted_at"))
-            .values("day")
-            .annotate(count=Count("id"))
-            .order_by("day")
-        )
-
+        # Average and daily histogram come from the rollup tables (surveys/stats.py).
         return DRFResponse(
             {
                 "survey": SurveyAdminSerializer(survey).data,
-                "rating_avg": rating_avg or 0,
+                "rating_avg": survey_rating_average(survey.id) or 0,
                 "drivers": list(driver_stats),
-                "by_date": list(date_stats),
+                "by_date": survey_daily_counts(survey.id),
             }
         )
 
+    @action(detail=True, methods=["get"], permission_classes=[IsAdminUser])
+    @method_decorator(conditional(_results_validators))
+    def timeseries(self, request, pk=None):
+        survey = get_object_or_404(Survey, pk=pk)
+        params = request.query_params
+        granularity = params.get("granularity") or "day"
+        if granularity not in GRANULARITIES:
+            raise ValidationError({"granularity": f"Must be one of: {', '.join(GRANULARITIES)}."})
+        tz = None
+        if params.get("tz"):
+            try:
+                tz = ZoneInfo(params["tz"])
+            except (ZoneInfoNotFoundError, ValueError):
+                raise ValidationError({"tz": "Unknown timezone."})
+        date_from = _date_param(params, "from")
+        date_to = _date_param(params, "to")
+        series = survey_timeseries(survey.id, granularity, tz, date_from, date_to)
+        return DRFResponse(
+            {
+                "survey_id": survey.id,
+                "granularity": granularity,
+                "tz": str(tz) if tz else settings.TIME_ZONE,
+                "from": date_from,
+                "to": date_to,
+                **series,
+            }
+        )
 
-class QuestionAdminViewSet(viewsets.ModelViewSet):
+    @action(
+        detail=True,
+        methods=["get"],
+        permission_classes=[IsAdminUser],
+        url_path=r"export/(?P<file_format>csv|xlsx|parquet)",
+    )
+    def export(self, request, pk=None, file_format="csv"):
+        survey = self.get_object()
+        filename = f"{survey.slug}-responses.{file_format}"
+        limit = getattr(settings, "EXPORT_XLSX_MAX_RESPONSES", 50000)
+        if file_format == "xlsx" and survey_response_count(survey.id) > limit:
+            return DRFResponse(
+                {"detail": f"XLSX exports are limited to {limit} responses; use CSV or Parquet."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            if file_format == "csv":
+                response = StreamingHttpResponse(stream_csv(survey.id), content_type=CONTENT_TYPES["csv"])
+            elif file_format == "parquet":
+                response = StreamingHttpResponse(stream_parquet(survey.id), content_type=CONTENT_TYPES["parquet"])
+            else:
+                response = FileResponse(export_to_tempfile(survey.id), content_type=CONTENT_TYPES["xlsx"])
+        except ExportDependencyError as exc:
+            return DRFResponse({"detail": str(exc)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class QuestionAdminViewSet(FieldProjectionMixin, viewsets.ModelViewSet):
     queryset = Question.objects.select_related("survey").all()
     serializer_class = QuestionAdminSerializer
     permission_classes = [IsAdminUser]
+    keyset_ordering = ("survey_id", "order", "id")
 
 
-class ChoiceAdminViewSet(viewsets.ModelViewSet):
+class ChoiceAdminViewSet(FieldProjectionMixin, viewsets.ModelViewSet):
     queryset = Choice.objects.select_related("question").all()
     serializer_class = ChoiceAdminSerializer
     permission_classes = [IsAdminUser]
+    keyset_ordering = ("question_id", "order", "id")
 
 
-class DriverAdminViewSet(viewsets.ModelViewSet):
-    queryset = Driver.objects.all().order_by("name", "last_name")
+class DriverAdminViewSet(CompiledListMixin, FieldProjectionMixin, viewsets.ModelViewSet):
+    queryset = Driver.objects.all().order_by("name", "last_name", "id")
     serializer_class = DriverSerializer
+    reader = DRIVER_READER
     permission_classes = [IsAdminUser]
+    keyset_ordering = ("name", "last_name", "id")
+
+    @action(detail=False, methods=["post"], url_path="import", parser_classes=[MultiPartParser])
+    def import_file(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return DRFResponse({"detail": "Файл сонгоогүй байна."}, status=status.HTTP_400_BAD_REQUEST)
+        file_format = os.path.splitext(upload.name)[1].lstrip(".").lower()
+        if file_format not in IMPORT_FORMATS:
+            return DRFResponse(
+                {"detail": "Зөвхөн CSV эсвэл XLSX файл оруулна."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        deactivate = _flag(request.data.get("deactivate_missing"))
+        try:
+            result = import_drivers(iter_rows(upload, file_format), deactivate_missing=deactivate)
+        except DriverImportError as exc:
+            return DRFResponse({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return DRFResponse(result.as_dict())
+
+    @action(detail=True, methods=["get"])
+    def scorecard(self, request, pk=None):
+        bucket = request.query_params.get("bucket") or "month"
+        if bucket not in TREND_BUCKETS:
+            raise ValidationError({"bucket": f"Must be one of: {', '.join(TREND_BUCKETS)}."})
+        driver = get_object_or_404(Driver, pk=pk)
+        return DRFResponse({"driver": DriverSerializer(driver).data, **driver_scorecard(driver.id, bucket)})
+
+    @action(detail=False, methods=["get"])
+    def leaderboard(self, request):
+        params = request.query_params
+        survey_id = _int_param(params, "survey")
+        driver_id = _int_param(params, "driver")
+        date_from = _date_param(params, "from")
+        date_to = _date_param(params, "to")
+        limit = max(1, min(_int_param(params, "limit") or 10, 100))
+        board = get_leaderboard(survey_id, date_from, date_to)
+        data = {
+            "survey_id": survey_id,
+            "from": date_from,
+            "to": date_to,
+            "prior_mean": board.prior_mean,
+            "prior_weight": board.prior_weight,
+            "fleet_size": len(board),
+            "top": board.top(limit),
+            "bottom": board.bottom(limit),
+        }
+        if driver_id is not None:
+            data["driver"] = board.entry(driver_id)
+        return DRFResponse(data)
+
+
+def _active_surveys_validators(request):
+    count, updated_at = active_surveys_version()
+    return f"{count}-{updated_at.isoformat() if updated_at else ''}", updated_at
+
+
+def _survey_validators(request, slug):
+    updated_at = survey_schema_version(slug)
+    if updated_at is None:
+        return None, None
+    return updated_at.isoformat(), updated_at
 
 
-class ActiveSurveyListView(generics.ListAPIView):
+def _roster_etag(request, *args, **kwargs):
+    # Kept on the request so the view builds its body from the same stamp.
+    if not hasattr(request, "roster_stamp"):
+        request.roster_stamp = roster_stamp()
+    return request.roster_stamp
+
+
+def _driver_list_validators(request):
+    return _roster_etag(request), None
+
+
+@method_decorator(conditional(_active_surveys_validators, public=True), name="list")
+class ActiveSurveyListView(FieldProjectionMixin, generics.ListAPIView):
     serializer_class = SurveyPublicSerializer
     permission_classes = [AllowAny]
+    keyset_ordering = ("-created_at", "-id")
 
     def get_queryset(self):
-        return Survey.objects.filter(is_active=True).prefetch_related("questions__choices")
+        queryset = Survey.objects.filter(is_active=True)
+        fields = requested_fields(self.request)
+        if fields is None or "questions" in fields:
+            queryset = queryset.prefetch_related("questions__choices")
+        return queryset
 
+    def list(self, request, *args, **kwargs):
+        params = request.query_params
+        if requested_fields(request) or "cursor" in params or "page_size" in params:
+            return super().list(request, *args, **kwargs)
+        # Served from the compiled schema cache; see surveys/cache.py.
+        return HttpResponse(get_active_surveys_schema(), content_type="application/json")
 
+
+@method_decorator(conditional(_survey_validators, public=True), name="retrieve")
 class ActiveSurveyDetailView(generics.RetrieveAPIView):
     serializer_class = SurveyPublicSerializer
     permission_classes = [AllowAny]
@@ -417,30 +604,146 @@ class ActiveSurveyDetailView(generics.RetrieveAPIView):
     def get_queryset(self):
         return Survey.objects.filter(is_active=True).prefetch_related("questions__choices")
 
+    def retrieve(self, request, *args, **kwargs):
+        body = get_survey_schema(kwargs[self.lookup_field])
+        if body is None:
+            raise Http404
+        return HttpResponse(body, content_type="application/json")
+
 
-class ActiveDriverListView(generics.ListAPIView):
+@method_decorator(conditional(_driver_list_validators, public=True), name="list")
+class ActiveDriverListView(CompiledListMixin, FieldProjectionMixin, generics.ListAPIView):
     serializer_class = DriverSerializer
+    reader = DRIVER_READER
     permission_classes = [AllowAny]
+    keyset_ordering = ("name", "last_name", "id")
 
     def get_queryset(self):
-        queryset = Driver.objects.filter(is_active=True).order_by("name", "last_name")
-        search = self.request.query_params.get("search")
+        queryset = Driver.objects.filter(is_active=True).order_by("name", "last_name", "id")
+        params = self.request.query_params
+        search = params.get("search")
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) | 
-                Q(last_name__icontains=search) | 
-                Q(phone_number__icontains=search) |
-                Q(car_number__icontains=search)
-            )
+            limit = getattr(settings, "DRIVER_SEARCH_LIMIT", 20)
+            if "cursor" in params or "page_size" in params:
+                raise ValidationError(
+                    {"search": f"Search returns at most {limit} ranked drivers and can't be paginated."}
+                )
+            queryset = search_drivers(queryset, search, limit)
         return queryset
 
 
+@conditional(_driver_list_validators, public=True)
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def driver_autocomplete_view(request):
+    roster = get_roster(_roster_etag(request))
+    query = request.query_params.get("q", "")
+    limit = getattr(settings, "DRIVER_SEARCH_LIMIT", 20)
+    return DRFResponse({"version": roster.version, "results": roster.search(query, limit)})
+
+
+@conditional(_driver_list_validators, public=True)
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def driver_roster_view(request):
+    roster = get_roster(_roster_etag(request))
+    return DRFResponse({"version": roster.version, "drivers": roster.as_list()})
+
+
 class ResponseCreateView(generics.CreateAPIView):
     serializer_class = ResponseCreateSerializer
     permission_classes = [AllowAny]
 
     def create(self, request, *args, **kwargs):
+        # Retries carrying an Idempotency-Key replay the first outcome
+        # without validating or writing again.
+        try:
+            key = idempotency.request_key(request)
+            if key is not None:
+                digest = idempotency.fingerprint(request.body)
+                stored = idempotency.claim(key, digest)
+                if stored is not None:
+                    code, data, location = stored
+                    headers = {idempotency.REPLAYED_HEADER: "true"}
+                    if location:
+                        headers["Location"] = location
+                    return DRFResponse(data, status=code, headers=headers)
+        except idempotency.IdempotencyConflict as exc:
+            return DRFResponse({"detail": exc.message}, status=exc.status)
+
+        try:
+            response = self._create(request)
+        except BaseException:
+            if key is not None:
+                idempotency.release(key)
+            raise
+        if key is not None:
+            idempotency.complete(key, digest, response.status_code, response.data, response.get("Location"))
+        return response
+
+    def _create(self, request):
         serializer = self.get_serializer(data=request.data, context={"request": request})
         serializer.is_valid(raise_exception=True)
+        if queue_enabled():
+            start_flusher()
+            receipt = get_journal().enqueue(
+                {**serializer.validated_data, "ip_address": request.META.get("REMOTE_ADDR")}
+            )
+            return DRFResponse(
+                {"receipt": receipt, "status": STATUS_PENDING},
+                status=status.HTTP_202_ACCEPTED,
+                headers={"Location": reverse("submission-receipt", args=[receipt])},
+            )
         response = serializer.save()
         return DRFResponse({"id": response.id}, status=status.HTTP_201_CREATED)
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def response_batch_create_view(request):
+    items = request.data
+    if isinstance(items, dict):
+        items = items.get("submissions")
+    if not isinstance(items, list) or not items:
+        return DRFResponse(
+            {"detail": "Expected a non-empty list of submissions."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    limit = getattr(settings, "SUBMISSION_BATCH_LIMIT", 200)
+    if len(items) > limit:
+        return DRFResponse(
+            {"detail": f"At most {limit} submissions per request."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    ip_address = request.META.get("REMOTE_ADDR")
+    checked = validate_submission_batch(items)
+    valid = [
+        (index, {**data, "ip_address": ip_address}) for index, (data, _) in enumerate(checked) if data is not None
+    ]
+    outcomes = dict(zip([index for index, _ in valid], store_submissions([item for _, item in valid])))
+
+    results = []
+    for index, (_, errors) in enumerate(checked):
+        if errors is not None:
+            results.append({"index": index, "status": "invalid", "errors": errors})
+            continue
+        outcome, response_id = outcomes[index]
+        if outcome == STATUS_STORED:
+            results.append({"index": index, "status": outcome, "id": response_id})
+        elif outcome == STATUS_DUPLICATE:
+            results.append({"index": index, "status": outcome, "detail": DUPLICATE_RESPONSE_MESSAGE})
+        else:
+            results.append({"index": index, "status": outcome, "detail": FAILED_MESSAGE})
+    return DRFResponse({"results": results})
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def submission_receipt_view(request, receipt):
+    # Entries left by a previous process are picked up once a client polls.
+    start_flusher()
+    data = receipt_status(receipt)
+    if data is None:
+        raise Http404
+    return DRFResponse(data)
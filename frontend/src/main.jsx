@@ -2,8 +2,12 @@ import React from "react";
 import ReactDOM from "react-dom/client";
 import { BrowserRouter } from "react-router-dom";
 import App from "./App.jsx";
+import { flushSubmissions } from "./offlineQueue.js";
 import "./styles.css";
 
+window.addEventListener("online", flushSubmissions);
+flushSubmissions();
+
 ReactDOM.createRoot(document.getElementById("root")).render(
   <React.StrictMode>
     <BrowserRouter>
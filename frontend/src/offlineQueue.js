@@ -0,0 +1,68 @@
+import { apiRequest } from "./api.js";
+
+const STORAGE_KEY = "pending_submissions";
+const REJECTED_KEY = "rejected_submissions";
+const BATCH_SIZE = 200;
+
+export const REJECTED_EVENT = "submissions-rejected";
+
+const readList = (key) => {
+  try {
+    return JSON.parse(localStorage.getItem(key)) || [];
+  } catch {
+    return [];
+  }
+};
+
+const writeList = (key, items) => {
+  try {
+    if (items.length) {
+      localStorage.setItem(key, JSON.stringify(items));
+    } else {
+      localStorage.removeItem(key);
+    }
+  } catch {
+    // ignore storage errors
+  }
+};
+
+const readQueue = () => readList(STORAGE_KEY);
+const writeQueue = (items) => writeList(STORAGE_KEY, items);
+
+// Серверт татгалзсан судалгааг устгахгүй, хэрэглэгчид харуулахаар хадгална
+export const readRejectedSubmissions = () => readList(REJECTED_KEY);
+export const dismissRejectedSubmissions = () => writeList(REJECTED_KEY, []);
+
+// Сүлжээгүй үед бөглөсөн судалгааг хадгалж, холболт сэргэхэд нэг хүсэлтээр илгээнэ
+export const queueSubmission = (submission) => writeQueue([...readQueue(), submission]);
+
+let flushing = false;
+
+export async function flushSubmissions() {
+  const batch = readQueue().slice(0, BATCH_SIZE);
+  if (flushing || !batch.length || !navigator.onLine) return;
+  flushing = true;
+  try {
+    const { results } = await apiRequest("/responses/batch/", {
+      method: "POST",
+      body: JSON.stringify(batch),
+    });
+    // stored, duplicate and invalid items are settled; only failed ones are retried.
+    const settled = new Set(results.filter((item) => item.status !== "failed").map((item) => item.index));
+    const retry = batch.filter((_, index) => !settled.has(index));
+    writeQueue([...retry, ...readQueue().slice(batch.length)]);
+
+    const rejected = results
+      .filter((item) => item.status === "invalid")
+      .map((item) => ({ submission: batch[item.index], errors: item.errors, rejectedAt: new Date().toISOString() }));
+    if (rejected.length) {
+      console.warn("Offline submissions rejected by the server", rejected);
+      writeList(REJECTED_KEY, [...readRejectedSubmissions(), ...rejected]);
+      window.dispatchEvent(new CustomEvent(REJECTED_EVENT));
+    }
+  } catch {
+    // still offline; retried on the next "online" event
+  } finally {
+    flushing = false;
+  }
+}
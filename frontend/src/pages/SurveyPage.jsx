@@ -1,8 +1,19 @@
-import { useEffect, useState, useCallback } from "react";
+import { useEffect, useState, useCallback, useRef } from "react";
 import { useNavigate, useParams } from "react-router-dom";
 import { apiRequest } from "../api.js";
+import {
+  REJECTED_EVENT,
+  dismissRejectedSubmissions,
+  queueSubmission,
+  readRejectedSubmissions,
+} from "../offlineQueue.js";
 import SurveyForm from "../components/SurveyForm.jsx";
 
+const newSubmissionKey = () =>
+  typeof crypto !== "undefined" && crypto.randomUUID
+    ? crypto.randomUUID()
+    : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+
 export default function SurveyPage() {
   const { slug } = useParams();
   const navigate = useNavigate();
@@ -11,6 +22,21 @@ export default function SurveyPage() {
   const [driverSearch, setDriverSearch] = useState("");
   const [formState, setFormState] = useState({ driverId: "", answers: {} });
   const [status, setStatus] = useState({ loading: true, error: "", success: "" });
+  // Same key for retries of an unchanged form, so the server replays the
+  // first result instead of reporting a duplicate.
+  const submissionKey = useRef(newSubmissionKey());
+  const [rejected, setRejected] = useState(readRejectedSubmissions);
+
+  useEffect(() => {
+    const refresh = () => setRejected(readRejectedSubmissions());
+    window.addEventListener(REJECTED_EVENT, refresh);
+    return () => window.removeEventListener(REJECTED_EVENT, refresh);
+  }, []);
+
+  const dismissRejected = () => {
+    dismissRejectedSubmissions();
+    setRejected([]);
+  };
 
   useEffect(() => {
     const loadSurvey = async () => {
@@ -42,6 +68,9 @@ export default function SurveyPage() {
   }, [driverSearch, fetchDrivers]);
 
   const handleChange = (type, payload) => {
+    if (type === "driverId" || type === "answer") {
+      submissionKey.current = newSubmissionKey();
+    }
     if (type === "driverId") {
       setFormState((prev) => ({ ...prev, driverId: payload }));
       return;
@@ -78,19 +107,39 @@ export default function SurveyPage() {
       ...(formState.answers[question.id] || {}),
     }));
 
+    const submission = {
+      survey_id: survey.id,
+      driver_id: Number(formState.driverId),
+      answers,
+    };
+
+    const finish = () => {
+      setStatus({ loading: false, error: "", success: "" });
+      setFormState({ driverId: "", answers: {} });
+      submissionKey.current = newSubmissionKey();
+      navigate(`/survey/${slug}/success`);
+    };
+
+    if (!navigator.onLine) {
+      queueSubmission(submission);
+      finish();
+      return;
+    }
+
     try {
       await apiRequest("/responses/", {
         method: "POST",
-        body: JSON.stringify({
-          survey_id: survey.id,
-          driver_id: Number(formState.driverId),
-          answers,
-        }),
+        headers: { "Idempotency-Key": submissionKey.current },
+        body: JSON.stringify(submission),
       });
-      setStatus({ loading: false, error: "", success: "" });
-      setFormState({ driverId: "", answers: {} });
-      navigate(`/survey/${slug}/success`);
+      finish();
     } catch (err) {
+      if (err instanceof TypeError) {
+        // Сүлжээний алдаа: холболт сэргэхэд багцаар илгээнэ
+        queueSubmission(submission);
+        finish();
+        return;
+      }
       setStatus({ loading: false, error: err.message, success: "" });
     }
   };
@@ -117,6 +166,21 @@ export default function SurveyPage() {
           onChange={handleChange}
           onSubmit={handleSubmit}
         />
+        {rejected.length > 0 && (
+          <div className="error">
+            Сүлжээгүй үед бөглөсөн {rejected.length} судалгааг сервер хүлээж аваагүй:
+            <ul>
+              {rejected.map((item, index) => (
+                <li key={index}>
+                  {new Date(item.rejectedAt).toLocaleString()}: {JSON.stringify(item.errors)}
+                </li>
+              ))}
+            </ul>
+            <button type="button" onClick={dismissRejected}>
+              Хаах
+            </button>
+          </div>
+        )}
         {status.error && <div className="error">{status.error}</div>}
         {status.success && <div className="success">{status.success}</div>}
       </main>